@@ -303,6 +303,28 @@ module GenericsAPI {
     plot_corr_matrix: plot correlation matrix in report, default False
     plot_scatter_matrix: plot scatter matrix in report, default False
     compute_significance: also compute Significance in addition to correlation matrix
+    corr_threshold: correlation coefficient threshold, variables without any pair over the
+                    threshold are dropped from the saved matrix
+    tile_size: compute correlation tile by tile (tile_size x tile_size values at a time) into
+               on-disk arrays to bound memory usage, default computes the matrix in memory
+    n_workers: number of processes computing row blocks of the correlation matrix in parallel,
+               implies tiled mode when larger than 1, default 1
+    sparse_output: only keep pairs with an absolute correlation coefficient of at least
+                   corr_threshold, filtered tile by tile and saved as pair_data, default False
+    top_k: only keep the top_k partners with the strongest absolute correlation of every
+           variable, saved as pair_data, takes precedence over sparse_output
+    save_statistics: save the sufficient statistics of the pearson correlation with the matrix
+                     so that appended samples can be folded in later, default False
+    base_corr_matrix_ref: CorrelationMatrix saved with save_statistics for an earlier version
+                          of input_obj_ref, only the samples added since are folded into its
+                          statistics to produce the updated pearson matrix
+    kendall_sample_size: approximate kendall correlation on a random subset of that many
+                         samples, the error bound is saved in correlation_parameters
+    random_seed: seed of the random sample subset
+    significance_correction: also save the significance adjusted for multiple testing, one of
+                             ['bonferroni', 'fdr_bh'] (Benjamini-Hochberg q-values)
+    display_threshold: only list the pairs with an absolute coefficient of at least
+                       display_threshold in the report tables, default all pairs
   */
   typedef structure {
       obj_ref input_obj_ref;
@@ -313,6 +335,17 @@ module GenericsAPI {
       boolean plot_corr_matrix;
       boolean plot_scatter_matrix;
       boolean compute_significance;
+      float corr_threshold;
+      int tile_size;
+      int n_workers;
+      boolean sparse_output;
+      int top_k;
+      boolean save_statistics;
+      obj_ref base_corr_matrix_ref;
+      int kendall_sample_size;
+      int random_seed;
+      string significance_correction;
+      float display_threshold;
   } CompCorrParams;
 
   typedef structure {
@@ -333,6 +366,21 @@ module GenericsAPI {
     method: correlation method, one of ['pearson', 'kendall', 'spearman']
     plot_corr_matrix: plot correlation matrix in report, default False
     compute_significance: also compute Significance in addition to correlation matrix
+    tile_size: compute correlation tile by tile (tile_size x tile_size values at a time) into
+               on-disk arrays to bound memory usage, default computes the matrix in memory
+    n_workers: number of processes computing row blocks of the correlation matrix in parallel,
+               implies tiled mode when larger than 1, default 1
+    sparse_output: only keep pairs with an absolute correlation coefficient of at least
+                   corr_threshold, filtered tile by tile and saved as pair_data, default False
+    top_k: only keep the top_k partners with the strongest absolute correlation of every
+           variable, saved as pair_data, takes precedence over sparse_output
+    kendall_sample_size: approximate kendall correlation on a random subset of that many
+                         samples, the error bound is saved in correlation_parameters
+    random_seed: seed of the random sample subset
+    significance_correction: also save the significance adjusted for multiple testing, one of
+                             ['bonferroni', 'fdr_bh'] (Benjamini-Hochberg q-values)
+    display_threshold: only list the pairs with an absolute coefficient of at least
+                       display_threshold in the report tables, default all pairs
   */
   typedef structure {
       obj_ref matrix_ref_1;
@@ -344,6 +392,14 @@ module GenericsAPI {
       boolean plot_corr_matrix;
       boolean compute_significance;
       float corr_threshold;
+      int tile_size;
+      int n_workers;
+      boolean sparse_output;
+      int top_k;
+      int kendall_sample_size;
+      int random_seed;
+      string significance_correction;
+      float display_threshold;
   } CompCorrMetriceParams;
 
   /* compute_correlation_across_matrices: compute correlation matrix across matrices*/
@@ -356,12 +412,21 @@ module GenericsAPI {
     filter_on_threshold: Dictory holder that holds filter on thredshold params
     params in filter_on_threshold:
       coefficient_threshold: correlation coefficient threshold (select pairs with greater correlation coefficient)
+      adjusted_significance_threshold: select pairs with a significance adjusted for multiple testing (see significance_correction) of at most this threshold
+    layout_iterations: iteration budget of the force-directed layout of the report network (default 50)
+    analyze_network: store connected component, Louvain community, degree and betweenness centrality of every node as node properties
+    betweenness_sample_size: number of random sources betweenness centrality is estimated from (default 100, exact if at least the number of nodes)
+    random_seed: seed of the community detection and the betweenness sampling
   */
   typedef structure {
       obj_ref corr_matrix_ref;
       workspace_name workspace_name;
       string network_obj_name;
       mapping<string, string> filter_on_threshold;
+      int layout_iterations;
+      boolean analyze_network;
+      int betweenness_sample_size;
+      int random_seed;
   } BuildNetworkParams;
 
   typedef structure {
@@ -382,6 +447,15 @@ module GenericsAPI {
     attribute_mapping_obj_ref - associated attribute_mapping_obj_ref
     scale_size_by - used for PCA plot to scale data size
     color_marker_by - used for PCA plot to group data
+    svd_solver - one of ['auto', 'full', 'randomized', 'arpack', 'incremental', 'truncated']
+                 (default 'auto': full SVD for small matrices or many components, otherwise
+                 ARPACK or randomized), 'incremental' streams batches of samples for matrices
+                 larger than memory, 'truncated' is an uncentered truncated SVD of the sparse
+                 matrix for mostly zero (e.g. amplicon count) matrices
+    random_seed - seed of the randomized, ARPACK and truncated solvers, for reproducible results
+    batch_size - number of samples per batch of the incremental solver (default 1000)
+    max_plot_points - plots of more points show a density-preserving sample of at most this many
+                      points (default all points), the report links all of them (pca_points.npy)
   */
   typedef structure {
     obj_ref input_obj_ref;
@@ -392,6 +466,10 @@ module GenericsAPI {
     obj_ref attribute_mapping_obj_ref;
     mapping<string, string> scale_size_by;
     mapping<string, string> color_marker_by;
+    string svd_solver;
+    int random_seed;
+    int batch_size;
+    int max_plot_points;
   } PCAParams;
 
   /* Ouput of the run_pca function
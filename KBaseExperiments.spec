@@ -169,6 +169,53 @@ module KBaseExperiments {
       list<list<float>> values;
     } FloatMatrix2D;
 
+    /*
+      Sparse pairwise correlation data, one entry per kept pair of variables.
+
+      row_ids - variables of the rows of the full correlation matrix
+      col_ids - variables of the columns of the full correlation matrix
+      row_index - position in row_ids of the first variable of each pair
+      col_index - position in col_ids of the second variable of each pair
+      coefficient - correlation coefficient of each pair
+      significance - significance value of each pair
+      adjusted_significance - significance value of each pair adjusted for multiple testing over
+                              all tested pairs (see correlation_parameters)
+      symmetric - pairs of a symmetric matrix (row_ids equal to col_ids) are only listed once,
+                  with row_index < col_index (not set for top k partner lists, which are
+                  ordered by row and decreasing strength)
+
+      @optional significance adjusted_significance symmetric
+    */
+    typedef structure {
+      list<string> row_ids;
+      list<string> col_ids;
+      list<int> row_index;
+      list<int> col_index;
+      list<float> coefficient;
+      list<float> significance;
+      list<float> adjusted_significance;
+      boolean symmetric;
+    } CorrelationPairs;
+
+    /*
+      Sufficient statistics of a Pearson correlation matrix, new samples can be folded into
+      them without recomputing the correlation from scratch.
+
+      n - number of samples the statistics were computed over
+      sample_ids - ids of those samples
+      variable_ids - ids of the correlated variables, in the order of means and comoments
+      means - mean of every variable over the samples
+      comoments - sums over the samples of the products of the centered values of every pair
+                  of variables, the diagonal holds the centered sums of squares
+    */
+    typedef structure {
+      int n;
+      list<string> sample_ids;
+      list<string> variable_ids;
+      list<float> means;
+      list<list<float>> comoments;
+    } CorrelationStatistics;
+
     /*
       A wrapper around a FloatMatrix2D designed for simple matricies of pairwise Correlation data.
 
@@ -176,6 +223,12 @@ module KBaseExperiments {
       description - short optional description of the dataset
       coefficient_data - contains pairwise correlation coefficient values
       significance_data - contains pairwise significance values
+      adjusted_significance_data - contains pairwise significance values adjusted for multiple
+                                   testing (see correlation_parameters)
+      pair_data - sparse alternative to coefficient_data and significance_data that only holds
+                  the pairs passing the correlation threshold or the top k partners of every
+                  variable (see correlation_parameters)
+      sufficient_statistics - statistics to update a Pearson correlation with new samples
 
       Additional Fields:
       genome_ref - a reference to the aligned genome
@@ -189,7 +242,8 @@ module KBaseExperiments {
 
       @optional description correlation_parameters
       @optional genome_ref feature_mapping
-      @optional significance_data original_matrix_ref
+      @optional significance_data adjusted_significance_data original_matrix_ref
+      @optional coefficient_data pair_data sufficient_statistics
 
       @metadata ws genome_ref as genome
       @metadata ws length(original_matrix_ref) as original_matrix_size
@@ -203,6 +257,9 @@ module KBaseExperiments {
       mapping<string, list<string>> feature_mapping;
       FloatMatrix2D coefficient_data;
       FloatMatrix2D significance_data;
+      FloatMatrix2D adjusted_significance_data;
+      CorrelationPairs pair_data;
+      CorrelationStatistics sufficient_statistics;
     } CorrelationMatrix;
 
     /*
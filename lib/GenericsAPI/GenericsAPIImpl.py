@@ -11,6 +11,7 @@ from GenericsAPI.Utils.MatrixUtil import MatrixUtil
 from GenericsAPI.Utils.NetworkUtil import NetworkUtil
 from GenericsAPI.Utils.PCAUtil import PCAUtil
 from GenericsAPI.Utils.DataTableUtil import DataTableUtil
+from GenericsAPI.Utils.ObjectCache import ObjectCache
 from installed_clients.GenericsServiceClient import GenericsService
 #END_HEADER
 
@@ -45,6 +46,8 @@ class GenericsAPI:
         self.config['SDK_CALLBACK_URL'] = os.environ['SDK_CALLBACK_URL']
         self.config['KB_AUTH_TOKEN'] = os.environ['KB_AUTH_TOKEN']
         self.scratch = config['scratch']
+        # fetched objects are shared by all utils, and dropped at the start of every call
+        self.object_cache = ObjectCache.shared(self.config)
         self.attr_util = AttributesUtil(self.config)
         self.matrix_util = MatrixUtil(self.config)
         self.corr_util = CorrelationUtil(self.config)
@@ -80,6 +83,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN fetch_data
+        self.object_cache.clear()
         returnVal = self.data_util.fetch_data(params)
         #END fetch_data
 
@@ -108,6 +112,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN export_matrix
+        self.object_cache.clear()
         returnVal = self.matrix_util.export_matrix(params)
         #END export_matrix
 
@@ -134,6 +139,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN validate_data
+        self.object_cache.clear()
         returnVal = self.data_util.validate_data(params)
         #END validate_data
 
@@ -181,6 +187,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN import_matrix_from_excel
+        self.object_cache.clear()
         returnVal = self.matrix_util.import_matrix_from_excel(params)
         #END import_matrix_from_excel
 
@@ -228,6 +235,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN import_matrix_from_biom
+        self.object_cache.clear()
         returnVal = self.biom_util.import_matrix_from_biom(params)
         #END import_matrix_from_biom
 
@@ -255,6 +263,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN save_object
+        self.object_cache.clear()
         returnVal = self.data_util.save_object(params)
         #END save_object
 
@@ -280,6 +289,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN search_matrix
+        self.object_cache.clear()
         returnVal = self.matrix_util.search_matrix(params)
         #END search_matrix
 
@@ -311,6 +321,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN filter_matrix
+        self.object_cache.clear()
         returnVal = self.matrix_util.filter_matrix(params)
         #END filter_matrix
 
@@ -343,6 +354,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN standardize_matrix
+        self.object_cache.clear()
         returnVal = self.matrix_util.standardize_matrix(params)
         #END standardize_matrix
 
@@ -367,6 +379,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN file_to_attribute_mapping
+        self.object_cache.clear()
         logging.info("Starting 'file_to_attribute_mapping' with params:{}".format(params))
         self.attr_util.validate_params(params, ("output_ws_id", "output_obj_name"),
                                        ('input_shock_id', 'input_file_path'))
@@ -397,6 +410,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN update_matrix_attribute_mapping
+        self.object_cache.clear()
         logging.info("Starting 'update_matrix_attribute_mapping' with params:{}".format(params))
         self.attr_util.validate_params(params, ("staging_file_subdir_path", "dimension",
                                                 "workspace_name", "output_am_obj_name",
@@ -423,6 +437,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN attribute_mapping_to_tsv_file
+        self.object_cache.clear()
         logging.info("Starting 'attribute_mapping_to_tsv_file' with params:{}".format(params))
         self.attr_util.validate_params(params, ("destination_dir", "input_ref"))
         am_id, result = self.attr_util.to_tsv(params)
@@ -445,6 +460,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN export_attribute_mapping_tsv
+        self.object_cache.clear()
         logging.info("Starting 'export_attribute_mapping_tsv' with params:{}".format(params))
         self.attr_util.validate_params(params, ("input_ref",))
         params['destination_dir'] = self.scratch
@@ -469,6 +485,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN export_attribute_mapping_excel
+        self.object_cache.clear()
         logging.info("Starting 'export_attribute_mapping_excel' with params:{}".format(params))
         self.attr_util.validate_params(params, ("input_ref",))
         params['destination_dir'] = self.scratch
@@ -493,6 +510,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN export_cluster_set_excel
+        self.object_cache.clear()
         logging.info("Starting 'export_cluster_set_excel' with params:{}".format(params))
         self.attr_util.validate_params(params, ("input_ref",))
         params['destination_dir'] = self.scratch
@@ -517,6 +535,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN export_corr_matrix_excel
+        self.object_cache.clear()
         logging.info("Starting 'export_corr_matrix_excel' with params:{}".format(params))
         result = self.corr_util.export_corr_matrix_excel(params)
         #END export_corr_matrix_excel
@@ -538,6 +557,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN export_pca_matrix_excel
+        self.object_cache.clear()
         result = self.pca_util.export_pca_matrix_excel(params)
         #END export_pca_matrix_excel
 
@@ -558,6 +578,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: result
         #BEGIN export_amplicon_set_tsv
+        self.object_cache.clear()
         result = self.biom_util.export_amplicon_set_tsv(params)
         #END export_amplicon_set_tsv
 
@@ -598,6 +619,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN compute_correlation_matrix
+        self.object_cache.clear()
         returnVal = self.corr_util.compute_correlation_matrix(params)
         #END compute_correlation_matrix
 
@@ -638,6 +660,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN compute_correlation_across_matrices
+        self.object_cache.clear()
         returnVal = self.corr_util.compute_correlation_across_matrices(params)
         #END compute_correlation_across_matrices
 
@@ -671,6 +694,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN build_network
+        self.object_cache.clear()
         returnVal = self.network_util.build_network(params)
         #END build_network
 
@@ -711,6 +735,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN run_pca
+        self.object_cache.clear()
         returnVal = self.pca_util.run_pca(params)
         #END run_pca
 
@@ -735,6 +760,7 @@ class GenericsAPI:
         # ctx is the context object
         # return variables are: returnVal
         #BEGIN view_matrix
+        self.object_cache.clear()
         returnVal = self.data_table_util.view_matrix_as_table(params)
         #END view_matrix
 
@@ -221,10 +221,7 @@ class AttributesUtil:
         """
 
         original_matrix_ref = data.get('original_data')
-        data_matrix = self.data_util.fetch_data(
-            {'obj_ref': original_matrix_ref}).get('data_matrix')
-
-        data_df = pd.read_json(data_matrix)
+        data_df = self.data_util.fetch_matrix_df(original_matrix_ref)
         clusters = data.get('clusters')
 
         id_name_list = [list(cluster.get('id_to_data_position').keys()) for cluster in clusters]
@@ -0,0 +1,1198 @@
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# rows of the input arrays are variables, columns are the shared observations (samples)
+
+KENDALL_BLOCK_BYTES = 2 ** 28  # memory budget for one block of Kendall sign vectors
+KENDALL_EXACT_SIZE = 33  # same cutoff as scipy.stats.kendalltau for the exact p-value
+KENDALL_SORT_SIZE = 1200  # from this many observations on Kendall tau is computed by sorting
+KENDALL_BOUND_DELTA = 0.05  # error probability of the subsampled Kendall tau error bound
+TILE_SIZE = 2000  # default number of variables per tile side in tiled mode
+BLOCKS_PER_WORKER = 4  # row blocks handed to each worker process, evens out the load
+PVALUE_CORRECTIONS = ['bonferroni', 'fdr_bh']  # multiple testing corrections of adjust_pvalues
+PVALUE_GROUP_SIZE = 4 * 10 ** 6  # p-values ranked at once by the out-of-core FDR correction
+# p-value histogram bins of the out-of-core FDR correction, fine near 0 where p-values crowd
+PVALUE_BIN_EDGES = np.unique(np.concatenate([np.geomspace(1e-300, 1e-4, 4096),
+                                             np.linspace(1e-4, 1, 2 ** 16)]))
+
+
+def _unit_rows(values):
+    """
+    _unit_rows: center each row and scale it to unit length so that the dot product of two
+                rows is their Pearson coefficient (constant rows become NaN)
+    """
+    centered = values - values.mean(axis=1)[:, np.newaxis]
+    norms = np.sqrt(np.einsum('ij,ij->i', centered, centered))
+
+    constant = np.ptp(values, axis=1) == 0
+    norms[constant] = 1
+    unit = centered / norms[:, np.newaxis]
+    unit[constant] = np.nan
+
+    return unit
+
+
+def _rank_rows(values):
+    """
+    _rank_rows: rank each row, ties get their average rank
+    """
+    return pd.DataFrame(values).rank(axis=1).values
+
+
+def _dense_rank_rows(values):
+    """
+    _dense_rank_rows: rank each row with consecutive ranks starting at 0, ties share a rank
+    """
+    return pd.DataFrame(values).rank(axis=1, method='dense').values - 1
+
+
+def _kendall_signs(values):
+    """
+    _kendall_signs: sign of every observation pair for each row and the number of untied pairs
+
+    the dot product of two sign rows is the number of concordant minus discordant pairs
+    """
+    left, right = np.triu_indices(values.shape[1], k=1)
+    dtype = np.float32 if left.size < 2 ** 24 else np.float64  # exact integer dot products
+    signs = np.sign(values[:, left] - values[:, right]).astype(dtype)
+    untied = np.einsum('ij,ij->i', signs, signs).astype(np.float64)
+
+    return signs, untied
+
+
+def _kendall_block_rows(n_obs):
+    n_pairs = max(n_obs * (n_obs - 1) // 2, 1)
+    return max(KENDALL_BLOCK_BYTES // (n_pairs * 8), 1)
+
+
+def _kendall_tau_signs(x_values, y_values):
+    """
+    _kendall_tau_signs: blocked tau-b matrix, sign vectors are built for one row block at a time,
+                        O(n^2) per pair but a single matrix product per block
+
+    tau-b = (concordant - discordant) / sqrt(untied x pairs * untied y pairs)
+    """
+    block_rows = _kendall_block_rows(x_values.shape[1])
+    tau = np.empty((x_values.shape[0], y_values.shape[0]))
+
+    for x_start in range(0, x_values.shape[0], block_rows):
+        x_stop = x_start + block_rows
+        x_signs, x_untied = _kendall_signs(x_values[x_start:x_stop])
+        for y_start in range(0, y_values.shape[0], block_rows):
+            y_stop = y_start + block_rows
+            y_signs, y_untied = _kendall_signs(y_values[y_start:y_stop])
+            con_minus_dis = np.dot(x_signs, y_signs.T).astype(np.float64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                tau[x_start:x_stop, y_start:y_stop] = con_minus_dis / np.sqrt(
+                                                        np.outer(x_untied, y_untied))
+
+    return tau
+
+
+def _count_inversions(values):
+    """
+    _count_inversions: number of pairs i < j with values[i] > values[j] for every row of a batch
+                       of integer sequences in [0, n), by a bottom-up merge sort in O(n log n)
+
+    every level counts for all runs of all rows at once how many elements of the left run are
+    greater than each element of the right run, the runs of a level are laid out one after the
+    other in a single sorted array (offset by their position) so one searchsorted covers them
+    """
+    n_rows, n_obs = values.shape
+    size = 1 << max(0, (n_obs - 1).bit_length())
+    runs = values
+    if size > n_obs:
+        # increasing values above n_obs at the end add no inversion
+        padding = np.broadcast_to(np.arange(n_obs, size, dtype=values.dtype),
+                                  (n_rows, size - n_obs))
+        runs = np.hstack([values, padding])
+
+    inversions = np.zeros(n_rows, dtype=np.int64)
+    width = 1
+    while width < size:
+        n_runs = size // (2 * width)
+        runs = runs.reshape(n_rows, n_runs, 2, width)
+        run_ids = np.arange(n_rows * n_runs, dtype=np.int64).reshape(n_rows, n_runs, 1)
+
+        left = (runs[:, :, 0, :] + run_ids * size).ravel()
+        right = (runs[:, :, 1, :] + run_ids * size).ravel()
+        not_greater = np.searchsorted(left, right, side='right').reshape(n_rows, n_runs, width)
+        not_greater -= run_ids * width
+        inversions += (width - not_greater).sum(axis=2).sum(axis=1)
+
+        runs = np.sort(runs.reshape(n_rows, n_runs, 2 * width), axis=2, kind='mergesort')
+        width *= 2
+
+    return inversions
+
+
+def _sorted_tie_pairs(values):
+    """
+    _sorted_tie_pairs: number of tied pairs (sum of t(t-1)/2 over groups of t equal values) of
+                       every row of row-wise sorted values
+    """
+    positions = np.arange(1, values.shape[1])
+    run_starts = np.where(values[:, 1:] != values[:, :-1], positions, 0)
+
+    return (positions - np.maximum.accumulate(run_starts, axis=1)).sum(axis=1)
+
+
+def _kendall_tau_sorted(x_values, y_values):
+    """
+    _kendall_tau_sorted: tau-b matrix with Knight's O(n log n) algorithm, batched over pairs
+
+    rows are dense ranked and the sort order of every x row is computed once and reused for
+    all of its pairs, each pair is sorted by (x, y) and its discordant pairs are the inversions
+    of the y ranks in that order:
+    concordant - discordant = total - x ties - y ties + joint ties - 2 * discordant
+
+    pairs of a row with missing values are NaN, as with the sign vectors
+    """
+    n_obs = x_values.shape[1]
+    total = n_obs * (n_obs - 1) // 2
+
+    x_ranks = _dense_rank_rows(x_values)
+    y_ranks = _dense_rank_rows(y_values)
+    x_missing = np.isnan(x_ranks).any(axis=1)
+    y_missing = np.isnan(y_ranks).any(axis=1)
+    # any valid rank in place of the missing ones, their pairs are masked at the end
+    x_ranks = np.where(np.isnan(x_ranks), 0, x_ranks).astype(np.int64)
+    y_ranks = np.where(np.isnan(y_ranks), 0, y_ranks).astype(np.int64)
+    x_ties = _tie_stats(x_ranks)[0]
+    y_ties = _tie_stats(y_ranks)[0]
+
+    x_order = np.argsort(x_ranks, axis=1, kind='mergesort')
+    x_sorted = x_ranks[np.arange(x_ranks.shape[0])[:, np.newaxis], x_order]
+
+    # about 4 int64 copies of the (x rows, y rows, n) keys are alive at once
+    block_pairs = max(KENDALL_BLOCK_BYTES // (n_obs * 8 * 4), 1)
+    y_block = min(y_ranks.shape[0], block_pairs)
+    x_block = max(block_pairs // max(y_block, 1), 1)
+
+    tau = np.empty((x_values.shape[0], y_values.shape[0]))
+    for x_start in range(0, x_values.shape[0], x_block):
+        xs = slice(x_start, x_start + x_block)
+        for y_start in range(0, y_values.shape[0], y_block):
+            ys = slice(y_start, y_start + y_block)
+
+            # keys[i, j] = x ranks of row i in sorted order, paired with y ranks of row j
+            y_in_x_order = y_ranks[ys][:, x_order[xs]].transpose(1, 0, 2)
+            keys = (x_sorted[xs][:, np.newaxis, :] * n_obs + y_in_x_order).reshape(-1, n_obs)
+            keys.sort(axis=1)
+
+            shape = (y_in_x_order.shape[0], y_in_x_order.shape[1])
+            joint_ties = _sorted_tie_pairs(keys).reshape(shape)
+            discordant = _count_inversions(keys % n_obs).reshape(shape)
+
+            x_block_ties = x_ties[xs][:, np.newaxis]
+            y_block_ties = y_ties[ys][np.newaxis, :]
+            con_minus_dis = total - x_block_ties - y_block_ties + joint_ties - 2 * discordant
+            with np.errstate(invalid='ignore', divide='ignore'):
+                tau[xs, ys] = con_minus_dis / np.sqrt((total - x_block_ties) *
+                                                      (total - y_block_ties))
+
+    tau[x_missing] = np.nan
+    tau[:, y_missing] = np.nan
+
+    return tau
+
+
+def _kendall_tau(x_values, y_values):
+    """
+    _kendall_tau: tau-b matrix, sign vectors for few observations (fastest there, but O(n^2)
+                  memory and time per pair), sorting for many
+    """
+    if x_values.shape[1] >= KENDALL_SORT_SIZE:
+        return _kendall_tau_sorted(x_values, y_values)
+
+    return _kendall_tau_signs(x_values, y_values)
+
+
+def kendall_subsample(n_obs, sample_size, random_seed=None):
+    """
+    kendall_subsample: sorted indices of a random subset of sample_size observations used to
+                       approximate Kendall tau on wide data, all observations if fewer
+    """
+    if sample_size >= n_obs:
+        return np.arange(n_obs)
+
+    random_state = np.random.RandomState(random_seed)
+
+    return np.sort(random_state.choice(n_obs, size=sample_size, replace=False))
+
+
+def kendall_error_bound(sample_size, delta=KENDALL_BOUND_DELTA):
+    """
+    kendall_error_bound: Hoeffding bound for U-statistics, with probability at least 1 - delta
+                         Kendall tau(-a) on sample_size random observations is within this
+                         distance of its value on the full data (ties add a small bias to tau-b)
+    """
+    return math.sqrt(2 * math.log(2 / delta) / (sample_size // 2))
+
+
+def prepare_rows(values, method):
+    """
+    prepare_rows: transform variables once so that blocks can be computed with corr_block
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    if method == 'pearson':
+        return _unit_rows(values)
+    elif method == 'spearman':
+        return _unit_rows(_rank_rows(values))
+    elif method == 'kendall':
+        return _dense_rank_rows(values)
+    else:
+        raise ValueError('Input correlation method [{}] is not available'.format(method))
+
+
+def corr_block(x_prepared, y_prepared, method):
+    """
+    corr_block: correlation coefficients between every row of x_prepared and y_prepared
+    """
+    if method == 'kendall':
+        corr = _kendall_tau(x_prepared, y_prepared)
+    else:
+        corr = np.dot(x_prepared, y_prepared.T)
+
+    return np.clip(corr, -1, 1, out=corr)
+
+
+def corr_matrix(x_values, y_values=None, method='pearson'):
+    """
+    corr_matrix: correlation coefficients between every row of x_values and every row of
+                 y_values (or x_values itself)
+
+    matches scipy.stats pearsonr, spearmanr and kendalltau (tau-b) on each pair of rows
+    """
+    x_prepared = prepare_rows(x_values, method)
+    if y_values is None:
+        y_prepared = x_prepared
+    else:
+        y_prepared = prepare_rows(y_values, method)
+
+    return corr_block(x_prepared, y_prepared, method)
+
+
+def _tie_stats(values):
+    """
+    _tie_stats: per row sums over tied groups of size t of t(t-1)/2, t(t-1)(t-2) and
+                t(t-1)(2t+5), as used by the Kendall tau variance
+    """
+    n_rows, n_obs = values.shape
+    sorted_values = np.sort(values, axis=1)
+
+    starts = np.ones(values.shape, dtype=bool)
+    starts[:, 1:] = sorted_values[:, 1:] != sorted_values[:, :-1]
+    flat_starts = np.flatnonzero(starts)
+    counts = np.diff(np.append(flat_starts, starts.size)).astype(np.float64)
+    rows = flat_starts // n_obs
+
+    ties = np.bincount(rows, weights=counts * (counts - 1) / 2, minlength=n_rows)
+    ties_0 = np.bincount(rows, weights=counts * (counts - 1) * (counts - 2), minlength=n_rows)
+    ties_1 = np.bincount(rows, weights=counts * (counts - 1) * (2 * counts + 5),
+                         minlength=n_rows)
+
+    return ties, ties_0, ties_1
+
+
+def _kendall_exact_pvalues(n_obs, min_con_dis):
+    """
+    _kendall_exact_pvalues: two-sided exact p-values for untied data from the distribution of
+                            the number of inversions of a permutation of n_obs items
+    """
+    if n_obs >= 171:  # n! overflows, only reached for min_con_dis <= 1
+        return np.zeros(min_con_dis.shape)
+
+    max_c = int(min_con_dis.max()) if min_con_dis.size else 0
+    counts = np.zeros(max_c + 1)
+    counts[0:2] = 1.0
+    for j in range(3, n_obs + 1):
+        counts = np.cumsum(counts)
+        if j <= max_c:
+            counts[j:] -= counts[:max_c + 1 - j]
+
+    cdf = np.cumsum(counts) / math.factorial(n_obs)
+
+    return np.clip(2.0 * cdf[min_con_dis.astype(np.intp)], 0, 1)
+
+
+def _pearson_pvalues(corr, n_obs):
+    """
+    _pearson_pvalues: two-sided p-values of the t-test on the coefficients (n_obs - 2 dof)
+    """
+    pvalues = np.where(np.isnan(corr), np.nan, 1.0)
+    if n_obs <= 2:
+        return pvalues
+
+    dof = n_obs - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_abs = np.sqrt(dof * corr ** 2 / ((1 - corr) * (1 + corr)))
+        pvalues = 2 * stats.t.sf(t_abs, dof)
+
+    return pvalues
+
+
+def _kendall_pvalues(tau, n_obs, x_stats, y_stats):
+    """
+    _kendall_pvalues: two-sided p-values with the same exact/asymptotic choice and tie
+                      corrected variance as scipy.stats.kendalltau
+
+    x_stats and y_stats are the _tie_stats of the variables, broadcastable against tau
+    """
+    total = n_obs * (n_obs - 1) // 2
+    x_ties, x_ties_0, x_ties_1 = x_stats
+    y_ties, y_ties_0, y_ties_1 = y_stats
+
+    with np.errstate(invalid='ignore'):
+        con_minus_dis = np.rint(tau * np.sqrt((total - x_ties) * (total - y_ties)))
+
+        m = n_obs * (n_obs - 1.)
+        var = (m * (2 * n_obs + 5) - x_ties_1 - y_ties_1) / 18 + 2 * x_ties * y_ties / m
+        if n_obs > 2:
+            var = var + x_ties_0 * y_ties_0 / (9 * m * (n_obs - 2))
+        pvalues = 2 * stats.norm.sf(np.abs(con_minus_dis) / np.sqrt(var))
+
+        untied = (x_ties == 0) & (y_ties == 0) & ~np.isnan(tau)
+        dis = (total - con_minus_dis) / 2
+        min_con_dis = np.minimum(dis, total - dis)
+        exact = untied & ((n_obs <= KENDALL_EXACT_SIZE) | (min_con_dis <= 1))
+
+    if exact.any():
+        pvalues[exact] = _kendall_exact_pvalues(n_obs, min_con_dis[exact])
+
+    return pvalues
+
+
+def _pvalues(corr, method, n_obs, x_stats=None, y_stats=None):
+    if method in ['pearson', 'spearman']:
+        return _pearson_pvalues(corr, n_obs)
+    elif method == 'kendall':
+        return _kendall_pvalues(corr, n_obs, x_stats, y_stats)
+    else:
+        raise ValueError('Input correlation method [{}] is not available'.format(method))
+
+
+def corr_pvalues(corr, x_values, y_values=None, method='pearson'):
+    """
+    corr_pvalues: two-sided p-values for an (unrounded) coefficient matrix from corr_matrix
+
+    Pearson and Spearman p-values only depend on the coefficients and the number of
+    observations, Kendall p-values also use per variable tie counts
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    n_obs = x_values.shape[1]
+
+    x_stats = y_stats = None
+    if method == 'kendall':
+        if y_values is None:
+            y_values = x_values
+        y_values = np.asarray(y_values, dtype=np.float64)
+        x_stats = [stat[:, np.newaxis] for stat in _tie_stats(x_values)]
+        y_stats = [stat[np.newaxis, :] for stat in _tie_stats(y_values)]
+
+    return _pvalues(corr, method, n_obs, x_stats, y_stats)
+
+
+def symmetric_pvalues(corr, values, method='pearson'):
+    """
+    symmetric_pvalues: p-value matrix for corr_matrix(values), computed on the upper triangle
+                       (including the diagonal) only and mirrored
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_obs = values.shape[1]
+    rows, cols = np.triu_indices(corr.shape[0])
+    upper_corr = corr[rows, cols]
+
+    x_stats = y_stats = None
+    if method == 'kendall':
+        tie_stats = _tie_stats(values)
+        x_stats = [stat[rows] for stat in tie_stats]
+        y_stats = [stat[cols] for stat in tie_stats]
+    upper_pvalues = _pvalues(upper_corr, method, n_obs, x_stats, y_stats)
+
+    pvalues = np.empty(corr.shape, dtype=np.float64)
+    pvalues[rows, cols] = upper_pvalues
+    pvalues[cols, rows] = upper_pvalues
+
+    return pvalues
+
+
+def adjust_pvalues(pvalues, correction='fdr_bh', n_tests=None):
+    """
+    adjust_pvalues: multiple testing adjusted p-values of a flat array of p-values, either
+                    Bonferroni or Benjamini-Hochberg FDR (q-values, computed with a single sort)
+
+    n_tests is the total number of tests, by default the number of (non-NaN) p-values, adjusting
+    a subset of the tests (e.g. only the pairs kept by a threshold) with the total number gives
+    values that are never smaller than those of the full set, NaN p-values stay NaN
+    """
+    if correction not in PVALUE_CORRECTIONS:
+        raise ValueError('Input multiple testing correction [{}] is not available.\n'
+                         'Please choose one of {}'.format(correction, PVALUE_CORRECTIONS))
+
+    pvalues = np.asarray(pvalues, dtype=np.float64).ravel()
+    tested = ~np.isnan(pvalues)
+    tested_pvalues = pvalues[tested]
+    n_tested = tested_pvalues.size
+    n_tests = n_tested if n_tests is None else max(n_tests, n_tested)
+
+    if correction == 'bonferroni':
+        tested_adjusted = tested_pvalues * n_tests
+    else:
+        order = np.argsort(tested_pvalues, kind='mergesort')
+        ranked = tested_pvalues[order] * (n_tests / np.arange(1, n_tested + 1, dtype=np.float64))
+        # q-value of a rank is the smallest p * n_tests / rank over all ranks at or above it
+        ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+        tested_adjusted = np.empty(n_tested, dtype=np.float64)
+        tested_adjusted[order] = ranked
+
+    adjusted = np.full(pvalues.shape, np.nan)
+    adjusted[tested] = np.minimum(tested_adjusted, 1)
+
+    return adjusted
+
+
+def adjust_pvalue_matrix(pvalues, correction='fdr_bh', symmetric=False):
+    """
+    adjust_pvalue_matrix: adjust_pvalues over a p-value matrix, a symmetric matrix counts every
+                          pair once (upper triangle) and keeps the p-values of self pairs on its
+                          diagonal as they are
+    """
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    if not symmetric:
+        return adjust_pvalues(pvalues, correction).reshape(pvalues.shape)
+
+    upper = np.triu(np.ones(pvalues.shape, dtype=bool), k=1)
+    upper_adjusted = adjust_pvalues(pvalues[upper], correction)
+
+    adjusted = pvalues.copy()
+    adjusted[upper] = upper_adjusted
+    adjusted.T[upper] = upper_adjusted
+
+    return adjusted
+
+
+def _iter_pvalue_tiles(pvalues, symmetric, tile_size):
+    """
+    _iter_pvalue_tiles: yield (rows, cols, tile, tested) tiles of an on-disk p-value matrix,
+                        tested masks the p-values counted as tests: not NaN and, for a
+                        symmetric matrix, above the diagonal (only tiles on or above it are read)
+    """
+    n_rows, n_cols = pvalues.shape
+    for row_start in range(0, n_rows, tile_size):
+        rows = slice(row_start, min(row_start + tile_size, n_rows))
+        for col_start in range(row_start if symmetric else 0, n_cols, tile_size):
+            cols = slice(col_start, min(col_start + tile_size, n_cols))
+            tile = np.array(pvalues[rows, cols])
+            tested = ~np.isnan(tile)
+            if symmetric and rows.start == cols.start:
+                tested &= np.triu(np.ones(tile.shape, dtype=bool), k=1)
+
+            yield rows, cols, tile, tested
+
+
+def _bin_groups(counts, group_size):
+    """
+    _bin_groups: (first bin, last bin) ranges of consecutive histogram bins, from the highest
+                 bin down, holding at most group_size values unless a single bin holds more
+    """
+    groups = list()
+    last_bin = len(counts) - 1
+    group_count = 0
+    for bin_index in range(len(counts) - 1, -1, -1):
+        if group_count and group_count + counts[bin_index] > group_size:
+            groups.append((bin_index + 1, last_bin))
+            last_bin = bin_index
+            group_count = 0
+        group_count += counts[bin_index]
+    if group_count:
+        groups.append((0, last_bin))
+
+    return groups
+
+
+def adjust_pvalue_memmap(pvalues, adjusted, correction='fdr_bh', symmetric=False,
+                         tile_size=TILE_SIZE, decimals=4):
+    """
+    adjust_pvalue_memmap: adjust_pvalue_matrix from an on-disk p-value matrix into an on-disk
+                          adjusted matrix (rounded to decimals), reading tile_size x tile_size
+                          tiles instead of the whole matrix
+
+    Benjamini-Hochberg needs the rank of every p-value: a first pass counts the p-values per
+    bin of PVALUE_BIN_EDGES, then bins are ranked in groups of about PVALUE_GROUP_SIZE values
+    from the highest down, each group by one more pass collecting and sorting its p-values,
+    the running minimum of p * n_tests / rank is carried from group to group
+    """
+    if correction not in PVALUE_CORRECTIONS:
+        raise ValueError('Input multiple testing correction [{}] is not available.\n'
+                         'Please choose one of {}'.format(correction, PVALUE_CORRECTIONS))
+
+    # count the tests, untested values (NaN, symmetric diagonal) are copied as they are
+    counts = np.zeros(len(PVALUE_BIN_EDGES) + 1, dtype=np.int64)
+    for rows, cols, tile, tested in _iter_pvalue_tiles(pvalues, symmetric, tile_size):
+        adjusted[rows, cols] = np.round(tile, decimals)
+        if symmetric:
+            adjusted[cols, rows] = np.round(tile.T, decimals)
+        counts += np.bincount(np.searchsorted(PVALUE_BIN_EDGES, tile[tested], side='right'),
+                              minlength=counts.size)
+    n_tests = int(counts.sum())
+
+    def _write(rows, cols, values):
+        values = np.round(np.minimum(values, 1), decimals)
+        adjusted[rows, cols] = values
+        if symmetric:
+            adjusted[cols, rows] = values
+
+    if correction == 'bonferroni':
+        for rows, cols, tile, tested in _iter_pvalue_tiles(pvalues, symmetric, tile_size):
+            tile_rows, tile_cols = np.nonzero(tested)
+            _write(tile_rows + rows.start, tile_cols + cols.start, tile[tested] * n_tests)
+
+        return adjusted
+
+    below = np.concatenate([[0], np.cumsum(counts)])
+    carry = np.inf
+    for first_bin, last_bin in _bin_groups(counts, PVALUE_GROUP_SIZE):
+        low = PVALUE_BIN_EDGES[first_bin - 1] if first_bin > 0 else -np.inf
+        high = PVALUE_BIN_EDGES[last_bin] if last_bin < len(PVALUE_BIN_EDGES) else np.inf
+
+        group_rows, group_cols, group_values = list(), list(), list()
+        for rows, cols, tile, tested in _iter_pvalue_tiles(pvalues, symmetric, tile_size):
+            with np.errstate(invalid='ignore'):
+                in_group = tested & (tile >= low) & (tile < high)
+            tile_rows, tile_cols = np.nonzero(in_group)
+            group_rows.append(tile_rows + rows.start)
+            group_cols.append(tile_cols + cols.start)
+            group_values.append(tile[in_group])
+
+        group_values = np.concatenate(group_values)
+        order = np.argsort(group_values, kind='mergesort')
+        sorted_values = group_values[order]
+        # rank of a p-value: number of p-values at most as large, ties share the highest
+        ranks = below[first_bin] + np.searchsorted(sorted_values, sorted_values, side='right')
+        qvalues = np.minimum.accumulate((sorted_values * (n_tests / ranks))[::-1])[::-1]
+        qvalues = np.minimum(qvalues, carry)
+        if qvalues.size:
+            carry = qvalues[0]
+
+        _write(np.concatenate(group_rows)[order], np.concatenate(group_cols)[order], qvalues)
+
+    return adjusted
+
+
+def _iter_tiles(x_prepared, y_prepared, method, n_obs, symmetric, tile_size,
+                compute_significance, x_stats=None, y_stats=None, row_start=0, row_stop=None):
+    """
+    _iter_tiles: yield (rows, cols, corr, pvalues) tiles for the rows in [row_start, row_stop)
+                 of already prepared inputs
+    """
+    row_stop = x_prepared.shape[0] if row_stop is None else row_stop
+
+    for tile_start in range(row_start, row_stop, tile_size):
+        rows = slice(tile_start, min(tile_start + tile_size, row_stop))
+        col_begin = tile_start if symmetric else 0
+        for col_start in range(col_begin, y_prepared.shape[0], tile_size):
+            cols = slice(col_start, min(col_start + tile_size, y_prepared.shape[0]))
+
+            corr = corr_block(x_prepared[rows], y_prepared[cols], method)
+
+            pvalues = None
+            if compute_significance:
+                tile_x_stats = tile_y_stats = None
+                if x_stats is not None:
+                    tile_x_stats = [stat[rows, np.newaxis] for stat in x_stats]
+                    tile_y_stats = [stat[np.newaxis, cols] for stat in y_stats]
+                pvalues = _pvalues(corr, method, n_obs, tile_x_stats, tile_y_stats)
+
+            yield rows, cols, corr, pvalues
+
+
+def iter_corr_tiles(x_values, y_values=None, method='pearson', tile_size=TILE_SIZE,
+                    compute_significance=False):
+    """
+    iter_corr_tiles: yield (rows, cols, corr, pvalues) tiles of the correlation matrix between
+                     x_values and y_values, rows and cols are slices into the full matrix
+
+    without y_values only the tiles on or above the diagonal of the symmetric matrix are
+    produced, pvalues is None unless compute_significance
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    symmetric = y_values is None
+    y_values = x_values if symmetric else np.asarray(y_values, dtype=np.float64)
+
+    x_prepared = prepare_rows(x_values, method)
+    y_prepared = x_prepared if symmetric else prepare_rows(y_values, method)
+
+    x_stats = y_stats = None
+    if compute_significance and method == 'kendall':
+        x_stats = _tie_stats(x_values)
+        y_stats = x_stats if symmetric else _tie_stats(y_values)
+
+    return _iter_tiles(x_prepared, y_prepared, method, x_values.shape[1], symmetric, tile_size,
+                       compute_significance, x_stats, y_stats)
+
+
+def _write_tiles(tiles, corr_out, sig_out, symmetric, decimals, round_pvalues=True):
+    """
+    _write_tiles: round the tiles and store them (and their mirror image for symmetric
+                  matrices) into the output arrays, p-values are left unrounded for a later
+                  multiple testing adjustment unless round_pvalues
+    """
+    for rows, cols, corr, pvalues in tiles:
+        corr = np.round(corr, decimals)
+        corr_out[rows, cols] = corr
+        if symmetric:
+            corr_out[cols, rows] = corr.T
+        if sig_out is not None:
+            if round_pvalues:
+                pvalues = np.round(pvalues, decimals)
+            sig_out[rows, cols] = pvalues
+            if symmetric:
+                sig_out[cols, rows] = pvalues.T
+
+
+def _open_inputs(work_dir, symmetric):
+    """
+    _open_inputs: memory-map the prepared inputs and tie statistics saved by _save_inputs
+    """
+    def _load(name):
+        path = os.path.join(work_dir, name)
+        return np.load(path, mmap_mode='r') if os.path.exists(path) else None
+
+    x_prepared = _load('x_prepared.npy')
+    y_prepared = x_prepared if symmetric else _load('y_prepared.npy')
+    x_stats = _load('x_stats.npy')
+    y_stats = x_stats if symmetric else _load('y_stats.npy')
+
+    return x_prepared, y_prepared, x_stats, y_stats
+
+
+def _save_inputs(work_dir, x_values, y_values, method, compute_significance):
+    """
+    _save_inputs: prepare the inputs once and save them as .npy files under work_dir so that
+                  worker processes can memory-map them instead of receiving pickled copies
+    """
+    symmetric = y_values is None
+    np.save(os.path.join(work_dir, 'x_prepared.npy'), prepare_rows(x_values, method))
+    if not symmetric:
+        np.save(os.path.join(work_dir, 'y_prepared.npy'), prepare_rows(y_values, method))
+
+    if compute_significance and method == 'kendall':
+        np.save(os.path.join(work_dir, 'x_stats.npy'), np.array(_tie_stats(x_values)))
+        if not symmetric:
+            np.save(os.path.join(work_dir, 'y_stats.npy'), np.array(_tie_stats(y_values)))
+
+
+def _corr_rows_worker(task):
+    """
+    _corr_rows_worker: compute one row block in a worker process, inputs and outputs are
+                       shared through memory-mapped .npy files so only paths are pickled
+    """
+    (work_dir, method, n_obs, symmetric, tile_size, corr_path, sig_path, decimals,
+     round_pvalues, row_start, row_stop) = task
+
+    x_prepared, y_prepared, x_stats, y_stats = _open_inputs(work_dir, symmetric)
+
+    corr_out = np.load(corr_path, mmap_mode='r+')
+    sig_out = np.load(sig_path, mmap_mode='r+') if sig_path else None
+
+    tiles = _iter_tiles(x_prepared, y_prepared, method, n_obs, symmetric, tile_size,
+                        bool(sig_path), x_stats, y_stats, row_start, row_stop)
+    _write_tiles(tiles, corr_out, sig_out, symmetric, decimals, round_pvalues)
+
+    corr_out.flush()
+    if sig_out is not None:
+        sig_out.flush()
+
+    return row_start, row_stop
+
+
+def _row_blocks(n_rows, tile_size, n_workers):
+    """
+    _row_blocks: split n_rows into (start, stop) blocks, small enough to give every worker
+                 several blocks but never larger than tile_size
+    """
+    block_size = int(math.ceil(n_rows / float(n_workers * BLOCKS_PER_WORKER)))
+    block_size = max(1, min(tile_size, block_size))
+
+    return [(start, min(start + block_size, n_rows)) for start in range(0, n_rows, block_size)]
+
+
+def corr_to_memmap(x_values, y_values=None, method='pearson', corr_path=None, sig_path=None,
+                   tile_size=TILE_SIZE, decimals=4, n_workers=1, correction=None,
+                   adjusted_path=None):
+    """
+    corr_to_memmap: compute the correlation matrix (and p-values if sig_path is given) tile by
+                    tile straight into memory-mapped .npy files
+
+    peak memory is bounded by the prepared inputs plus a few tile_size x tile_size blocks, the
+    multiple testing correction of the p-values (written to adjusted_path) is computed out of
+    core by adjust_pvalue_memmap
+
+    with n_workers > 1 the rows are split into blocks computed by a process pool, the prepared
+    inputs are saved to a temporary directory next to corr_path (removed afterwards) and
+    memory-mapped by the workers, which write their blocks directly into the shared output files
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    symmetric = y_values is None
+    if not symmetric:
+        y_values = np.asarray(y_values, dtype=np.float64)
+    shape = (x_values.shape[0], x_values.shape[0] if symmetric else y_values.shape[0])
+
+    corr_out = np.lib.format.open_memmap(corr_path, mode='w+', dtype=np.float64, shape=shape)
+    sig_out = None
+    if sig_path:
+        sig_out = np.lib.format.open_memmap(sig_path, mode='w+', dtype=np.float64, shape=shape)
+    adjust = sig_out is not None and bool(adjusted_path)
+
+    if n_workers > 1 and shape[0] > 1:
+        input_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(corr_path)))
+        try:
+            _save_inputs(input_dir, x_values, y_values, method, bool(sig_path))
+
+            tasks = [(input_dir, method, x_values.shape[1], symmetric, tile_size, corr_path,
+                      sig_path, decimals, not adjust, row_start, row_stop)
+                     for row_start, row_stop in _row_blocks(shape[0], tile_size, n_workers)]
+
+            pool = multiprocessing.Pool(processes=min(n_workers, len(tasks)))
+            try:
+                for _ in pool.imap_unordered(_corr_rows_worker, tasks):
+                    pass
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            shutil.rmtree(input_dir, ignore_errors=True)
+    else:
+        tiles = iter_corr_tiles(x_values, y_values, method=method, tile_size=tile_size,
+                                compute_significance=bool(sig_path))
+        _write_tiles(tiles, corr_out, sig_out, symmetric, decimals, not adjust)
+
+    if adjust:
+        adjusted_out = np.lib.format.open_memmap(adjusted_path, mode='w+', dtype=np.float64,
+                                                 shape=shape)
+        adjust_pvalue_memmap(sig_out, adjusted_out, correction, symmetric, tile_size, decimals)
+        adjusted_out.flush()
+        for row_start in range(0, shape[0], tile_size):
+            for col_start in range(0, shape[1], tile_size):
+                tile = (slice(row_start, row_start + tile_size),
+                        slice(col_start, col_start + tile_size))
+                sig_out[tile] = np.round(sig_out[tile], decimals)
+
+    corr_out.flush()
+    if sig_out is not None:
+        sig_out.flush()
+
+    return corr_out, sig_out
+
+
+def _filter_tile(rows, cols, corr, pvalues, threshold, symmetric, decimals):
+    """
+    _filter_tile: (row_index, col_index, coefficient, significance) of the pairs in a tile with
+                  an absolute coefficient of at least threshold, symmetric matrices only keep
+                  pairs above the diagonal
+
+    significance is left unrounded, see _finish_pairs
+    """
+    corr = np.round(corr, decimals)
+    with np.errstate(invalid='ignore'):
+        mask = np.abs(corr) >= threshold
+    if symmetric and rows.start == cols.start:
+        mask &= np.triu(np.ones(mask.shape, dtype=bool), k=1)
+
+    row_index, col_index = np.nonzero(mask)
+    significance = None
+    if pvalues is not None:
+        significance = pvalues[mask]
+
+    return row_index + rows.start, col_index + cols.start, corr[mask], significance
+
+
+def _concat_pairs(pairs, compute_significance):
+    """
+    _concat_pairs: merge filtered tile pairs into a single dict of arrays sorted by row and
+                   column index
+    """
+    pairs = list(pairs)
+    empty = np.empty(0)
+
+    row_index = np.concatenate([p[0] for p in pairs] + [empty.astype(np.intp)])
+    col_index = np.concatenate([p[1] for p in pairs] + [empty.astype(np.intp)])
+    order = np.lexsort((col_index, row_index))
+
+    result = {'row_index': row_index[order],
+              'col_index': col_index[order],
+              'coefficient': np.concatenate([p[2] for p in pairs] + [empty])[order],
+              'significance': None}
+    if compute_significance:
+        result['significance'] = np.concatenate([p[3] for p in pairs] + [empty])[order]
+
+    return result
+
+
+def _finish_pairs(pairs, correction, n_tests, decimals, pair_keys=None):
+    """
+    _finish_pairs: add the multiple testing adjusted significance (None without correction or
+                   significance) of the pairs out of n_tests tests and round the significance
+
+    pairs with the same pair_keys (a symmetric pair listed for both of its variables) are
+    counted once in the adjustment
+    """
+    significance = pairs['significance']
+    pairs['adjusted_significance'] = None
+    if significance is None:
+        return pairs
+
+    if correction:
+        if pair_keys is None:
+            adjusted = adjust_pvalues(significance, correction, n_tests)
+        else:
+            _, first, inverse = np.unique(pair_keys, return_index=True, return_inverse=True)
+            adjusted = adjust_pvalues(significance[first], correction, n_tests)[inverse]
+        pairs['adjusted_significance'] = np.round(adjusted, decimals)
+    pairs['significance'] = np.round(significance, decimals)
+
+    return pairs
+
+
+def _n_tests(x_values, y_values=None):
+    """
+    _n_tests: number of tested pairs of the correlation matrix between x_values and y_values
+              (or x_values itself), pairs of a constant variable have no p-value
+    """
+    n_rows = int(np.count_nonzero(np.ptp(x_values, axis=1)))
+    if y_values is None:
+        return n_rows * (n_rows - 1) // 2
+
+    return n_rows * int(np.count_nonzero(np.ptp(y_values, axis=1)))
+
+
+def _corr_pairs_worker(task):
+    """
+    _corr_pairs_worker: filter the pairs of one row block in a worker process, only the kept
+                        pairs are sent back
+    """
+    (work_dir, method, n_obs, symmetric, tile_size, compute_significance, threshold, decimals,
+     row_start, row_stop) = task
+
+    x_prepared, y_prepared, x_stats, y_stats = _open_inputs(work_dir, symmetric)
+
+    tiles = _iter_tiles(x_prepared, y_prepared, method, n_obs, symmetric, tile_size,
+                        compute_significance, x_stats, y_stats, row_start, row_stop)
+
+    return _concat_pairs((_filter_tile(rows, cols, corr, pvalues, threshold, symmetric,
+                                       decimals)
+                          for rows, cols, corr, pvalues in tiles), compute_significance)
+
+
+def corr_pairs(x_values, y_values=None, method='pearson', threshold=0,
+               compute_significance=False, tile_size=TILE_SIZE, decimals=4, n_workers=1,
+               work_dir=None, correction=None):
+    """
+    corr_pairs: sparse correlation, every tile is filtered as soon as it is computed and only
+                the pairs with an absolute coefficient of at least threshold are kept, so memory
+                grows with the number of kept pairs instead of the size of the matrix
+
+    returns a dict of row_index, col_index, coefficient and significance (None unless
+    compute_significance) arrays, a symmetric matrix (no y_values) only reports each pair once
+    with row_index < col_index
+
+    adjusted_significance holds the significance adjusted by correction for all the tested
+    pairs (None unless both are given), which is conservative for the dropped pairs
+
+    with n_workers > 1 row blocks are filtered by a process pool reading the prepared inputs
+    from a temporary directory under work_dir
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    symmetric = y_values is None
+    if not symmetric:
+        y_values = np.asarray(y_values, dtype=np.float64)
+    n_tests = _n_tests(x_values, y_values)
+
+    if n_workers > 1 and x_values.shape[0] > 1:
+        input_dir = tempfile.mkdtemp(dir=work_dir)
+        try:
+            _save_inputs(input_dir, x_values, y_values, method, compute_significance)
+
+            tasks = [(input_dir, method, x_values.shape[1], symmetric, tile_size,
+                      compute_significance, threshold, decimals, row_start, row_stop)
+                     for row_start, row_stop in _row_blocks(x_values.shape[0], tile_size,
+                                                            n_workers)]
+
+            pool = multiprocessing.Pool(processes=min(n_workers, len(tasks)))
+            try:
+                block_pairs = pool.map(_corr_pairs_worker, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            shutil.rmtree(input_dir, ignore_errors=True)
+
+        pairs = _concat_pairs(([p['row_index'], p['col_index'], p['coefficient'],
+                                p['significance']] for p in block_pairs), compute_significance)
+    else:
+        tiles = iter_corr_tiles(x_values, y_values, method=method, tile_size=tile_size,
+                                compute_significance=compute_significance)
+        pairs = _concat_pairs((_filter_tile(rows, cols, corr, pvalues, threshold, symmetric,
+                                            decimals)
+                               for rows, cols, corr, pvalues in tiles), compute_significance)
+
+    return _finish_pairs(pairs, correction, n_tests, decimals)
+
+
+def _merge_top_k(best_corr, best_cols, corr, cols, k):
+    """
+    _merge_top_k: keep the k coefficients with the largest absolute value per row out of the
+                  current best and a new block of coefficients for the columns cols
+
+    NaN coefficients never win over a number, empty slots hold NaN with column -1
+    """
+    cand_corr = np.hstack([best_corr, corr])
+    cand_cols = np.hstack([best_cols, np.broadcast_to(cols, corr.shape)])
+
+    key = np.abs(cand_corr)
+    key[np.isnan(key)] = -1
+    picked = np.argpartition(-key, k - 1, axis=1)[:, :k]
+    row_picker = np.arange(cand_corr.shape[0])[:, np.newaxis]
+
+    return cand_corr[row_picker, picked], cand_cols[row_picker, picked]
+
+
+def _mask_self(rows, cols, corr):
+    """
+    _mask_self: set the coefficients of a variable with itself to NaN in a tile of a symmetric
+                matrix
+    """
+    start, stop = max(rows.start, cols.start), min(rows.stop, cols.stop)
+    if start < stop:
+        diagonal = np.arange(start, stop)
+        corr[diagonal - rows.start, diagonal - cols.start] = np.nan
+
+    return corr
+
+
+def _top_k_rows(x_prepared, y_prepared, method, k, symmetric, tile_size, row_start=0,
+                row_stop=None):
+    """
+    _top_k_rows: stream the tiles of rows [row_start, row_stop) against every column and keep
+                 the k strongest coefficients of each row
+    """
+    row_stop = x_prepared.shape[0] if row_stop is None else row_stop
+    n_cols = y_prepared.shape[0]
+
+    best_corr = np.full((row_stop - row_start, k), np.nan)
+    best_cols = np.full((row_stop - row_start, k), -1, dtype=np.intp)
+
+    for tile_start in range(row_start, row_stop, tile_size):
+        rows = slice(tile_start, min(tile_start + tile_size, row_stop))
+        local = slice(rows.start - row_start, rows.stop - row_start)
+        for col_start in range(0, n_cols, tile_size):
+            cols = slice(col_start, min(col_start + tile_size, n_cols))
+            corr = corr_block(x_prepared[rows], y_prepared[cols], method)
+            if symmetric:
+                corr = _mask_self(rows, cols, corr)
+            best_corr[local], best_cols[local] = _merge_top_k(
+                                                    best_corr[local], best_cols[local], corr,
+                                                    np.arange(cols.start, cols.stop), k)
+
+    return best_corr, best_cols
+
+
+def _top_k_symmetric(x_prepared, method, k, tile_size):
+    """
+    _top_k_symmetric: top k of every row of a symmetric matrix, only the tiles on or above the
+                      diagonal are computed and each one also updates the rows of its mirror
+    """
+    n_rows = x_prepared.shape[0]
+    best_corr = np.full((n_rows, k), np.nan)
+    best_cols = np.full((n_rows, k), -1, dtype=np.intp)
+
+    for row_start in range(0, n_rows, tile_size):
+        rows = slice(row_start, min(row_start + tile_size, n_rows))
+        for col_start in range(row_start, n_rows, tile_size):
+            cols = slice(col_start, min(col_start + tile_size, n_rows))
+            corr = _mask_self(rows, cols, corr_block(x_prepared[rows], x_prepared[cols],
+                                                     method))
+
+            best_corr[rows], best_cols[rows] = _merge_top_k(
+                                                    best_corr[rows], best_cols[rows], corr,
+                                                    np.arange(cols.start, cols.stop), k)
+            if col_start != row_start:
+                best_corr[cols], best_cols[cols] = _merge_top_k(
+                                                    best_corr[cols], best_cols[cols], corr.T,
+                                                    np.arange(rows.start, rows.stop), k)
+
+    return best_corr, best_cols
+
+
+def _top_k_worker(task):
+    """
+    _top_k_worker: top k of one row block in a worker process, inputs are memory-mapped from
+                   the files saved by _save_inputs
+    """
+    work_dir, method, k, symmetric, tile_size, row_start, row_stop = task
+
+    x_prepared, y_prepared, _, _ = _open_inputs(work_dir, symmetric)
+
+    return _top_k_rows(x_prepared, y_prepared, method, k, symmetric, tile_size, row_start,
+                       row_stop)
+
+
+def corr_top_k(x_values, y_values=None, method='pearson', k=10, compute_significance=False,
+               tile_size=TILE_SIZE, decimals=4, n_workers=1, work_dir=None, correction=None):
+    """
+    corr_top_k: the k partners with the strongest (absolute) correlation of every row variable,
+                tiles are streamed through a running top k per row so memory is O(N * k)
+
+    returns a dict of row_index, col_index, coefficient and significance (None unless
+    compute_significance) arrays ordered by row and decreasing strength, without y_values a
+    variable is never its own partner
+
+    adjusted_significance holds the significance adjusted by correction for all the tested
+    pairs (None unless both are given), a pair kept for both of its variables counts once
+
+    with n_workers > 1 row blocks are handled by a process pool reading the prepared inputs
+    from a temporary directory under work_dir
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    symmetric = y_values is None
+    if not symmetric:
+        y_values = np.asarray(y_values, dtype=np.float64)
+    n_cols = x_values.shape[0] if symmetric else y_values.shape[0]
+    k = max(1, min(k, n_cols - 1 if symmetric else n_cols))
+
+    if n_workers > 1 and x_values.shape[0] > 1:
+        input_dir = tempfile.mkdtemp(dir=work_dir)
+        try:
+            _save_inputs(input_dir, x_values, y_values, method, False)
+
+            tasks = [(input_dir, method, k, symmetric, tile_size, row_start, row_stop)
+                     for row_start, row_stop in _row_blocks(x_values.shape[0], tile_size,
+                                                            n_workers)]
+
+            pool = multiprocessing.Pool(processes=min(n_workers, len(tasks)))
+            try:
+                block_top_k = pool.map(_top_k_worker, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            shutil.rmtree(input_dir, ignore_errors=True)
+
+        best_corr = np.vstack([block[0] for block in block_top_k])
+        best_cols = np.vstack([block[1] for block in block_top_k])
+    else:
+        x_prepared = prepare_rows(x_values, method)
+        if symmetric:
+            best_corr, best_cols = _top_k_symmetric(x_prepared, method, k, tile_size)
+        else:
+            best_corr, best_cols = _top_k_rows(x_prepared, prepare_rows(y_values, method),
+                                               method, k, False, tile_size)
+
+    # order every row by decreasing strength, ties by column
+    key = np.abs(best_corr)
+    key[np.isnan(key)] = -1
+    order = np.lexsort((best_cols, -key), axis=1)
+    row_picker = np.arange(best_corr.shape[0])[:, np.newaxis]
+    best_corr, best_cols = best_corr[row_picker, order], best_cols[row_picker, order]
+
+    kept = ~np.isnan(best_corr)
+    row_index = np.nonzero(kept)[0]
+    col_index = best_cols[kept]
+    coefficient = best_corr[kept]
+
+    significance = None
+    if compute_significance:
+        x_stats = y_stats = None
+        if method == 'kendall':
+            x_stats = [stat[row_index] for stat in _tie_stats(x_values)]
+            y_stats = [stat[col_index] for stat in _tie_stats(x_values if symmetric
+                                                              else y_values)]
+        significance = _pvalues(coefficient, method, x_values.shape[1], x_stats, y_stats)
+
+    pairs = {'row_index': row_index,
+             'col_index': col_index,
+             'coefficient': np.round(coefficient, decimals),
+             'significance': significance}
+
+    pair_keys = None
+    if symmetric:
+        pair_keys = (np.minimum(row_index, col_index) * n_cols +
+                     np.maximum(row_index, col_index))
+
+    return _finish_pairs(pairs, correction, _n_tests(x_values, y_values), decimals,
+                         pair_keys=pair_keys)
+
+
+def comoment_stats(values):
+    """
+    comoment_stats: sufficient statistics of the Pearson correlation between the rows of values,
+                    (number of observations, row means, co-moment matrix of centered
+                    cross-products whose diagonal holds the centered sums of squares)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_obs = values.shape[1]
+    if not n_obs:
+        return 0, np.zeros(values.shape[0]), np.zeros((values.shape[0], values.shape[0]))
+
+    means = values.mean(axis=1)
+    # exact means for constant rows so that their co-moments stay exactly 0 when merged
+    constant = np.ptp(values, axis=1) == 0
+    means[constant] = values[constant, 0]
+
+    centered = values - means[:, np.newaxis]
+
+    return n_obs, means, centered.dot(centered.T)
+
+
+def merge_comoment_stats(stats_a, stats_b):
+    """
+    merge_comoment_stats: combine the comoment_stats of two disjoint sets of observations of the
+                          same variables (pairwise update of Chan, Golub and LeVeque), costs
+                          O(N^2) on top of computing the statistics of the new observations
+    """
+    n_a, means_a, comoments_a = stats_a
+    n_b, means_b, comoments_b = stats_b
+    if not n_a:
+        return n_b, np.array(means_b, dtype=np.float64), np.array(comoments_b, dtype=np.float64)
+    if not n_b:
+        return n_a, np.array(means_a, dtype=np.float64), np.array(comoments_a, dtype=np.float64)
+
+    n_obs = n_a + n_b
+    delta = np.asarray(means_b, dtype=np.float64) - means_a
+    means = means_a + delta * (n_b / float(n_obs))
+
+    comoments = np.add(comoments_a, comoments_b, dtype=np.float64)
+    comoments += np.outer(delta, delta * (n_a * n_b / float(n_obs)))
+
+    return n_obs, means, comoments
+
+
+def comoment_corr(comoments):
+    """
+    comoment_corr: Pearson coefficients from a co-moment matrix, NaN for constant variables
+    """
+    comoments = np.asarray(comoments, dtype=np.float64)
+    sums_of_squares = np.diag(comoments).copy()
+    sums_of_squares[sums_of_squares <= 0] = np.nan
+    scale = np.sqrt(sums_of_squares)
+
+    corr = comoments / scale[:, np.newaxis]
+    corr /= scale[np.newaxis, :]
+
+    return np.clip(corr, -1, 1, out=corr)
+
+
+def comoment_pvalues(corr, n_obs):
+    """
+    comoment_pvalues: two-sided p-values of Pearson coefficients computed from n_obs observations
+    """
+    return _pearson_pvalues(np.asarray(corr, dtype=np.float64), n_obs)
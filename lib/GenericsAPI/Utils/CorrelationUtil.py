@@ -6,19 +6,25 @@ import shutil
 import traceback
 import uuid
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
 from matplotlib import pyplot as plt
 from plotly.offline import plot
-from scipy import stats
 from natsort import natsorted
 
 from installed_clients.DataFileUtilClient import DataFileUtil
+from GenericsAPI.Utils import CorrelationEngine
+from GenericsAPI.Utils import JSONStream
 from GenericsAPI.Utils.DataUtil import DataUtil
+from GenericsAPI.Utils.ObjectCache import ObjectCache
 from installed_clients.KBaseReportClient import KBaseReport
 
 CORR_METHOD = ['pearson', 'kendall', 'spearman']  # correlation method
 HIDDEN_SEARCH_THRESHOLD = 1500
+DENSE_MATRIX_MAX_SIZE = 10 ** 7  # most values of a dense matrix saved in a CorrelationMatrix
+# AmpliconSet paths read for taxonomy, the sequences are left on the server
+TAXONOMY_PATHS = ['/amplicons/*/taxonomy/scientific_name', '/amplicons/*/taxonomy/taxon_level']
 
 
 class CorrelationUtil:
@@ -63,12 +69,98 @@ class CorrelationUtil:
             if p not in params:
                 raise ValueError('"{}" parameter is required, but missing'.format(p))
 
+    @staticmethod
+    def _get_positive_int(params, name):
+        """
+        _get_positive_int: optional positive integer parameter, None if not given
+        """
+        value = params.get(name)
+        if not value:
+            return None
+
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError('{} must be a positive integer'.format(name))
+
+        if value <= 0:
+            raise ValueError('{} must be a positive integer'.format(name))
+
+        return value
+
+    def _get_tiling_params(self, params):
+        """
+        _get_tiling_params: tile size (None for in-memory computation) and number of worker
+                            processes, running on more than one worker implies tiled mode
+        """
+        tile_size = self._get_positive_int(params, 'tile_size')
+        n_workers = self._get_positive_int(params, 'n_workers') or 1
+
+        if n_workers > 1 and not tile_size:
+            tile_size = CorrelationEngine.TILE_SIZE
+
+        return tile_size, n_workers
+
+    def _get_kendall_sampling_params(self, params, method):
+        """
+        _get_kendall_sampling_params: number of samples to approximate Kendall correlation on
+                                      (None for exact computation) and random seed
+        """
+        sample_size = self._get_positive_int(params, 'kendall_sample_size')
+        if sample_size is None:
+            return None, None
+
+        if method != 'kendall':
+            raise ValueError('kendall_sample_size is only available for kendall correlation')
+        if sample_size < 2:
+            raise ValueError('kendall_sample_size must be at least 2')
+
+        random_seed = params.get('random_seed')
+        if random_seed is not None:
+            random_seed = int(random_seed)
+
+        return sample_size, random_seed
+
+    def _subsample_observations(self, variable_df, sample_size, random_seed=None):
+        """
+        _subsample_observations: keep a random subset of sample_size observations (columns) of
+                                 a variable df to approximate Kendall correlation on wide data
+        """
+        if not sample_size or sample_size >= variable_df.shape[1]:
+            return variable_df
+
+        indices = CorrelationEngine.kendall_subsample(variable_df.shape[1], sample_size,
+                                                      random_seed=random_seed)
+        logging.info('approximating Kendall correlation on [{}] of [{}] samples, error bound '
+                     '{:.4f} with probability {}'.format(
+                                        sample_size, variable_df.shape[1],
+                                        CorrelationEngine.kendall_error_bound(sample_size),
+                                        1 - CorrelationEngine.KENDALL_BOUND_DELTA))
+
+        return variable_df.iloc[:, indices]
+
+    def _kendall_sampling_parameters(self, sample_size, random_seed):
+        """
+        _kendall_sampling_parameters: correlation_parameters entries of approximate Kendall
+        """
+        if not sample_size:
+            return {}
+
+        parameters = {'kendall_sample_size': str(sample_size),
+                      'kendall_error_bound': '{:.4f}'.format(
+                                            CorrelationEngine.kendall_error_bound(sample_size)),
+                      'kendall_error_probability': str(CorrelationEngine.KENDALL_BOUND_DELTA)}
+        if random_seed is not None:
+            parameters['random_seed'] = str(random_seed)
+
+        return parameters
+
     def _fetch_taxon(self, amplicon_set_ref, amplicon_ids):
         logging.info('start fetching taxon info from AmpliconSet')
         taxons = dict()
         taxons_level = dict()
-        amplicon_set_data = self.dfu.get_objects(
-                                            {'object_refs': [amplicon_set_ref]})['data'][0]['data']
+        amplicon_set_data = self.object_cache.get_subobject(amplicon_set_ref,
+                                                            TAXONOMY_PATHS)['data']
 
         amplicons = amplicon_set_data.get('amplicons')
 
@@ -97,34 +189,110 @@ class CorrelationUtil:
 
         return taxons, taxons_level
 
-    def _build_table_content(self, matrix_2D, output_directory, original_matrix_ref=[],
-                             type='corr'):
+    def _matrix_links(self, matrix_df, display_df=None, display_threshold=None):
+        """
+        _matrix_links: links data frames of a stacked (transposed) FloatMatrix2D data frame, a
+                       block of columns at a time
+
+        display_df: data frame aligned with matrix_df (default matrix_df), only the links with an
+                    absolute display_df value of at least display_threshold are kept
+        """
+        if display_df is None:
+            display_df = matrix_df
+        row_ids = np.asarray(matrix_df.index, dtype=object)
+
+        block_size = max(1, JSONStream.ROW_CHUNK // max(1, matrix_df.shape[0]))
+        for start in range(0, matrix_df.shape[1], block_size):
+            block = matrix_df.iloc[:, start:start + block_size]
+            values = block.values.T
+            keep = ~pd.isnull(values)
+            if display_threshold is not None:
+                display_values = np.abs(display_df.iloc[:, start:start + block_size].values.T)
+                keep &= display_values >= display_threshold
+
+            col_index, row_index = np.nonzero(keep)
+            yield pd.DataFrame({'col_id': np.asarray(block.columns, dtype=object)[col_index],
+                                'row_id': row_ids[row_index],
+                                'value': values[keep]},
+                               columns=['col_id', 'row_id', 'value'])
+
+    def _build_table_content(self, matrix_df, output_directory, original_matrix_ref=[],
+                             type='corr', display_df=None, display_threshold=None):
+        """
+        _build_table_content: generate HTML table content for FloatMatrix2D data frame
+
+        display_df/display_threshold: see _matrix_links
+        """
+        col_ids = matrix_df.columns.tolist()
+
+        links_chunks = self._matrix_links(matrix_df, display_df=display_df,
+                                          display_threshold=display_threshold)
+
+        return self._build_links_table_content(links_chunks, col_ids, output_directory,
+                                               original_matrix_ref=original_matrix_ref,
+                                               type=type)
+
+    def _pairs_to_links(self, pair_data, key='coefficient', display_threshold=None):
         """
-        _build_table_content: generate HTML table content for FloatMatrix2D object
+        _pairs_to_links: convert sparse CorrelationPairs data into a links data frame with the
+                         same columns as a stacked (transposed) FloatMatrix2D data frame
+
+        display_threshold: only keep the pairs with an absolute coefficient of at least
+                           display_threshold
+        """
+        row_ids = np.asarray(pair_data['row_ids'], dtype=object)
+        col_ids = np.asarray(pair_data['col_ids'], dtype=object)
+
+        links = pd.DataFrame({'col_id': col_ids[np.asarray(pair_data['col_index'], dtype=int)],
+                              'row_id': row_ids[np.asarray(pair_data['row_index'], dtype=int)],
+                              'value': pair_data[key]},
+                             columns=['col_id', 'row_id', 'value'])
+
+        if display_threshold is not None:
+            coefficient = np.abs(np.asarray(pair_data['coefficient'], dtype=float))
+            links = links[coefficient >= display_threshold]
+
+        return links
+
+    def _links_table_rows(self, links_chunks, columns, taxons=None, taxons_level=None):
+        """
+        _links_table_rows: table rows of every links data frame, without self-comparisons
+        """
+        for links in links_chunks:
+            # remove self-comparison
+            links = links[links.iloc[:, 0] != links.iloc[:, 1]]
+            links.columns = columns
+
+            if taxons:
+                links['Taxon'] = links.iloc[:, 0].map(taxons)
+
+            if taxons_level:
+                links['Taxon Level'] = links.iloc[:, 0].map(taxons_level)
+
+            yield links.values.tolist()
+
+    def _build_links_table_content(self, links_chunks, col_ids, output_directory,
+                                   original_matrix_ref=[], type='corr'):
+        """
+        _build_links_table_content: generate HTML table content for links data frames, streamed
+                                    chunk by chunk to fixed-size page files the table loads on
+                                    demand
         """
 
         page_content = """\n"""
 
         table_file_name = '{}_table.html'.format(type)
-        data_file_name = '{}_data.json'.format(type)
+        data_file_name = '{}_index.json'.format(type)
 
         page_content += """<iframe height="900px" width="100%" """
         page_content += """src="{}" """.format(table_file_name)
         page_content += """style="border:none;"></iframe>\n"""
 
-        row_ids = matrix_2D.get('row_ids')
-        col_ids = matrix_2D.get('col_ids')
-        values = matrix_2D.get('values')
-
-        df = pd.DataFrame(values, index=row_ids, columns=col_ids)
-        df = df.T
-        links = df.stack().reset_index()
-
         columns = list()
         taxons = None
         taxons_level = None
         if len(original_matrix_ref) == 1:
-            res = self.dfu.get_objects({'object_refs': [original_matrix_ref[0]]})['data'][0]
+            res = self.object_cache.get_subobject(original_matrix_ref[0], ['/amplicon_set_ref'])
             obj_type = res['info'][2]
             matrix_type = obj_type.split('Matrix')[0].split('.')[-1]
             if matrix_type == 'Amplicon':
@@ -134,7 +302,7 @@ class CorrelationUtil:
             columns.extend(['{} 1'.format(matrix_type), '{} 2'.format(matrix_type)])
         elif len(original_matrix_ref) == 2:
             for matrix_ref in original_matrix_ref[::-1]:
-                res = self.dfu.get_objects({'object_refs': [matrix_ref]})['data'][0]
+                res = self.object_cache.get_subobject(matrix_ref, ['/amplicon_set_ref'])
                 obj_type = res['info'][2]
                 matrix_type = obj_type.split('Matrix')[0].split('.')[-1]
                 if matrix_type == 'Amplicon':
@@ -143,10 +311,7 @@ class CorrelationUtil:
                         taxons, taxons_level = self._fetch_taxon(amplicon_set_ref, col_ids)
                 columns.append(matrix_type)
         else:
-            links.columns = ['Variable 1', 'Variable 2']
-
-        # remove self-comparison
-        links = links[links.iloc[:, 0] != links.iloc[:, 1]]
+            columns.extend(['Variable 1', 'Variable 2'])
 
         if type == 'corr':
             columns.append('Correlation')
@@ -155,15 +320,12 @@ class CorrelationUtil:
         else:
             columns.append('Value')
 
-        links.columns = columns
-
+        table_headers = list(columns)
         if taxons:
-            links['Taxon'] = links.iloc[:, 0].map(taxons)
-
+            table_headers.append('Taxon')
         if taxons_level:
-            links['Taxon Level'] = links.iloc[:, 0].map(taxons_level)
+            table_headers.append('Taxon Level')
 
-        table_headers = links.columns.tolist()
         table_content = """\n"""
         # build header and footer
         table_content += """\n<thead>\n<tr>\n"""
@@ -176,17 +338,13 @@ class CorrelationUtil:
             table_content += """\n <th>{}</th>\n""".format(table_header)
         table_content += """\n</tr>\n</tfoot>\n"""
 
-        logging.info('start generating table json file')
-        data_array = links.values.tolist()
-
-        total_rec = len(data_array)
-        json_dict = {'draw': 1,
-                     'recordsTotal': total_rec,
-                     'recordsFiltered': total_rec,
-                     'data': data_array}
-
-        with open(os.path.join(output_directory, data_file_name), 'w') as fp:
-            json.dump(json_dict, fp)
+        logging.info('start generating table json pages')
+        index = JSONStream.write_pages(output_directory, type,
+                                       self._links_table_rows(links_chunks, columns,
+                                                              taxons, taxons_level),
+                                       order=(2, 'desc'))
+        logging.info('wrote [{}] table rows to [{}] pages'.format(index['n_rows'],
+                                                                  len(index['pages'])))
 
         logging.info('start generating table html')
         with open(os.path.join(output_directory, table_file_name), 'w') as result_file:
@@ -197,14 +355,14 @@ class CorrelationUtil:
                                                           table_content)
                 report_template = report_template.replace('ajax_file_path',
                                                           data_file_name)
-                report_template = report_template.replace('deferLoading_size',
-                                                          str(total_rec))
                 result_file.write(report_template)
 
         return page_content
 
     def _generate_visualization_content(self, output_directory, corr_matrix_obj_ref,
-                                        corr_matrix_plot_path, scatter_plot_path):
+                                        corr_matrix_plot_path, scatter_plot_path,
+                                        corr_df=None, sig_df=None, original_matrix_ref=None,
+                                        pair_data=None, display_threshold=None):
 
         """
         <div class="tab">
@@ -218,30 +376,60 @@ class CorrelationUtil:
         tab_def_content = ''
         tab_content = ''
 
-        corr_data = self.dfu.get_objects({'object_refs': [corr_matrix_obj_ref]})['data'][0]['data']
+        if corr_df is None and pair_data is None:
+            corr_data = self.object_cache.get_object(corr_matrix_obj_ref)['data']
 
-        coefficient_data = corr_data.get('coefficient_data')
-        significance_data = corr_data.get('significance_data')
-        original_matrix_ref = corr_data.get('original_matrix_ref')
+            coefficient_data = corr_data.get('coefficient_data')
+            if coefficient_data:
+                corr_df = self._Matrix2D_to_df(coefficient_data)
+                significance_data = corr_data.get('significance_data')
+                if significance_data:
+                    sig_df = self._Matrix2D_to_df(significance_data)
+            else:
+                pair_data = corr_data.get('pair_data')
+            original_matrix_ref = corr_data.get('original_matrix_ref')
+
+        if pair_data is not None:
+            corr_table_content = self._build_links_table_content(
+                                            [self._pairs_to_links(
+                                                pair_data, display_threshold=display_threshold)],
+                                            pair_data['col_ids'], output_directory,
+                                            original_matrix_ref=original_matrix_ref,
+                                            type='corr')
+            sig_table_content = None
+            if pair_data.get('significance') is not None:
+                sig_table_content = self._build_links_table_content(
+                                            [self._pairs_to_links(
+                                                pair_data, key='significance',
+                                                display_threshold=display_threshold)],
+                                            pair_data['col_ids'], output_directory,
+                                            original_matrix_ref=original_matrix_ref,
+                                            type='sig')
+        else:
+            corr_table_content = self._build_table_content(corr_df, output_directory,
+                                                           original_matrix_ref=original_matrix_ref,
+                                                           type='corr',
+                                                           display_threshold=display_threshold)
+            sig_table_content = None
+            if sig_df is not None:
+                sig_table_content = self._build_table_content(
+                                            sig_df, output_directory,
+                                            original_matrix_ref=original_matrix_ref,
+                                            type='sig', display_df=corr_df,
+                                            display_threshold=display_threshold)
 
         tab_def_content += """
         <div class="tab">
             <button class="tablinks" onclick="openTab(event, 'CorrelationMatrix')" id="defaultOpen">Correlation Matrix</button>
         """
 
-        corr_table_content = self._build_table_content(coefficient_data, output_directory,
-                                                       original_matrix_ref=original_matrix_ref,
-                                                       type='corr')
         tab_content += """
         <div id="CorrelationMatrix" class="tabcontent">{}</div>""".format(corr_table_content)
 
-        if significance_data:
+        if sig_table_content is not None:
             tab_def_content += """
             <button class="tablinks" onclick="openTab(event, 'SignificanceMatrix')">Significance Matrix</button>
             """
-            sig_table_content = self._build_table_content(significance_data, output_directory,
-                                                          original_matrix_ref=original_matrix_ref,
-                                                          type='sig')
             tab_content += """
             <div id="SignificanceMatrix" class="tabcontent">{}</div>""".format(sig_table_content)
 
@@ -313,7 +501,9 @@ class CorrelationUtil:
         return tab_def_content + tab_content
 
     def _generate_corr_html_report(self, corr_matrix_obj_ref, corr_matrix_plot_path,
-                                   scatter_plot_path):
+                                   scatter_plot_path, corr_df=None, sig_df=None,
+                                   original_matrix_ref=None, pair_data=None,
+                                   display_threshold=None):
 
         """
         _generate_corr_html_report: generate html summary report for correlation
@@ -327,10 +517,15 @@ class CorrelationUtil:
         result_file_path = os.path.join(output_directory, 'corr_report.html')
 
         visualization_content = self._generate_visualization_content(
-                                                                     output_directory,
-                                                                     corr_matrix_obj_ref,
-                                                                     corr_matrix_plot_path,
-                                                                     scatter_plot_path)
+                                                output_directory,
+                                                corr_matrix_obj_ref,
+                                                corr_matrix_plot_path,
+                                                scatter_plot_path,
+                                                corr_df=corr_df,
+                                                sig_df=sig_df,
+                                                original_matrix_ref=original_matrix_ref,
+                                                pair_data=pair_data,
+                                                display_threshold=display_threshold)
 
         with open(result_file_path, 'w') as result_file:
             with open(os.path.join(os.path.dirname(__file__), 'templates', 'corr_template.html'),
@@ -351,15 +546,25 @@ class CorrelationUtil:
         return html_report
 
     def _generate_corr_report(self, corr_matrix_obj_ref, workspace_name, corr_matrix_plot_path,
-                              scatter_plot_path=None):
+                              scatter_plot_path=None, corr_df=None, sig_df=None,
+                              original_matrix_ref=None, pair_data=None, display_threshold=None):
         """
         _generate_report: generate summary report
+
+        corr_df/sig_df: saved correlation data frames, fetched from corr_matrix_obj_ref if missing
+        pair_data: saved sparse correlation pairs, used instead of corr_df/sig_df
+        display_threshold: only list the pairs with an absolute coefficient of at least
+                           display_threshold in the report tables
         """
         logging.info('Start creating report')
 
         output_html_files = self._generate_corr_html_report(corr_matrix_obj_ref,
                                                             corr_matrix_plot_path,
-                                                            scatter_plot_path)
+                                                            scatter_plot_path,
+                                                            corr_df=corr_df, sig_df=sig_df,
+                                                            original_matrix_ref=original_matrix_ref,
+                                                            pair_data=pair_data,
+                                                            display_threshold=display_threshold)
 
         report_params = {'message': '',
                          'objects_created': [{'ref': corr_matrix_obj_ref,
@@ -377,23 +582,324 @@ class CorrelationUtil:
 
         return report_output
 
-    def _corr_for_matrix(self, input_obj_ref, method, dimension):
+    def _matrix_to_df(self, matrix_ref):
         """
-        _corr_for_matrix: compute correlation matrix df for KBaseMatrices object
+        _matrix_to_df: fetch KBaseMatrices object data as a naturally sorted data frame
         """
-        data_matrix = self.data_util.fetch_data({'obj_ref': input_obj_ref}).get('data_matrix')
-        data_df = pd.read_json(data_matrix)
+        data_df = self.data_util.fetch_matrix_df(matrix_ref)
         data_df = data_df.reindex(index=natsorted(data_df.index))
         data_df = data_df.reindex(columns=natsorted(data_df.columns))
 
+        return data_df
+
+    def _get_display_threshold(self, params):
+        """
+        _get_display_threshold: minimum absolute coefficient of the pairs listed in the report
+        """
+        display_threshold = params.get('display_threshold')
+        if display_threshold is None:
+            return None
+
+        try:
+            display_threshold = float(display_threshold)
+        except (TypeError, ValueError):
+            raise ValueError('display_threshold must be a number between 0 and 1')
+
+        if not 0 <= display_threshold <= 1:
+            raise ValueError('display_threshold must be a number between 0 and 1')
+
+        return display_threshold
+
+    def _get_significance_correction(self, params):
+        """
+        _get_significance_correction: multiple testing correction of the significance values
+        """
+        correction = params.get('significance_correction')
+        if not correction:
+            return None
+
+        if correction not in CorrelationEngine.PVALUE_CORRECTIONS:
+            err_msg = 'Input significance correction [{}] is not available.\n'.format(correction)
+            err_msg += 'Please choose one of {}'.format(CorrelationEngine.PVALUE_CORRECTIONS)
+            raise ValueError(err_msg)
+        if not params.get('compute_significance', False):
+            raise ValueError('significance_correction requires compute_significance')
+
+        return correction
+
+    def _significance_dfs(self, sig_values, index, columns, correction=None, symmetric=False):
+        """
+        _significance_dfs: rounded significance df and, with a multiple testing correction, the
+                           adjusted significance df computed from the unrounded values
+        """
+        adj_sig_df = None
+        if correction:
+            adj_values = CorrelationEngine.adjust_pvalue_matrix(sig_values, correction,
+                                                                symmetric=symmetric)
+            adj_sig_df = pd.DataFrame(adj_values, index=index, columns=columns).round(4)
+
+        sig_df = pd.DataFrame(sig_values, index=index, columns=columns).round(4)
+
+        return sig_df, adj_sig_df
+
+    def _corr_for_matrix(self, input_obj_ref, method, dimension, sample_size=None,
+                         random_seed=None):
+        """
+        _corr_for_matrix: compute correlation matrix df for KBaseMatrices object
+
+        sample_size: approximate on a random subset of observations
+        """
+        data_df = self._matrix_to_df(input_obj_ref)
+
+        if sample_size and dimension == 'col':
+            data_df = self._subsample_observations(data_df.T, sample_size, random_seed).T
+        elif sample_size:
+            data_df = self._subsample_observations(data_df, sample_size, random_seed)
+
         corr_df = self.df_to_corr(data_df, method=method, dimension=dimension)
 
         return corr_df, data_df
 
-    def _compute_significance(self, data_df, dimension):
+    def _tiled_corr(self, df1, df2, method, compute_significance, tile_size, n_workers=1,
+                    correction=None):
+        """
+        _tiled_corr: compute correlation (and significance) between rows of df1 and rows of df2
+                     (or df1 itself if df2 is None) tile by tile into memory-mapped arrays in
+                     scratch, missing values are treated as 0, row blocks are spread over
+                     n_workers processes
+
+        returns corr_df, sig_df and adj_sig_df (significance adjusted by the multiple testing
+        correction), data frames backed by the on-disk arrays, which are removed by
+        _remove_tiled_results once the matrix is saved and reported
+        """
+        logging.info('start calculating tiled correlation matrix with tile size {} '
+                     'on {} worker(s)'.format(tile_size, n_workers))
+        result_dir = os.path.join(self.scratch, str(uuid.uuid4()) + '_corr_tiles')
+        self._mkdir_p(result_dir)
+        self.tiled_result_dirs.append(result_dir)
+
+        corr_path = os.path.join(result_dir, 'coefficient_data.npy')
+        sig_path = adjusted_path = None
+        if compute_significance:
+            sig_path = os.path.join(result_dir, 'significance_data.npy')
+            if correction:
+                adjusted_path = os.path.join(result_dir, 'adjusted_significance_data.npy')
+
+        y_values = None if df2 is None else df2.fillna(0).values
+        corr_values, sig_values = CorrelationEngine.corr_to_memmap(
+                                                    df1.fillna(0).values, y_values,
+                                                    method=method, corr_path=corr_path,
+                                                    sig_path=sig_path, tile_size=tile_size,
+                                                    n_workers=n_workers, correction=correction,
+                                                    adjusted_path=adjusted_path)
+
+        col_ids = df1.index if df2 is None else df2.index
+        corr_df = pd.DataFrame(corr_values, index=df1.index, columns=col_ids, copy=False)
+        sig_df = adj_sig_df = None
+        if sig_values is not None:
+            sig_df = pd.DataFrame(sig_values, index=df1.index, columns=col_ids, copy=False)
+        if adjusted_path:
+            adj_sig_df = pd.DataFrame(np.load(adjusted_path, mmap_mode='r'), index=df1.index,
+                                      columns=col_ids, copy=False)
+
+        return corr_df, sig_df, adj_sig_df
+
+    def _variable_df_for_matrix(self, input_obj_ref, method, dimension, sample_size=None,
+                                random_seed=None):
+        """
+        _variable_df_for_matrix: fetch KBaseMatrices object data and orient it so that the
+                                 variables to correlate are the rows
+
+        sample_size: only keep a random subset of observations
+        """
+        if method not in CORR_METHOD:
+            err_msg = 'Input correlation method [{}] is not available.\n'.format(method)
+            err_msg += 'Please choose one of {}'.format(CORR_METHOD)
+            raise ValueError(err_msg)
+
+        data_df = self._matrix_to_df(input_obj_ref)
+
+        if dimension == 'col':
+            variable_df = data_df.T
+        elif dimension == 'row':
+            variable_df = data_df
+        else:
+            err_msg = 'Input dimension [{}] is not available.\n'.format(dimension)
+            err_msg += 'Please choose either "col" or "row"'
+            raise ValueError(err_msg)
+
+        if sample_size:
+            variable_df = self._subsample_observations(variable_df, sample_size, random_seed)
+            data_df = variable_df.T if dimension == 'col' else variable_df
+
+        return variable_df, data_df
+
+    def _tiled_corr_for_matrix(self, input_obj_ref, method, dimension, compute_significance,
+                               tile_size, n_workers=1, sample_size=None, random_seed=None,
+                               correction=None):
+        """
+        _tiled_corr_for_matrix: compute tiled correlation and significance matrix dfs for
+                                KBaseMatrices object
+        """
+        variable_df, data_df = self._variable_df_for_matrix(input_obj_ref, method, dimension,
+                                                            sample_size=sample_size,
+                                                            random_seed=random_seed)
+
+        corr_df, sig_df, adj_sig_df = self._tiled_corr(variable_df, None, method,
+                                                       compute_significance, tile_size,
+                                                       n_workers=n_workers, correction=correction)
+
+        return corr_df, sig_df, adj_sig_df, data_df
+
+    def _corr_pairs(self, df1, df2, method, compute_significance, threshold, tile_size,
+                    n_workers=1, top_k=None, correction=None):
+        """
+        _corr_pairs: compute sparse correlation pairs between rows of df1 and rows of df2 (or
+                     df1 itself if df2 is None), tiles are filtered on the absolute coefficient
+                     threshold as soon as they are computed, missing values are treated as 0
+
+        with top_k only the top_k strongest partners of every row variable are kept instead,
+        the multiple testing correction of the kept significance values counts all tested pairs
+
+        returns CorrelationPairs data
+        """
+        y_values = None if df2 is None else df2.fillna(0).values
+        if top_k:
+            logging.info('start calculating top {} correlation partners'.format(top_k))
+            pairs = CorrelationEngine.corr_top_k(df1.fillna(0).values, y_values, method=method,
+                                                 k=top_k,
+                                                 compute_significance=compute_significance,
+                                                 tile_size=tile_size, n_workers=n_workers,
+                                                 work_dir=self.scratch, correction=correction)
+        else:
+            logging.info('start calculating sparse correlation pairs with threshold {}'.format(
+                                                                                    threshold))
+            pairs = CorrelationEngine.corr_pairs(df1.fillna(0).values, y_values, method=method,
+                                                 threshold=threshold,
+                                                 compute_significance=compute_significance,
+                                                 tile_size=tile_size, n_workers=n_workers,
+                                                 work_dir=self.scratch, correction=correction)
+        logging.info('kept [{}] correlation pairs'.format(pairs['coefficient'].size))
+
+        col_ids = df1.index if df2 is None else df2.index
+        pair_data = {'row_ids': df1.index.tolist(),
+                     'col_ids': col_ids.tolist(),
+                     'row_index': pairs['row_index'].tolist(),
+                     'col_index': pairs['col_index'].tolist(),
+                     'coefficient': pairs['coefficient'].tolist(),
+                     'symmetric': int(df2 is None and not top_k)}
+        if pairs['significance'] is not None:
+            pair_data['significance'] = pairs['significance'].tolist()
+        if pairs['adjusted_significance'] is not None:
+            pair_data['adjusted_significance'] = pairs['adjusted_significance'].tolist()
+
+        return pair_data
+
+    def _sparse_corr_for_matrix(self, input_obj_ref, method, dimension, compute_significance,
+                                threshold, tile_size, n_workers=1, top_k=None, sample_size=None,
+                                random_seed=None, correction=None):
+        """
+        _sparse_corr_for_matrix: compute sparse correlation pairs for KBaseMatrices object
+        """
+        variable_df, data_df = self._variable_df_for_matrix(input_obj_ref, method, dimension,
+                                                            sample_size=sample_size,
+                                                            random_seed=random_seed)
+
+        pair_data = self._corr_pairs(variable_df, None, method, compute_significance,
+                                     threshold, tile_size, n_workers=n_workers, top_k=top_k,
+                                     correction=correction)
+
+        return pair_data, data_df
+
+    def _fetch_corr_statistics(self, corr_matrix_ref):
+        """
+        _fetch_corr_statistics: sufficient statistics saved with a CorrelationMatrix object
+        """
+        corr_data = self.object_cache.get_subobject(corr_matrix_ref,
+                                                    ['/sufficient_statistics'])['data']
+
+        corr_stats = corr_data.get('sufficient_statistics')
+        if not corr_stats:
+            err_msg = 'Correlation matrix [{}] has no sufficient statistics.\n'.format(
+                                                                            corr_matrix_ref)
+            err_msg += 'Please compute it with save_statistics enabled'
+            raise ValueError(err_msg)
+
+        return corr_stats
+
+    def _stats_corr_for_matrix(self, input_obj_ref, method, dimension, compute_significance,
+                               base_corr_matrix_ref=None, correction=None):
+        """
+        _stats_corr_for_matrix: compute Pearson correlation matrix df for KBaseMatrices object
+                                from sufficient statistics, missing values are treated as 0
+
+        with base_corr_matrix_ref only the samples missing from the statistics saved with that
+        correlation matrix are folded into them
+
+        returns corr_df, sig_df, adj_sig_df, data_df and the updated CorrelationStatistics data
+        """
+        if method != 'pearson':
+            raise ValueError('Sufficient statistics are only available for pearson correlation')
+
+        variable_df, data_df = self._variable_df_for_matrix(input_obj_ref, method, dimension)
+        variable_df = variable_df.fillna(0)
+        variable_df.index = variable_df.index.map(str)
+        variable_df.columns = variable_df.columns.map(str)
+
+        sample_ids = variable_df.columns.tolist()
+        new_sample_ids = sample_ids
+        base_stats = None
+        if base_corr_matrix_ref:
+            corr_stats = self._fetch_corr_statistics(base_corr_matrix_ref)
+
+            if set(corr_stats['variable_ids']) != set(variable_df.index):
+                raise ValueError('Input matrix variables differ from the variables of the '
+                                 'base correlation matrix')
+
+            removed_samples = set(corr_stats['sample_ids']) - set(sample_ids)
+            if removed_samples:
+                raise ValueError('Samples {} of the base correlation matrix are missing from the '
+                                 'input matrix'.format(sorted(removed_samples)))
+
+            variable_df = variable_df.reindex(index=corr_stats['variable_ids'])
+            known_samples = set(corr_stats['sample_ids'])
+            new_sample_ids = [sample for sample in sample_ids if sample not in known_samples]
+            sample_ids = corr_stats['sample_ids'] + new_sample_ids
+            base_stats = (corr_stats['n'], np.array(corr_stats['means']),
+                          np.array(corr_stats['comoments']))
+
+        logging.info('start folding [{}] samples into correlation statistics'.format(
+                                                                        len(new_sample_ids)))
+        corr_stats = CorrelationEngine.comoment_stats(variable_df[new_sample_ids].values)
+        if base_stats is not None:
+            corr_stats = CorrelationEngine.merge_comoment_stats(base_stats, corr_stats)
+        n_obs, means, comoments = corr_stats
+
+        corr_values = CorrelationEngine.comoment_corr(comoments)
+        corr_df = pd.DataFrame(corr_values, index=variable_df.index,
+                               columns=variable_df.index).round(4)
+
+        sig_df = adj_sig_df = None
+        if compute_significance:
+            sig_values = CorrelationEngine.comoment_pvalues(corr_values, n_obs)
+            sig_df, adj_sig_df = self._significance_dfs(sig_values, variable_df.index,
+                                                        variable_df.index,
+                                                        correction=correction, symmetric=True)
+
+        stats_data = {'n': n_obs,
+                      'sample_ids': sample_ids,
+                      'variable_ids': variable_df.index.tolist(),
+                      'means': means.tolist(),
+                      'comoments': comoments.tolist()}
+
+        return corr_df, sig_df, adj_sig_df, data_df, stats_data
+
+    def _compute_significance(self, data_df, dimension, method='pearson', correction=None):
         """
         _compute_significance: compute pairwsie significance dataframe
                                two-sided p-value for a hypothesis test
+
+        returns sig_df and adj_sig_df (significance adjusted by the multiple testing correction)
         """
 
         logging.info('Start computing significance matrix')
@@ -401,46 +907,77 @@ class CorrelationUtil:
             data_df = data_df.T
 
         data_df = data_df.dropna()._get_numeric_data()
-        dfcols = pd.DataFrame(columns=data_df.columns)
-        sig_df = dfcols.transpose().join(dfcols, how='outer')
+        values = data_df.values.T
 
-        for r in data_df.columns:
-            for c in data_df.columns:
-                pvalue = stats.linregress(data_df[r], data_df[c])[3]
-                sig_df[r][c] = round(pvalue, 4)
+        corr_values = CorrelationEngine.corr_matrix(values, method=method)
+        sig_values = CorrelationEngine.symmetric_pvalues(corr_values, values, method=method)
 
-        return sig_df
+        return self._significance_dfs(sig_values, data_df.columns, data_df.columns,
+                                      correction=correction, symmetric=True)
 
     def _df_to_list(self, df, threshold=None):
         """
-        _df_to_list: convert Dataframe to FloatMatrix2D matrix data
-        """
+        _df_to_list: convert Dataframe to FloatMatrix2D matrix data, missing values become 0
 
-        df.fillna(0, inplace=True)
+        the values are read a block of rows at a time, so data frames backed by the memory-mapped
+        arrays of tiled mode are never copied as a whole, matrices of more than
+        DENSE_MATRIX_MAX_SIZE values (after the threshold) are refused
+        """
+        values = df.values
+        row_index = np.arange(values.shape[0])
+        col_index = np.arange(values.shape[1])
+        block_rows = max(1, JSONStream.ROW_CHUNK // max(1, values.shape[1]))
 
         if threshold:
-            drop_cols = list()
-            for col in df.columns:
-                if all(df[col] < threshold) and all(df[col] > -threshold):
-                    drop_cols.append(col)
-            df.drop(columns=drop_cols, inplace=True, errors='ignore')
-
-            drop_idx = list()
-            for idx in df.index:
-                if all(df.loc[idx] < threshold) and all(df.loc[idx] > -threshold):
-                    drop_idx.append(idx)
-            df.drop(index=drop_idx, inplace=True, errors='ignore')
-
-        matrix_data = {'row_ids': df.index.tolist(),
-                       'col_ids': df.columns.tolist(),
-                       'values': df.values.tolist()}
+            # drop rows and columns without any value over the threshold
+            row_over = np.zeros(values.shape[0], dtype=bool)
+            col_over = np.zeros(values.shape[1], dtype=bool)
+            for start in range(0, values.shape[0], block_rows):
+                with np.errstate(invalid='ignore'):
+                    over_threshold = np.abs(values[start:start + block_rows]) >= threshold
+                row_over[start:start + block_rows] = over_threshold.any(axis=1)
+                col_over |= over_threshold.any(axis=0)
+            row_index = row_index[row_over]
+            col_index = col_index[col_over]
+
+        if row_index.size * col_index.size > DENSE_MATRIX_MAX_SIZE:
+            err_msg = 'Correlation matrix of {} x {} values is too large '.format(
+                                                                row_index.size, col_index.size)
+            err_msg += 'to be saved as a dense matrix (at most {} values).\n'.format(
+                                                                DENSE_MATRIX_MAX_SIZE)
+            err_msg += 'Please use sparse_output or top_k, or a larger corr_threshold'
+            raise ValueError(err_msg)
+
+        matrix_values = list()
+        for start in range(0, row_index.size, block_rows):
+            block = values[row_index[start:start + block_rows]][:, col_index]
+            matrix_values.extend(np.where(pd.isnull(block), 0, block).tolist())
+
+        matrix_data = {'row_ids': df.index[row_index].tolist(),
+                       'col_ids': df.columns[col_index].tolist(),
+                       'values': matrix_values}
 
         return matrix_data
 
+    def _remove_tiled_results(self):
+        """
+        _remove_tiled_results: remove the on-disk arrays of the tiled correlation matrices
+        """
+        for result_dir in self.tiled_result_dirs:
+            shutil.rmtree(result_dir, ignore_errors=True)
+        self.tiled_result_dirs = list()
+
     def _save_corr_matrix(self, workspace_name, corr_matrix_name, corr_df, sig_df, method,
-                          matrix_ref=None, corr_threshold=None):
+                          matrix_ref=None, corr_threshold=None, pair_data=None, top_k=None,
+                          corr_stats=None, parameters=None, adj_sig_df=None, correction=None):
         """
         _save_corr_matrix: save KBaseExperiments.CorrelationMatrix object
+
+        pair_data: sparse CorrelationPairs data, saved instead of corr_df/sig_df
+        top_k: number of partners per variable pair_data was limited to
+        corr_stats: CorrelationStatistics data to save with the matrix
+        parameters: additional correlation_parameters entries
+        adj_sig_df: significance adjusted by the multiple testing correction
         """
         logging.info('Start saving CorrelationMatrix')
 
@@ -451,14 +988,30 @@ class CorrelationUtil:
 
         corr_data = {}
 
-        corr_data.update({'coefficient_data': self._df_to_list(corr_df,
-                                                               threshold=corr_threshold)})
-        corr_data.update({'correlation_parameters': {'method': method}})
+        correlation_parameters = {'method': method}
+        correlation_parameters.update(parameters or {})
+        if correction:
+            correlation_parameters.update({'significance_correction': correction})
+        if pair_data is not None:
+            corr_data.update({'pair_data': pair_data})
+            if top_k:
+                correlation_parameters.update({'top_k': str(top_k)})
+            elif corr_threshold is not None:
+                correlation_parameters.update({'corr_threshold': str(corr_threshold)})
+        else:
+            corr_data.update({'coefficient_data': self._df_to_list(corr_df,
+                                                                   threshold=corr_threshold)})
+        corr_data.update({'correlation_parameters': correlation_parameters})
         if matrix_ref:
             corr_data.update({'original_matrix_ref': matrix_ref})
 
         if sig_df is not None:
             corr_data.update({'significance_data': self._df_to_list(sig_df)})
+        if adj_sig_df is not None:
+            corr_data.update({'adjusted_significance_data': self._df_to_list(adj_sig_df)})
+
+        if corr_stats is not None:
+            corr_data.update({'sufficient_statistics': corr_stats})
 
         obj_type = 'KBaseExperiments.CorrelationMatrix'
         info = self.dfu.save_objects({
@@ -470,7 +1023,11 @@ class CorrelationUtil:
             }]
         })[0]
 
-        return "%s/%s/%s" % (info[6], info[0], info[4])
+        # reports are built from the saved object, keep it for the rest of the request
+        corr_matrix_ref = "%s/%s/%s" % (info[6], info[0], info[4])
+        self.object_cache.put_object(corr_matrix_ref, {'data': corr_data, 'info': info})
+
+        return corr_matrix_ref
 
     def _Matrix2D_to_df(self, Matrix2D):
         """
@@ -485,12 +1042,13 @@ class CorrelationUtil:
 
         return df
 
-    def _corr_to_df(self, corr_matrix_ref):
+    def _corr_to_df(self, corr_matrix_ref, corr_data=None):
         """
         retrieve correlation matrix ws object to coefficient_df and significance_df
         """
 
-        corr_data = self.dfu.get_objects({'object_refs': [corr_matrix_ref]})['data'][0]['data']
+        if corr_data is None:
+            corr_data = self.object_cache.get_object(corr_matrix_ref)['data']
 
         coefficient_data = corr_data.get('coefficient_data')
         significance_data = corr_data.get('significance_data')
@@ -503,12 +1061,13 @@ class CorrelationUtil:
 
         return coefficient_df, significance_df
 
-    def _corr_df_to_excel(self, coefficient_df, significance_df, result_dir, corr_matrix_ref):
+    def _corr_df_to_excel(self, coefficient_df, significance_df, result_dir, corr_matrix_ref,
+                          adjusted_significance_df=None):
         """
         write correlation matrix dfs into excel
         """
 
-        corr_info = self.dfu.get_objects({'object_refs': [corr_matrix_ref]})['data'][0]['info']
+        corr_info = self.object_cache.get_object_info(corr_matrix_ref)
         corr_name = corr_info[1]
 
         file_path = os.path.join(result_dir, corr_name + ".xlsx")
@@ -520,14 +1079,38 @@ class CorrelationUtil:
         if significance_df is not None:
             significance_df.to_excel(writer, "significance_data", index=True)
 
+        if adjusted_significance_df is not None:
+            adjusted_significance_df.to_excel(writer, "adjusted_significance_data", index=True)
+
+        writer.close()
+
+    def _corr_pairs_to_excel(self, pair_data, result_dir, corr_matrix_ref):
+        """
+        write sparse correlation pairs into excel, one row per pair
+        """
+
+        corr_info = self.object_cache.get_object_info(corr_matrix_ref)
+        corr_name = corr_info[1]
+
+        file_path = os.path.join(result_dir, corr_name + ".xlsx")
+
+        pairs_df = self._pairs_to_links(pair_data)
+        pairs_df.columns = ['Variable 1', 'Variable 2', 'Correlation']
+        if pair_data.get('significance') is not None:
+            pairs_df['Significance'] = pair_data['significance']
+        if pair_data.get('adjusted_significance') is not None:
+            pairs_df['Adjusted Significance'] = pair_data['adjusted_significance']
+
+        writer = pd.ExcelWriter(file_path)
+        pairs_df.to_excel(writer, sheet_name="pair_data", index=False)
         writer.close()
 
     def _update_taxonomy_index(self, data_df, amplicon_set_ref):
 
         logging.info('start updating index with taxonomy info from AmpliconSet')
 
-        amplicon_set_data = self.dfu.get_objects(
-                                            {'object_refs': [amplicon_set_ref]})['data'][0]['data']
+        amplicon_set_data = self.object_cache.get_subobject(amplicon_set_ref,
+                                                            TAXONOMY_PATHS)['data']
 
         amplicons = amplicon_set_data.get('amplicons')
 
@@ -556,22 +1139,26 @@ class CorrelationUtil:
 
         logging.info('start fectching matrix data')
 
-        res = self.dfu.get_objects({'object_refs': [matrix_ref]})['data'][0]
-        obj_type = res['info'][2]
+        obj_type = self.object_cache.get_object_info(matrix_ref)[2]
 
         if "KBaseMatrices" in obj_type:
-            data_matrix = self.data_util.fetch_data({'obj_ref': matrix_ref}).get('data_matrix')
-            data_df = pd.read_json(data_matrix)
-            data_df = data_df.reindex(index=natsorted(data_df.index))
-            data_df = data_df.reindex(columns=natsorted(data_df.columns))
-
-            return data_df
+            return self._matrix_to_df(matrix_ref)
         else:
             err_msg = 'Ooops! [{}] is not supported.\n'.format(obj_type)
             err_msg += 'Please supply KBaseMatrices object'
             raise ValueError("err_msg")
 
-    def _compute_metrices_corr(self, df1, df2, method, compute_significance):
+    def _compute_metrices_corr(self, df1, df2, method, compute_significance, tile_size=None,
+                               n_workers=1, sparse_threshold=None, top_k=None, sample_size=None,
+                               random_seed=None, correction=None):
+        """
+        _compute_metrices_corr: compute correlation (and significance) between rows of df1 and
+                                rows of df2 over their common columns, or a random subset of
+                                sample_size of them
+
+        returns corr_df, sig_df, adj_sig_df (significance adjusted by the multiple testing
+        correction) or CorrelationPairs data if sparse_threshold or top_k is given
+        """
 
         df1.fillna(0, inplace=True)
         df2.fillna(0, inplace=True)
@@ -591,42 +1178,38 @@ class CorrelationUtil:
         df1 = df1.loc[:][common_col]
         df2 = df2.loc[:][common_col]
 
-        corr_df = pd.DataFrame(index=idx_1, columns=idx_2)
-        sig_df = pd.DataFrame(index=idx_1, columns=idx_2)
+        if sample_size:
+            df1 = self._subsample_observations(df1, sample_size, random_seed)
+            df2 = df2[df1.columns]
+
+        if method not in CORR_METHOD:
+            err_msg = 'Input correlation method [{}] is not available.\n'.format(method)
+            err_msg += 'Please choose one of {}'.format(CORR_METHOD)
+            raise ValueError(err_msg)
 
         logging.info('start calculating correlation matrix')
         logging.info('sizing {} x {}'.format(idx_1.size, idx_2.size))
-        counter = 0
-        for idx_value in idx_1:
-            for col_value in idx_2:
-
-                if counter % 100000 == 0:
-                    logging.info('computed {} corr/sig values'.format(counter))
-
-                value_array_1 = df1.loc[idx_value].tolist()
-                value_array_2 = df2.loc[col_value].tolist()
-
-                if method == 'pearson':
-                    corr_value, p_value = stats.pearsonr(value_array_1, value_array_2)
-                elif method == 'spearman':
-                    corr_value, p_value = stats.spearmanr(value_array_1, value_array_2)
-                elif method == 'kendall':
-                    corr_value, p_value = stats.kendalltau(value_array_1, value_array_2)
-                else:
-                    err_msg = 'Input correlation method [{}] is not available.\n'.format(method)
-                    err_msg += 'Please choose one of {}'.format(CORR_METHOD)
-                    raise ValueError(err_msg)
+        if sparse_threshold is not None or top_k:
+            return self._corr_pairs(df1, df2, method, compute_significance, sparse_threshold,
+                                    tile_size or CorrelationEngine.TILE_SIZE,
+                                    n_workers=n_workers, top_k=top_k, correction=correction)
 
-                corr_df.at[idx_value, col_value] = round(corr_value, 4)
-                if compute_significance:
-                    sig_df.at[idx_value, col_value] = round(p_value, 4)
+        if tile_size:
+            return self._tiled_corr(df1, df2, method, compute_significance, tile_size,
+                                    n_workers=n_workers, correction=correction)
 
-                counter += 1
+        corr_values = CorrelationEngine.corr_matrix(df1.values, df2.values, method=method)
+        corr_df = pd.DataFrame(corr_values, index=idx_1, columns=idx_2).round(4)
 
-        if not compute_significance:
-            sig_df = None
+        sig_df = adj_sig_df = None
+        if compute_significance:
+            logging.info('start calculating significance matrix')
+            sig_values = CorrelationEngine.corr_pvalues(corr_values, df1.values, df2.values,
+                                                        method=method)
+            sig_df, adj_sig_df = self._significance_dfs(sig_values, idx_1, idx_2,
+                                                        correction=correction)
 
-        return corr_df, sig_df
+        return corr_df, sig_df, adj_sig_df
 
     def __init__(self, config):
         self.ws_url = config["workspace-url"]
@@ -636,6 +1219,8 @@ class CorrelationUtil:
 
         self.data_util = DataUtil(config)
         self.dfu = DataFileUtil(self.callback_url)
+        self.object_cache = ObjectCache.shared(config)
+        self.tiled_result_dirs = list()
 
         plt.switch_backend('agg')
 
@@ -660,7 +1245,14 @@ class CorrelationUtil:
             err_msg += 'Please choose either "col" or "row"'
             raise ValueError(err_msg)
 
-        corr_df = df.corr(method=method).round(4)
+        if method == 'kendall' and not df.isnull().values.any():
+            # O(n log n) per pair engine instead of a scipy call per pair
+            df = df._get_numeric_data()
+            corr_values = CorrelationEngine.corr_matrix(df.values.T, method=method)
+            np.fill_diagonal(corr_values, 1)  # as pandas, constant variables included
+            corr_df = pd.DataFrame(corr_values, index=df.columns, columns=df.columns).round(4)
+        else:
+            corr_df = df.corr(method=method).round(4)
 
         return corr_df
 
@@ -767,6 +1359,22 @@ class CorrelationUtil:
         method: correlation method, one of ['pearson', 'kendall', 'spearman']
         plot_corr_matrix: plot correlation matrix in report, default False
         compute_significance: also compute Significance in addition to correlation matrix
+        tile_size: compute correlation tile by tile into on-disk arrays, tile_size x tile_size
+                   values at a time, missing values are treated as 0 (default: in memory)
+        n_workers: number of processes computing row blocks of the correlation matrix in
+                   parallel, implies tiled mode when larger than 1 (default: 1)
+        sparse_output: only keep the pairs with an absolute coefficient of at least
+                       corr_threshold, filtered tile by tile without building the dense matrix,
+                       saved as pair_data (default False)
+        top_k: only keep the top_k partners with the strongest absolute correlation of every
+               variable, saved as pair_data, takes precedence over sparse_output
+        kendall_sample_size: approximate kendall correlation on a random subset of that many
+                             samples, the error bound is saved in correlation_parameters
+        random_seed: seed of the random sample subset
+        significance_correction: also save the significance adjusted for multiple testing, one of
+                                 ['bonferroni', 'fdr_bh'] (Benjamini-Hochberg q-values)
+        display_threshold: only list the pairs with an absolute coefficient of at least
+                           display_threshold in the report tables (default all pairs)
         """
 
         logging.info('--->\nrunning CorrelationUtil.compute_correlation_across_matrices\n' +
@@ -787,8 +1395,15 @@ class CorrelationUtil:
             raise ValueError(err_msg)
         plot_corr_matrix = params.get('plot_corr_matrix', False)
         compute_significance = params.get('compute_significance', False)
+        tile_size, n_workers = self._get_tiling_params(params)
+        sparse_output = params.get('sparse_output', False)
+        top_k = self._get_positive_int(params, 'top_k')
+        sample_size, random_seed = self._get_kendall_sampling_params(params, method)
+        correction = self._get_significance_correction(params)
+        display_threshold = self._get_display_threshold(params)
+        sampling_parameters = self._kendall_sampling_parameters(sample_size, random_seed)
 
-        matrix_1_type = self.dfu.get_objects({'object_refs': [matrix_ref_1]})['data'][0]['info'][2]
+        matrix_1_type = self.object_cache.get_object_info(matrix_ref_1)[2]
 
         # making sure otu_ids are on the column of table
         if "AmpliconMatrix" in matrix_1_type:
@@ -797,24 +1412,52 @@ class CorrelationUtil:
         df1 = self._fetch_matrix_data(matrix_ref_1)
         df2 = self._fetch_matrix_data(matrix_ref_2)
 
-        corr_df, sig_df = self._compute_metrices_corr(df1, df2, method, compute_significance)
+        try:
+            corr_df = sig_df = adj_sig_df = pair_data = None
+            if sparse_output or top_k:
+                pair_data = self._compute_metrices_corr(df1, df2, method, compute_significance,
+                                                        tile_size=tile_size, n_workers=n_workers,
+                                                        sparse_threshold=corr_threshold or 0,
+                                                        top_k=top_k, sample_size=sample_size,
+                                                        random_seed=random_seed,
+                                                        correction=correction)
+            else:
+                corr_df, sig_df, adj_sig_df = self._compute_metrices_corr(df1, df2, method,
+                                                                          compute_significance,
+                                                                          tile_size=tile_size,
+                                                                          n_workers=n_workers,
+                                                                          sample_size=sample_size,
+                                                                          random_seed=random_seed,
+                                                                          correction=correction)
 
-        if plot_corr_matrix:
-            corr_matrix_plot_path = self.plotly_corr_matrix(corr_df)
-        else:
             corr_matrix_plot_path = None
-
-        corr_matrix_obj_ref = self._save_corr_matrix(workspace_name, corr_matrix_name, corr_df,
-                                                     sig_df, method,
-                                                     matrix_ref=[matrix_ref_1, matrix_ref_2],
-                                                     corr_threshold=corr_threshold)
-
-        returnVal = {'corr_matrix_obj_ref': corr_matrix_obj_ref}
-
-        report_output = self._generate_corr_report(corr_matrix_obj_ref, workspace_name,
-                                                   corr_matrix_plot_path)
-
-        returnVal.update(report_output)
+            if plot_corr_matrix and corr_df is not None:
+                corr_matrix_plot_path = self.plotly_corr_matrix(corr_df)
+            elif plot_corr_matrix:
+                logging.warning('correlation matrix heatmap is not available for sparse output')
+
+            corr_matrix_obj_ref = self._save_corr_matrix(workspace_name, corr_matrix_name, corr_df,
+                                                         sig_df, method,
+                                                         matrix_ref=[matrix_ref_1, matrix_ref_2],
+                                                         corr_threshold=corr_threshold,
+                                                         pair_data=pair_data, top_k=top_k,
+                                                         parameters=sampling_parameters,
+                                                         adj_sig_df=adj_sig_df,
+                                                         correction=correction)
+
+            returnVal = {'corr_matrix_obj_ref': corr_matrix_obj_ref}
+
+            report_output = self._generate_corr_report(corr_matrix_obj_ref, workspace_name,
+                                                       corr_matrix_plot_path,
+                                                       corr_df=corr_df, sig_df=sig_df,
+                                                       original_matrix_ref=[matrix_ref_1,
+                                                                            matrix_ref_2],
+                                                       pair_data=pair_data,
+                                                       display_threshold=display_threshold)
+
+            returnVal.update(report_output)
+        finally:
+            self._remove_tiled_results()
 
         return returnVal
 
@@ -828,6 +1471,29 @@ class CorrelationUtil:
         compute_significance: compute pairwise significance value, default False
         plot_corr_matrix: plot correlation matrix in repor, default False
         plot_scatter_matrix: plot scatter matrix in report, default False
+        corr_threshold: drop variables without any absolute coefficient of at least
+                        corr_threshold from the saved matrix
+        tile_size: compute correlation tile by tile into on-disk arrays, tile_size x tile_size
+                   values at a time, missing values are treated as 0 (default: in memory)
+        n_workers: number of processes computing row blocks of the correlation matrix in
+                   parallel, implies tiled mode when larger than 1 (default: 1)
+        sparse_output: only keep the pairs with an absolute coefficient of at least
+                       corr_threshold, filtered tile by tile without building the dense matrix,
+                       saved as pair_data (default False)
+        top_k: only keep the top_k partners with the strongest absolute correlation of every
+               variable, saved as pair_data, takes precedence over sparse_output
+        kendall_sample_size: approximate kendall correlation on a random subset of that many
+                             samples, the error bound is saved in correlation_parameters
+        random_seed: seed of the random sample subset
+        significance_correction: also save the significance adjusted for multiple testing, one of
+                                 ['bonferroni', 'fdr_bh'] (Benjamini-Hochberg q-values)
+        display_threshold: only list the pairs with an absolute coefficient of at least
+                           display_threshold in the report tables (default all pairs)
+        save_statistics: save the sufficient statistics of the (pearson) correlation with the
+                         matrix, missing values are treated as 0 (default False)
+        base_corr_matrix_ref: correlation matrix saved with save_statistics from an earlier
+                              version of the input matrix, only the samples appended since are
+                              folded into its statistics (implies save_statistics)
         """
 
         logging.info('--->\nrunning CorrelationUtil.compute_correlation_matrix\n' +
@@ -844,39 +1510,87 @@ class CorrelationUtil:
         plot_corr_matrix = params.get('plot_corr_matrix', False)
         plot_scatter_matrix = params.get('plot_scatter_matrix', False)
         compute_significance = params.get('compute_significance', False)
+        corr_threshold = params.get('corr_threshold')
+        tile_size, n_workers = self._get_tiling_params(params)
+        sparse_output = params.get('sparse_output', False)
+        top_k = self._get_positive_int(params, 'top_k')
+        sample_size, random_seed = self._get_kendall_sampling_params(params, method)
+        correction = self._get_significance_correction(params)
+        display_threshold = self._get_display_threshold(params)
+        sampling_parameters = self._kendall_sampling_parameters(sample_size, random_seed)
+        base_corr_matrix_ref = params.get('base_corr_matrix_ref')
+        save_statistics = params.get('save_statistics', False) or bool(base_corr_matrix_ref)
+
+        obj_type = self.object_cache.get_object_info(input_obj_ref)[2]
 
-        res = self.dfu.get_objects({'object_refs': [input_obj_ref]})['data'][0]
-        obj_type = res['info'][2]
-
-        if "KBaseMatrices" in obj_type:
-            corr_df, data_df = self._corr_for_matrix(input_obj_ref, method, dimension)
-            sig_df = None
-            if compute_significance:
-                sig_df = self._compute_significance(data_df, dimension)
-        else:
-            err_msg = 'Ooops! [{}] is not supported.\n'.format(obj_type)
-            err_msg += 'Please supply KBaseMatrices object'
-            raise ValueError("err_msg")
+        try:
+            corr_df = sig_df = adj_sig_df = pair_data = corr_stats = None
+            if "KBaseMatrices" in obj_type:
+                if save_statistics:
+                    corr_df, sig_df, adj_sig_df, data_df, corr_stats = self._stats_corr_for_matrix(
+                                                    input_obj_ref, method, dimension,
+                                                    compute_significance,
+                                                    base_corr_matrix_ref=base_corr_matrix_ref,
+                                                    correction=correction)
+                elif sparse_output or top_k:
+                    pair_data, data_df = self._sparse_corr_for_matrix(
+                                                    input_obj_ref, method, dimension,
+                                                    compute_significance, corr_threshold or 0,
+                                                    tile_size or CorrelationEngine.TILE_SIZE,
+                                                    n_workers=n_workers, top_k=top_k,
+                                                    sample_size=sample_size,
+                                                    random_seed=random_seed,
+                                                    correction=correction)
+                elif tile_size:
+                    corr_df, sig_df, adj_sig_df, data_df = self._tiled_corr_for_matrix(
+                                                    input_obj_ref, method, dimension,
+                                                    compute_significance, tile_size,
+                                                    n_workers=n_workers, sample_size=sample_size,
+                                                    random_seed=random_seed, correction=correction)
+                else:
+                    corr_df, data_df = self._corr_for_matrix(input_obj_ref, method, dimension,
+                                                             sample_size=sample_size,
+                                                             random_seed=random_seed)
+                    if compute_significance:
+                        sig_df, adj_sig_df = self._compute_significance(data_df, dimension, method,
+                                                                        correction=correction)
+            else:
+                err_msg = 'Ooops! [{}] is not supported.\n'.format(obj_type)
+                err_msg += 'Please supply KBaseMatrices object'
+                raise ValueError("err_msg")
 
-        if plot_corr_matrix:
-            corr_matrix_plot_path = self.plotly_corr_matrix(corr_df)
-        else:
             corr_matrix_plot_path = None
+            if plot_corr_matrix and corr_df is not None:
+                corr_matrix_plot_path = self.plotly_corr_matrix(corr_df)
+            elif plot_corr_matrix:
+                logging.warning('correlation matrix heatmap is not available for sparse output')
 
-        if plot_scatter_matrix:
-            scatter_plot_path = self.plot_scatter_matrix(data_df, dimension=dimension)
-        else:
-            scatter_plot_path = None
-
-        corr_matrix_obj_ref = self._save_corr_matrix(workspace_name, corr_matrix_name, corr_df,
-                                                     sig_df, method, matrix_ref=[input_obj_ref])
-
-        returnVal = {'corr_matrix_obj_ref': corr_matrix_obj_ref}
-
-        report_output = self._generate_corr_report(corr_matrix_obj_ref, workspace_name,
-                                                   corr_matrix_plot_path, scatter_plot_path)
-
-        returnVal.update(report_output)
+            if plot_scatter_matrix:
+                scatter_plot_path = self.plot_scatter_matrix(data_df, dimension=dimension)
+            else:
+                scatter_plot_path = None
+
+            corr_matrix_obj_ref = self._save_corr_matrix(workspace_name, corr_matrix_name, corr_df,
+                                                         sig_df, method, matrix_ref=[input_obj_ref],
+                                                         corr_threshold=corr_threshold,
+                                                         pair_data=pair_data, top_k=top_k,
+                                                         corr_stats=corr_stats,
+                                                         parameters=sampling_parameters,
+                                                         adj_sig_df=adj_sig_df,
+                                                         correction=correction)
+
+            returnVal = {'corr_matrix_obj_ref': corr_matrix_obj_ref}
+
+            report_output = self._generate_corr_report(corr_matrix_obj_ref, workspace_name,
+                                                       corr_matrix_plot_path, scatter_plot_path,
+                                                       corr_df=corr_df, sig_df=sig_df,
+                                                       original_matrix_ref=[input_obj_ref],
+                                                       pair_data=pair_data,
+                                                       display_threshold=display_threshold)
+
+            returnVal.update(report_output)
+        finally:
+            self._remove_tiled_results()
 
         return returnVal
 
@@ -887,12 +1601,23 @@ class CorrelationUtil:
 
         corr_matrix_ref = params.get('input_ref')
 
-        coefficient_df, significance_df = self._corr_to_df(corr_matrix_ref)
+        corr_data = self.object_cache.get_object(corr_matrix_ref)['data']
 
         result_dir = os.path.join(self.scratch, str(uuid.uuid4()))
         self._mkdir_p(result_dir)
 
-        self._corr_df_to_excel(coefficient_df, significance_df, result_dir, corr_matrix_ref)
+        if corr_data.get('coefficient_data'):
+            coefficient_df, significance_df = self._corr_to_df(corr_matrix_ref,
+                                                               corr_data=corr_data)
+            adjusted_significance_df = None
+            if corr_data.get('adjusted_significance_data'):
+                adjusted_significance_df = self._Matrix2D_to_df(
+                                                    corr_data.get('adjusted_significance_data'))
+            self._corr_df_to_excel(coefficient_df, significance_df, result_dir,
+                                   corr_matrix_ref,
+                                   adjusted_significance_df=adjusted_significance_df)
+        else:
+            self._corr_pairs_to_excel(corr_data.get('pair_data'), result_dir, corr_matrix_ref)
 
         package_details = self.dfu.package_for_download({
             'file_path': result_dir,
@@ -1,13 +1,14 @@
 import logging
 import uuid
 import os
-import json
 import pandas as pd
 import errno
 from natsort import natsorted
 
 from installed_clients.DataFileUtilClient import DataFileUtil
 from GenericsAPI.Utils.DataUtil import DataUtil
+from GenericsAPI.Utils import JSONStream
+from GenericsAPI.Utils.ObjectCache import ObjectCache
 from installed_clients.KBaseReportClient import KBaseReport
 
 
@@ -57,16 +58,8 @@ class DataTableUtil:
         table_content += """\n</tr>\n</tfoot>\n"""
 
         logging.info('start generating table json file')
-        data_array = matrix_df.values.tolist()
-
-        total_rec = len(data_array)
-        json_dict = {'draw': 1,
-                     'recordsTotal': total_rec,
-                     'recordsFiltered': total_rec,
-                     'data': data_array}
-
-        with open(os.path.join(output_directory, data_file_name), 'w') as fp:
-            json.dump(json_dict, fp)
+        total_rec = JSONStream.write_table(os.path.join(output_directory, data_file_name),
+                                           JSONStream.frame_chunks(matrix_df))
 
         logging.info('start generating table html')
         with open(os.path.join(output_directory, table_file_name), 'w') as result_file:
@@ -160,7 +153,8 @@ class DataTableUtil:
     def _fetch_matrix_df(self, input_matrix_ref, with_attribute_info):
         logging.info('Start fetch matrix content')
 
-        matrix_obj = self.dfu.get_objects({'object_refs': [input_matrix_ref]})['data'][0]
+        matrix_obj = self.object_cache.get_subobject(input_matrix_ref,
+                                                     ['/row_attributemapping_ref'])
         matrix_info = matrix_obj['info']
         matrix_data = matrix_obj['data']
 
@@ -168,13 +162,12 @@ class DataTableUtil:
         if matrix_type not in self.matrix_types:
             raise ValueError('Unexpected matrix type: {}'.format(matrix_type))
 
-        data_matrix = self.data_util.fetch_data({'obj_ref': input_matrix_ref}).get('data_matrix')
-        matrix_df = pd.read_json(data_matrix)
+        matrix_df = self.data_util.fetch_matrix_df(input_matrix_ref)
         matrix_df = matrix_df.reindex(index=natsorted(matrix_df.index))
 
         row_am_ref = matrix_data.get('row_attributemapping_ref')
         if with_attribute_info and row_am_ref:
-            am_data = self.dfu.get_objects({'object_refs': [row_am_ref]})['data'][0]['data']
+            am_data = self.object_cache.get_object(row_am_ref)['data']
             instances = am_data['instances']
             columns = [x['attribute'] for x in am_data['attributes']]
             row_am_df = pd.DataFrame(list(instances.values()), index=instances.keys(), columns=columns)
@@ -195,6 +188,7 @@ class DataTableUtil:
         self.scratch = config['scratch']
         self.token = config['KB_AUTH_TOKEN']
         self.dfu = DataFileUtil(self.callback_url)
+        self.object_cache = ObjectCache.shared(config)
         self.data_util = DataUtil(config)
         self.matrix_types = [x.split(".")[1].split('-')[0]
                              for x in self.data_util.list_generic_types()]
@@ -1,19 +1,56 @@
+import json
 import logging
 import re
 from collections import defaultdict
 
+import numpy as np
+import pandas as pd
 from dotmap import DotMap
+from scipy import sparse
 
 from installed_clients.DataFileUtilClient import DataFileUtil
 from installed_clients.GenericsServiceClient import GenericsService
 from installed_clients.WorkspaceClient import Workspace as workspaceService
+from GenericsAPI.Utils.MatrixCache import MatrixCache
+from GenericsAPI.Utils.ObjectCache import ObjectCache
 
 GENERICS_TYPE = ['FloatMatrix2D']  # add case in _convert_data for each additional type
 GENERICS_MODULES = ['KBaseMatrices']
+SPARSE_ROW_BLOCK = 1024  # matrix rows converted to a sparse matrix at a time
 
 
 class DataUtil:
 
+    @staticmethod
+    def sparse_to_lists(matrix):
+        """
+        sparse_to_lists: FloatMatrix2D values (list of row lists) of a scipy sparse matrix,
+                         densified SPARSE_ROW_BLOCK rows at a time instead of as a whole
+        """
+        matrix = sparse.csr_matrix(matrix)
+
+        values = list()
+        for start in range(0, matrix.shape[0], SPARSE_ROW_BLOCK):
+            values.extend(matrix[start:start + SPARSE_ROW_BLOCK].toarray().tolist())
+
+        return values
+
+    @staticmethod
+    def lists_to_sparse(values, n_cols):
+        """
+        lists_to_sparse: CSR matrix of FloatMatrix2D values (rows of values, e.g. the value lists
+                         of a fetched object or memory-mapped values), missing values are 0,
+                         converted SPARSE_ROW_BLOCK rows at a time so that the result follows
+                         the number of non-zeros
+        """
+        blocks = [sparse.csr_matrix(np.nan_to_num(np.array(values[start:start + SPARSE_ROW_BLOCK],
+                                                           dtype=np.float64).reshape(-1, n_cols)))
+                  for start in range(0, len(values), SPARSE_ROW_BLOCK)]
+        if not blocks:
+            return sparse.csr_matrix((0, n_cols))
+
+        return sparse.vstack(blocks, format='csr')
+
     @staticmethod
     def _find_between(s, start, end):
         """
@@ -87,8 +124,7 @@ class DataUtil:
             if obj_ref:
                 included = value.split(':')[1]
                 included = '/' + included.replace('.', '/')
-                ref_data = self.wsClient.get_objects2({'objects': [{'ref': obj_ref,
-                                                       'included': [included]}]})['data'][0]['data']
+                ref_data = self.object_cache.get_subobject(obj_ref, [included])['data']
                 m_ref_data = DotMap(ref_data)
                 if ref_data:
                     if '*' not in included:
@@ -187,6 +223,8 @@ class DataUtil:
         self.serviceWizardURL = config['srv-wiz-url']
         self.wsClient = workspaceService(self.ws_url, token=self.token)
         self.dfu = DataFileUtil(self.callback_url)
+        self.object_cache = ObjectCache.shared(config)
+        self.matrix_cache = MatrixCache(self.scratch)
         self.generics_service = GenericsService(self.serviceWizardURL)
 
     def list_generic_types(self, params=None):
@@ -229,7 +267,101 @@ class DataUtil:
             if p not in params:
                 raise ValueError('"{}" parameter is required, but missing'.format(p))
 
-        return self.generics_service.fetch_data(params)
+        # the same matrix is fetched by several steps of a request, fetch it once
+        key = ('fetch_data', json.dumps(params, sort_keys=True))
+        data = self.object_cache.cached(key, lambda: self.generics_service.fetch_data(params))
+
+        return data
+
+    def _fetch_matrix_values(self, obj_ref):
+        """
+        _fetch_matrix_values: row ids, col ids and float values of the FloatMatrix2D data of a
+                              KBaseMatrices object, read from the scratch matrix cache or from
+                              the object itself
+
+        a matrix that is not cached yet is fetched as a whole, so the first read holds the parsed
+        value lists in memory while they are written to the cache row by row, only reads of the
+        memory-mapped cache are bounded by the blocks a computation touches
+        """
+        info = self.object_cache.get_object_info(obj_ref)
+        resolved_ref = '{}/{}/{}'.format(info[6], info[0], info[4])
+
+        cached_matrix = self.matrix_cache.get(resolved_ref)
+        if cached_matrix is not None:
+            return cached_matrix
+
+        obj_data = self.wsClient.get_objects2(
+                    {'objects': [{'ref': resolved_ref, 'included': ['/data']}]})['data'][0]['data']
+        matrix_data = obj_data.get('data')
+        if not isinstance(matrix_data, dict) or 'values' not in matrix_data:
+            raise ValueError('Object [{}] has no FloatMatrix2D data'.format(obj_ref))
+
+        row_ids = matrix_data.get('row_ids', [])
+        col_ids = matrix_data.get('col_ids', [])
+        # the value lists are written to the cache row by row, without a dense in-memory copy
+        self.matrix_cache.put(resolved_ref, row_ids, col_ids, matrix_data['values'])
+
+        # serve the memory-mapped copy, the parsed values can be dropped
+        cached_matrix = self.matrix_cache.get(resolved_ref)
+        if cached_matrix is None:
+            raise ValueError('Matrix [{}] could not be cached in scratch'.format(obj_ref))
+
+        return cached_matrix
+
+    def fetch_matrix_values(self, obj_ref):
+        """
+        fetch_matrix_values: row ids, col ids and read only float values (memory-mapped from the
+                             scratch matrix cache) of the FloatMatrix2D data of a KBaseMatrices
+                             object, for computations streaming over blocks of the matrix
+        """
+        return self.object_cache.cached(('matrix', obj_ref),
+                                        lambda: self._fetch_matrix_values(obj_ref))
+
+    def fetch_matrix_metadata(self, obj_ref):
+        """
+        fetch_matrix_metadata: the {'data': ..., 'info': ...} object of a KBaseMatrices object
+                               with every field of its type but the FloatMatrix2D data, whose
+                               values are read from the matrix cache (fetch_matrix_values)
+        """
+        info = self.object_cache.get_object_info(obj_ref)
+        resolved_ref = '{}/{}/{}'.format(info[6], info[0], info[4])
+
+        # the workspace only selects included paths, so the fields to keep come from the type
+        type_fields = self.object_cache.cached(
+                        ('type_fields', info[2]),
+                        lambda: sorted(json.loads(self.wsClient.get_type_info(
+                                                    info[2])['json_schema'])['properties']))
+        included = ['/' + field for field in type_fields if field != 'data']
+
+        return self.object_cache.get_subobject(resolved_ref, included)
+
+    def fetch_matrix_df(self, obj_ref):
+        """
+        fetch_matrix_df: FloatMatrix2D data of a KBaseMatrices object as a float data frame
+                         (rows: row_ids, columns: col_ids), built straight from the object
+                         values, with the GenericsService fetch_data as the fallback for
+                         objects it can not be read from
+        """
+        try:
+            row_ids, col_ids, values = self.fetch_matrix_values(obj_ref)
+        except (ValueError, TypeError) as e:
+            logging.warning('falling back to fetch_data: {}'.format(e))
+            data_matrix = self.fetch_data({'obj_ref': obj_ref}).get('data_matrix')
+            return pd.read_json(data_matrix)
+
+        # the cached values are shared, the data frame gets its own copy
+        return pd.DataFrame(np.array(values), index=row_ids, columns=col_ids)
+
+    def fetch_matrix_sparse(self, obj_ref):
+        """
+        fetch_matrix_sparse: row ids, col ids and CSR matrix of the FloatMatrix2D data of a
+                             KBaseMatrices object (missing values are 0), converted from its
+                             memory-mapped values SPARSE_ROW_BLOCK rows at a time so that memory
+                             follows the number of non-zeros
+        """
+        row_ids, col_ids, values = self.fetch_matrix_values(obj_ref)
+
+        return row_ids, col_ids, self.lists_to_sparse(values, len(col_ids))
 
     def validate_data(self, params):
         """
@@ -0,0 +1,201 @@
+import heapq
+import itertools
+import json
+import os
+import shutil
+import tempfile
+
+# streaming JSON serialization of report data: rows are serialized chunk by chunk straight into
+# the output file so that the whole JSON text never has to be held in memory
+
+ROW_CHUNK = 10000  # rows serialized at a time
+PAGE_SIZE = 10000  # rows per page file of paged table data
+SORT_RUN_SIZE = 10 ** 6  # rows sorted in memory at a time by sort_rows, runs are spilled to disk
+
+
+def _html_safe(text):
+    """
+    _html_safe: escape '</' so that JSON embedded in a <script> element can not close it
+    """
+    return text.replace('</', '<\\/')
+
+
+def frame_chunks(df, chunk_size=ROW_CHUNK):
+    """
+    frame_chunks: rows of a data frame as lists, chunk_size rows at a time
+    """
+    for start in range(0, df.shape[0], chunk_size):
+        yield df.iloc[start:start + chunk_size].values.tolist()
+
+
+def array_chunks(*arrays, chunk_size=ROW_CHUNK):
+    """
+    array_chunks: zipped rows of equally long arrays, chunk_size rows at a time
+    """
+    n_rows = len(arrays[0]) if arrays else 0
+    for start in range(0, n_rows, chunk_size):
+        yield list(zip(*[array[start:start + chunk_size].tolist() for array in arrays]))
+
+
+def write_array(fp, row_chunks, html_safe=False):
+    """
+    write_array: write all rows of the chunks to fp as one JSON array
+
+    return the number of rows written
+    """
+    n_rows = 0
+
+    fp.write('[')
+    for rows in row_chunks:
+        if not len(rows):
+            continue
+        text = json.dumps(list(rows))[1:-1]
+        if html_safe:
+            text = _html_safe(text)
+        if n_rows:
+            fp.write(', ')
+        fp.write(text)
+        n_rows += len(rows)
+    fp.write(']')
+
+    return n_rows
+
+
+def write_table(file_path, row_chunks):
+    """
+    write_table: write the rows as DataTables server-side data, the row counts follow the data so
+                 that the rows are counted while they are written
+
+    return the number of rows written
+    """
+    with open(file_path, 'w') as fp:
+        fp.write('{"draw": 1, "data": ')
+        n_rows = write_array(fp, row_chunks)
+        fp.write(', "recordsTotal": {0}, "recordsFiltered": {0}}}'.format(n_rows))
+
+    return n_rows
+
+
+def _pages(row_chunks, page_size):
+    """
+    _pages: regroup the rows of the chunks into lists of page_size rows
+    """
+    page = list()
+    for rows in row_chunks:
+        start = 0
+        while start < len(rows):
+            stop = start + page_size - len(page)
+            page.extend(rows[start:stop])
+            start = stop
+            if len(page) == page_size:
+                yield page
+                page = list()
+    if page:
+        yield page
+
+
+def _sort_key(column):
+    """
+    _sort_key: sort key of rows on a column, null cells sort above every value like in the
+               table template (last in ascending, first in descending order)
+    """
+    def key(row):
+        value = row[column]
+        return (value is None, 0 if value is None else value)
+
+    return key
+
+
+def _read_run(file_path):
+    with open(file_path) as fp:
+        for line in fp:
+            yield json.loads(line)
+
+
+def sort_rows(row_chunks, column, descending=False, run_size=SORT_RUN_SIZE, work_dir=None):
+    """
+    sort_rows: rows of the chunks sorted on a column (stable), in chunks of ROW_CHUNK rows, by an
+               external merge sort: runs of run_size rows are sorted in memory and spilled to
+               temporary JSON lines files under work_dir, which are merged lazily
+    """
+    key = _sort_key(column)
+    run_dir = tempfile.mkdtemp(dir=work_dir)
+    try:
+        run_paths = list()
+        run = list()
+        for rows in itertools.chain(row_chunks, [None]):
+            if rows is not None:
+                run.extend(rows)
+            if run and (rows is None or len(run) >= run_size):
+                run.sort(key=key, reverse=descending)
+                run_path = os.path.join(run_dir, 'run_{}.json'.format(len(run_paths)))
+                with open(run_path, 'w') as fp:
+                    for row in run:
+                        fp.write(json.dumps(list(row)) + '\n')
+                run_paths.append(run_path)
+                run = list()
+
+        chunk = list()
+        for row in heapq.merge(*[_read_run(run_path) for run_path in run_paths], key=key,
+                               reverse=descending):
+            chunk.append(row)
+            if len(chunk) == ROW_CHUNK:
+                yield chunk
+                chunk = list()
+        if chunk:
+            yield chunk
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def write_pages(directory, prefix, row_chunks, page_size=PAGE_SIZE, order=None):
+    """
+    write_pages: write the rows as JSON arrays of page_size rows, one file per page, and an
+                 index of the page files (prefix_index.json) for tables loading pages on demand
+
+    order: [column, 'asc' or 'desc'], the rows are sorted on it before they are paged (see
+           sort_rows) and the index records it, so that a table opening in that order only
+           loads the pages on display
+
+    return the index
+    """
+    if order:
+        row_chunks = sort_rows(row_chunks, order[0], descending=order[1] == 'desc',
+                               work_dir=directory)
+
+    pages = list()
+    n_rows = 0
+    for page in _pages(row_chunks, page_size):
+        page_file_name = '{}_page_{}.json'.format(prefix, len(pages))
+        with open(os.path.join(directory, page_file_name), 'w') as fp:
+            n_rows += write_array(fp, [page])
+        pages.append(page_file_name)
+
+    index = {'page_size': page_size, 'n_rows': n_rows, 'pages': pages}
+    if order:
+        index['order'] = [list(order)]
+    with open(os.path.join(directory, '{}_index.json'.format(prefix)), 'w') as fp:
+        json.dump(index, fp)
+
+    return index
+
+
+def write_template(file_path, template, arrays):
+    """
+    write_template: write the template with every placeholder (key of arrays) replaced by the
+                    JSON array of its row chunks, streamed into the <script> of an html report
+
+    return the number of rows written per placeholder
+    """
+    positions = sorted((template.index(placeholder), placeholder) for placeholder in arrays)
+
+    n_rows = dict()
+    with open(file_path, 'w') as fp:
+        end = 0
+        for position, placeholder in positions:
+            fp.write(template[end:position])
+            n_rows[placeholder] = write_array(fp, arrays[placeholder], html_safe=True)
+            end = position + len(placeholder)
+        fp.write(template[end:])
+
+    return n_rows
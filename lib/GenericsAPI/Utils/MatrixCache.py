@@ -0,0 +1,125 @@
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+class MatrixCache:
+    """
+    on-disk cache of FloatMatrix2D data in scratch, keyed by resolved (versioned) object
+    reference, which is immutable: values are stored as a float64 .npy file that is opened
+    memory-mapped, row and col ids as unicode .npy files
+
+    least recently used matrices are removed once all of them exceed max_size bytes
+    """
+
+    MAX_SIZE = 5 * 1024 ** 3  # default bound of the size of all cached matrix files in bytes
+    DIRECTORY = 'matrix_cache'
+
+    @staticmethod
+    def _entry_size(entry_dir):
+        return sum(os.path.getsize(os.path.join(entry_dir, file_name))
+                   for file_name in os.listdir(entry_dir))
+
+    def __init__(self, scratch, max_size=MAX_SIZE):
+        self.directory = os.path.join(scratch, self.DIRECTORY)
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _entry_dir(self, resolved_ref):
+        return os.path.join(self.directory, resolved_ref.replace('/', '_'))
+
+    def get(self, resolved_ref):
+        """
+        get: row ids, col ids and memory-mapped (read only) values of the cached matrix, None if
+             it is not cached
+        """
+        entry_dir = self._entry_dir(resolved_ref)
+        if not os.path.isdir(entry_dir):
+            return None
+
+        try:
+            row_ids = np.load(os.path.join(entry_dir, 'row_ids.npy')).tolist()
+            col_ids = np.load(os.path.join(entry_dir, 'col_ids.npy')).tolist()
+            values = np.load(os.path.join(entry_dir, 'values.npy'), mmap_mode='r')
+        except (IOError, ValueError) as e:
+            logging.warning('dropping unreadable cached matrix [{}]: {}'.format(resolved_ref, e))
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        # the modification time of an entry orders the eviction
+        os.utime(entry_dir)
+        logging.info('opened cached matrix [{}]'.format(resolved_ref))
+
+        return row_ids, col_ids, values
+
+    @staticmethod
+    def _save_values(values_path, values, shape):
+        """
+        _save_values: write values of the given shape, an array or a sequence of rows (e.g. the
+                      value lists of a fetched object, missing values (None) become NaN) that is
+                      written to the memory-mapped file one row at a time
+        """
+        if isinstance(values, np.ndarray) or 0 in shape:
+            np.save(values_path, np.asarray(values, dtype=np.float64).reshape(shape))
+            return
+
+        values_out = np.lib.format.open_memmap(values_path, mode='w+', dtype=np.float64,
+                                               shape=shape)
+        n_rows = 0
+        for row_index, row in enumerate(values):
+            values_out[row_index] = row
+            n_rows += 1
+        if n_rows != shape[0]:
+            raise ValueError('Expected {} rows of values, got {}'.format(shape[0], n_rows))
+        values_out.flush()
+
+    def put(self, resolved_ref, row_ids, col_ids, values):
+        """
+        put: store the matrix, written to a temporary directory first so that readers never see
+             a partial entry, values is an array or a sequence of rows (see _save_values)
+        """
+        tmp_dir = tempfile.mkdtemp(dir=self.directory, prefix='.tmp_')
+        try:
+            np.save(os.path.join(tmp_dir, 'row_ids.npy'), np.array(row_ids, dtype=np.str_))
+            np.save(os.path.join(tmp_dir, 'col_ids.npy'), np.array(col_ids, dtype=np.str_))
+            self._save_values(os.path.join(tmp_dir, 'values.npy'), values,
+                              (len(row_ids), len(col_ids)))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        try:
+            os.rename(tmp_dir, self._entry_dir(resolved_ref))
+        except OSError:
+            # cached by another process meanwhile
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self._evict()
+
+    def _evict(self):
+        """
+        _evict: remove the least recently used matrices until the cache fits max_size, the most
+                recent one is kept
+        """
+        entries = list()
+        for entry_name in os.listdir(self.directory):
+            if entry_name.startswith('.'):
+                continue
+            entry_dir = os.path.join(self.directory, entry_name)
+            try:
+                entries.append((os.path.getmtime(entry_dir), entry_dir,
+                                self._entry_size(entry_dir)))
+            except OSError:
+                continue
+
+        entries.sort()
+        total_size = sum(size for _, _, size in entries)
+        for _, entry_dir, size in entries[:-1]:
+            if total_size <= self.max_size:
+                break
+            logging.info('evicted [{}] from matrix cache'.format(entry_dir))
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
@@ -15,6 +15,7 @@ from sklearn import preprocessing
 from installed_clients.DataFileUtilClient import DataFileUtil
 from GenericsAPI.Utils.AttributeUtils import AttributesUtil
 from GenericsAPI.Utils.DataUtil import DataUtil
+from GenericsAPI.Utils.ObjectCache import ObjectCache
 from installed_clients.KBaseReportClient import KBaseReport
 
 TYPE_ATTRIBUTES = {'description', 'scale', 'row_normalization', 'col_normalization'}
@@ -409,12 +410,24 @@ class MatrixUtil:
 
         return standardize_df
 
+    def _standardize_sparse(self, matrix, with_std=True):
+        """
+        _standardize_sparse: scale the columns of a sparse matrix to unit variance without
+                             centering them, which keeps the zeros (and the matrix sparse)
+        """
+        logging.info("Scaling sparse matrix data")
+
+        scaler = preprocessing.StandardScaler(with_mean=False, with_std=with_std).fit(matrix)
+
+        return scaler.transform(matrix)
+
     def __init__(self, config):
         self.callback_url = config['SDK_CALLBACK_URL']
         self.scratch = config['scratch']
         self.token = config['KB_AUTH_TOKEN']
         self.dfu = DataFileUtil(self.callback_url)
         self.data_util = DataUtil(config)
+        self.object_cache = ObjectCache.shared(config)
         self.attr_util = AttributesUtil(config)
         self.matrix_types = [x.split(".")[1].split('-')[0]
                              for x in self.data_util.list_generic_types()]
@@ -435,23 +448,34 @@ class MatrixUtil:
         else:
             workspace_id = workspace_name
 
-        input_matrix_obj = self.dfu.get_objects({'object_refs': [input_matrix_ref]})['data'][0]
+        # every field but the matrix values, which are read from the scratch matrix cache
+        input_matrix_obj = self.data_util.fetch_matrix_metadata(input_matrix_ref)
         input_matrix_info = input_matrix_obj['info']
         input_matrix_name = input_matrix_info[1]
-        input_matrix_data = input_matrix_obj['data']
+        # the cached object is shared, the new matrix gets its own copy of the fields
+        input_matrix_data = dict(input_matrix_obj['data'])
 
         if not new_matrix_name:
             current_time = time.localtime()
             new_matrix_name = input_matrix_name + time.strftime('_%H_%M_%S_%Y_%m_%d', current_time)
 
-        data_matrix = self.data_util.fetch_data({'obj_ref': input_matrix_ref}).get('data_matrix')
-        df = pd.read_json(data_matrix)
+        if with_mean:
+            df = self.data_util.fetch_matrix_df(input_matrix_ref)
 
-        standardize_df = self._standardize_df(df, with_mean, with_std)
+            standardize_df = self._standardize_df(df, with_mean, with_std)
 
-        new_matrix_data = {'row_ids': df.index.tolist(),
-                           'col_ids': df.columns.tolist(),
-                           'values': standardize_df.values.tolist()}
+            new_matrix_data = {'row_ids': df.index.tolist(),
+                               'col_ids': df.columns.tolist(),
+                               'values': standardize_df.values.tolist()}
+        else:
+            # scaling only, mostly zero (e.g. amplicon count) matrices are kept sparse, built
+            # from the memory-mapped values block by block
+            row_ids, col_ids, matrix = self.data_util.fetch_matrix_sparse(input_matrix_ref)
+
+            new_matrix_data = {'row_ids': row_ids,
+                               'col_ids': col_ids,
+                               'values': self.data_util.sparse_to_lists(
+                                                    self._standardize_sparse(matrix, with_std))}
 
         input_matrix_data['data'] = new_matrix_data
 
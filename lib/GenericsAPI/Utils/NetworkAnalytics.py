@@ -0,0 +1,245 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+# bulk network analytics over a sparse (CSR) adjacency matrix built from arrays of edge end points
+# (node indices): connected components, degree, Louvain communities and betweenness centrality
+# approximated from a sample of BFS sources
+
+BETWEENNESS_SAMPLES = 100  # default number of sampled BFS sources for betweenness centrality
+SOURCE_BLOCK = 64  # BFS sources traversed at a time
+LOUVAIN_LEVELS = 10  # maximum number of community aggregation levels
+MIN_GAIN = 1e-7  # minimum modularity gain of a local moving round to go on
+START_MOVE_PROBABILITY = 0.5  # probability of a node to make its best move in a round
+MIN_MOVE_PROBABILITY = 1e-3  # local moving stops below this move probability
+
+
+def adjacency(source, target, n_nodes, weights=None):
+    """
+    adjacency: symmetric CSR adjacency matrix of the undirected network with edges between the
+               source and target node indices, weighted by the absolute edge weight
+    """
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    strength = np.ones(source.size) if weights is None else np.abs(np.asarray(weights,
+                                                                              dtype=np.float64))
+
+    links = source != target
+    adj = sparse.coo_matrix((strength[links], (source[links], target[links])),
+                            shape=(n_nodes, n_nodes)).tocsr()
+
+    return adj.maximum(adj.T).tocsr()
+
+
+def connected_components(adj):
+    """
+    connected_components: number of connected components and component label of every node,
+                          components are numbered by decreasing size
+    """
+    n_components, labels = csgraph.connected_components(adj, directed=False)
+
+    # relabel the largest component as 0
+    order = np.argsort(-np.bincount(labels, minlength=n_components), kind='mergesort')
+    rank = np.empty(n_components, dtype=np.int64)
+    rank[order] = np.arange(n_components)
+
+    return n_components, rank[labels]
+
+
+def degree(adj):
+    """
+    degree: number of neighbours of every node
+    """
+    return np.diff(adj.indptr)
+
+
+def modularity(adj, communities, resolution=1.):
+    """
+    modularity: modularity of the partition of the weighted network into communities
+    """
+    total = adj.sum()
+    if total == 0:
+        return 0.
+
+    n_communities = communities.max() + 1
+    adj = adj.tocoo()
+    inside = communities[adj.row] == communities[adj.col]
+    inside_weight = np.bincount(communities[adj.row[inside]], weights=adj.data[inside],
+                                minlength=n_communities)
+    community_strength = np.bincount(communities, weights=np.asarray(adj.sum(axis=1)).ravel(),
+                                     minlength=n_communities)
+
+    return float((inside_weight / total -
+                  resolution * (community_strength / total) ** 2).sum())
+
+
+def _membership(communities, n_communities):
+    """
+    _membership: sparse node x community indicator matrix
+    """
+    return sparse.csr_matrix((np.ones(communities.size),
+                              (np.arange(communities.size), communities)),
+                             shape=(communities.size, n_communities))
+
+
+def _best_moves(links_adj, communities, node_strength, total, resolution):
+    """
+    _best_moves: for every node the neighbouring community with the largest modularity gain,
+                 its current community if no move gains
+    """
+    n_nodes = communities.size
+    community_strength = np.bincount(communities, weights=node_strength, minlength=n_nodes)
+
+    # links of every node to every neighbouring community
+    links = links_adj.dot(_membership(communities, n_nodes)).tocsr()
+    rows = np.repeat(np.arange(n_nodes), np.diff(links.indptr))
+    cols = links.indices
+    own = cols == communities[rows]
+    scores = links.data - resolution * node_strength[rows] / total * (
+        community_strength[cols] - own * node_strength[rows])
+
+    stay = -resolution * node_strength / total * (community_strength[communities] -
+                                                  node_strength)
+    stay[rows[own]] = scores[own]
+
+    # highest score of every node with any link
+    order = np.lexsort((-scores, rows))
+    first = order[np.r_[0, np.nonzero(np.diff(rows[order]))[0] + 1]] if order.size else order
+    better = first[scores[first] > stay[rows[first]] + MIN_GAIN * total]
+
+    moves = communities.copy()
+    moves[rows[better]] = cols[better]
+
+    return moves
+
+
+def _local_moving(adj, resolution, random_state):
+    """
+    _local_moving: move nodes to the neighbouring community with the largest modularity gain,
+                   all at once in rounds over sparse products, each mover with a probability that
+                   is halved whenever a round does not improve the modularity (simultaneous moves
+                   can undo each other)
+
+    returns the community of every node and whether any node moved
+    """
+    n_nodes = adj.shape[0]
+    total = adj.sum()
+    node_strength = np.asarray(adj.sum(axis=1)).ravel()
+    links_adj = (adj - sparse.diags(adj.diagonal())).tocsr()
+    links_adj.eliminate_zeros()
+
+    communities = np.arange(n_nodes)
+    quality = modularity(adj, communities, resolution)
+    move_probability = START_MOVE_PROBABILITY
+    moved = False
+
+    while total > 0 and move_probability >= MIN_MOVE_PROBABILITY:
+        moves = _best_moves(links_adj, communities, node_strength, total, resolution)
+        movers = moves != communities
+        if not movers.any():
+            break
+
+        movers &= random_state.uniform(size=n_nodes) < move_probability
+        new_communities = np.where(movers, moves, communities)
+        new_quality = modularity(adj, new_communities, resolution)
+        if new_quality > quality + MIN_GAIN:
+            communities, quality, moved = new_communities, new_quality, True
+        else:
+            move_probability /= 2
+
+    return communities, moved
+
+
+def _aggregate(adj, communities):
+    """
+    _aggregate: network of the communities, intra-community links become self loops
+    """
+    membership = _membership(communities, communities.max() + 1)
+
+    return (membership.T.dot(adj).dot(membership)).tocsr()
+
+
+def louvain(adj, resolution=1., random_seed=None, max_levels=LOUVAIN_LEVELS):
+    """
+    louvain: communities of the weighted network maximizing modularity with the Louvain method,
+             local moving of nodes alternated with the aggregation of the communities
+
+    returns the community label of every node, communities are numbered by decreasing size
+    """
+    random_state = np.random.RandomState(random_seed)
+
+    membership = np.arange(adj.shape[0])
+    graph = sparse.csr_matrix(adj, dtype=np.float64)
+    for level in range(max_levels):
+        communities, moved = _local_moving(graph, resolution, random_state)
+        if not moved:
+            break
+
+        communities = np.unique(communities, return_inverse=True)[1]
+        membership = communities[membership]
+        graph = _aggregate(graph, communities)
+
+    sizes = np.bincount(membership)
+    order = np.argsort(-sizes, kind='mergesort')
+    rank = np.empty(sizes.size, dtype=np.int64)
+    rank[order] = np.arange(sizes.size)
+
+    return rank[membership]
+
+
+def _source_dependencies(adj, sources):
+    """
+    _source_dependencies: Brandes dependencies of every node on the shortest (fewest hops)
+                          paths from each of the sources, one BFS per column run level by level
+                          with sparse products
+    """
+    n_nodes = adj.shape[0]
+    columns = np.arange(sources.size)
+
+    dist = np.full((n_nodes, sources.size), -1, dtype=np.int64)
+    paths = np.zeros((n_nodes, sources.size))
+    dist[sources, columns] = 0
+    paths[sources, columns] = 1
+
+    # forward: count the shortest paths reaching each level
+    frontier = paths.copy()
+    level = 0
+    while frontier.any():
+        level += 1
+        reach = adj.dot(frontier)
+        new = (reach > 0) & (dist < 0)
+        dist[new] = level
+        paths[new] = reach[new]
+        frontier = np.where(new, paths, 0)
+
+    # backward: accumulate the dependencies from the farthest level
+    dependencies = np.zeros_like(paths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for level in range(level - 1, 0, -1):
+            coefficient = np.where(dist == level + 1, (1 + dependencies) / paths, 0)
+            dependencies += np.where(dist == level, paths * adj.dot(coefficient), 0)
+
+    return dependencies.sum(axis=1)
+
+
+def betweenness(adj, n_samples=BETWEENNESS_SAMPLES, random_seed=None):
+    """
+    betweenness: normalized betweenness centrality of every node (same scale as
+                 networkx.betweenness_centrality), exact when n_samples is at least the number of
+                 nodes, otherwise estimated from the shortest paths of n_samples random sources
+    """
+    n_nodes = adj.shape[0]
+    if n_nodes < 3:
+        return np.zeros(n_nodes)
+
+    hops = sparse.csr_matrix((np.ones(adj.nnz), adj.indices, adj.indptr), shape=adj.shape)
+    if n_samples >= n_nodes:
+        sources = np.arange(n_nodes)
+    else:
+        sources = np.random.RandomState(random_seed).choice(n_nodes, n_samples, replace=False)
+
+    centrality = np.zeros(n_nodes)
+    for start in range(0, sources.size, SOURCE_BLOCK):
+        centrality += _source_dependencies(hops, sources[start:start + SOURCE_BLOCK])
+
+    return centrality * n_nodes / sources.size / ((n_nodes - 1) * (n_nodes - 2))
@@ -0,0 +1,178 @@
+import math
+
+import numpy as np
+
+# force-directed (Fruchterman-Reingold) layout of networks given as arrays of edge end points
+# (node indices), repulsion between all nodes is approximated Barnes-Hut style on a hierarchy of
+# regular grids so that an iteration costs O(N log N) instead of O(N^2)
+
+LAYOUT_ITERATIONS = 50  # default iteration budget
+LEAF_SIZE = 8  # average number of nodes per cell of the finest grid
+MIN_DISTANCE = 1e-6  # floor of node distances, avoids infinite forces between close nodes
+NODE_BLOCK = 2 ** 16  # nodes handled at a time for the far field repulsion
+
+
+def _sum_rows(index, values, size):
+    """
+    _sum_rows: sum the rows of the 2 column values per index
+    """
+    return np.column_stack([np.bincount(index, weights=values[:, 0], minlength=size),
+                            np.bincount(index, weights=values[:, 1], minlength=size)])
+
+
+def _repulsion(delta, k_square):
+    """
+    _repulsion: repulsive displacement of magnitude k^2 / d along delta (of length d)
+    """
+    dist_square = np.maximum(np.einsum('ij,ij->i', delta, delta), MIN_DISTANCE ** 2)
+
+    return delta * (k_square / dist_square)[:, np.newaxis]
+
+
+def _grid_cells(unit_pos, size):
+    """
+    _grid_cells: (x, y) cell of every node on a size x size grid over the unit square
+    """
+    return np.minimum((unit_pos * size).astype(np.int64), size - 1)
+
+
+def _depth(n_nodes):
+    """
+    _depth: level of the finest grid (2^depth cells per side), holding about LEAF_SIZE nodes
+            per cell
+    """
+    return max(2, int(math.ceil(math.log(max(n_nodes, 1) / float(LEAF_SIZE), 4))))
+
+
+def _far_repulsion(pos, unit_pos, k_square, depth):
+    """
+    _far_repulsion: repulsion from the nodes that are not in neighbouring cells of the finest
+                    grid, every level of the grid hierarchy handles the cells that are well
+                    separated at that level but not at the coarser one (the children of the
+                    neighbours of the parent cell, at most 27), whose nodes are replaced by their
+                    centroid weighted with their number
+    """
+    n_nodes = pos.shape[0]
+    disp = np.zeros_like(pos)
+    offsets = np.arange(6)
+
+    for level in range(2, depth + 1):
+        size = 2 ** level
+        cell = _grid_cells(unit_pos, size)
+        cell_id = cell[:, 0] * size + cell[:, 1]
+        mass = np.bincount(cell_id, minlength=size * size)
+        centroid = _sum_rows(cell_id, pos, size * size) / np.maximum(mass, 1)[:, np.newaxis]
+
+        first_child = 2 * (cell // 2) - 2
+        for start in range(0, n_nodes, NODE_BLOCK):
+            nodes = slice(start, min(start + NODE_BLOCK, n_nodes))
+            # the 6 x 6 candidate cells of every node
+            x = (first_child[nodes, 0, np.newaxis] + offsets)[:, :, np.newaxis]
+            y = (first_child[nodes, 1, np.newaxis] + offsets)[:, np.newaxis, :]
+            x, y = np.broadcast_arrays(x, y)
+            far = ((x >= 0) & (x < size) & (y >= 0) & (y < size) &
+                   ((np.abs(x - cell[nodes, 0, np.newaxis, np.newaxis]) > 1) |
+                    (np.abs(y - cell[nodes, 1, np.newaxis, np.newaxis]) > 1)))
+            far_cells = np.where(far, x * size + y, 0).reshape(far.shape[0], -1)
+            far_mass = np.where(far.reshape(far.shape[0], -1), mass[far_cells], 0)
+
+            delta = pos[nodes, np.newaxis, :] - centroid[far_cells]
+            dist_square = np.maximum(np.einsum('ijk,ijk->ij', delta, delta), MIN_DISTANCE ** 2)
+            disp[nodes] += np.einsum('ijk,ij->ik', delta, k_square * far_mass / dist_square)
+
+    return disp
+
+
+def _near_repulsion(pos, unit_pos, k_square, depth):
+    """
+    _near_repulsion: exact repulsion between the nodes of neighbouring cells of the finest grid
+    """
+    n_nodes = pos.shape[0]
+    disp = np.zeros_like(pos)
+
+    size = 2 ** depth
+    cell = _grid_cells(unit_pos, size)
+    cell_id = cell[:, 0] * size + cell[:, 1]
+    order = np.argsort(cell_id, kind='mergesort')
+    sorted_cells = cell_id[order]
+    all_cells = np.arange(size * size)
+    starts = np.searchsorted(sorted_cells, all_cells)
+    counts = np.searchsorted(sorted_cells, all_cells, side='right') - starts
+
+    for x_offset in [-1, 0, 1]:
+        x = cell[:, 0] + x_offset
+        for y_offset in [-1, 0, 1]:
+            y = cell[:, 1] + y_offset
+            nodes = np.nonzero((x >= 0) & (x < size) & (y >= 0) & (y < size))[0]
+            near_cells = x[nodes] * size + y[nodes]
+
+            # every node against all the nodes of its neighbour cell
+            pair_counts = counts[near_cells]
+            node_i = np.repeat(nodes, pair_counts)
+            pair_starts = np.cumsum(pair_counts) - pair_counts
+            pair_offsets = (np.arange(node_i.size) -
+                            np.repeat(pair_starts - starts[near_cells], pair_counts))
+            node_j = order[pair_offsets]
+
+            other = node_i != node_j
+            node_i, node_j = node_i[other], node_j[other]
+            disp += _sum_rows(node_i, _repulsion(pos[node_i] - pos[node_j], k_square), n_nodes)
+
+    return disp
+
+
+def repulsion(pos, k_square):
+    """
+    repulsion: approximate total repulsive displacement k^2 / d of every node from all the others
+    """
+    pos = np.asarray(pos, dtype=np.float64)
+    if pos.shape[0] < 2:
+        return np.zeros_like(pos)
+
+    low = pos.min(axis=0)
+    extent = max(float((pos.max(axis=0) - low).max()), MIN_DISTANCE)
+    unit_pos = (pos - low) / extent
+    depth = _depth(pos.shape[0])
+
+    return (_far_repulsion(pos, unit_pos, k_square, depth) +
+            _near_repulsion(pos, unit_pos, k_square, depth))
+
+
+def force_layout(source, target, n_nodes, weights=None, iterations=LAYOUT_ITERATIONS,
+                 random_seed=None):
+    """
+    force_layout: Fruchterman-Reingold layout of the network with edges between the source and
+                  target node indices, edges pull in proportion to their absolute weight
+
+    returns the (n_nodes, 2) node positions scaled to the unit square
+    """
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    strength = np.ones(source.size) if weights is None else np.abs(np.asarray(weights,
+                                                                              dtype=np.float64))
+
+    random_state = np.random.RandomState(random_seed)
+    pos = random_state.uniform(size=(n_nodes, 2))
+    if n_nodes < 2:
+        return pos
+
+    k = math.sqrt(1. / n_nodes)
+    start_temperature = 0.1
+    for iteration in range(iterations):
+        disp = repulsion(pos, k * k)
+
+        delta = pos[source] - pos[target]
+        dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        force = delta * (dist * strength / k)[:, np.newaxis]
+        disp += _sum_rows(target, force, n_nodes) - _sum_rows(source, force, n_nodes)
+
+        # move at most by the temperature, which cools down linearly
+        temperature = start_temperature * (1 - iteration / float(iterations))
+        length = np.maximum(np.sqrt(np.einsum('ij,ij->i', disp, disp)), MIN_DISTANCE)
+        pos += disp * (np.minimum(length, temperature) / length)[:, np.newaxis]
+
+    pos -= pos.min(axis=0)
+    extent = pos.max(axis=0)
+    extent[extent == 0] = 1
+
+    return pos / extent
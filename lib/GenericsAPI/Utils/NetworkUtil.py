@@ -1,14 +1,12 @@
 import errno
 import json
 import logging
-import math
 import os
 import shutil
 import uuid
-from random import randint
-from random import seed
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
 from matplotlib import pyplot as plt
@@ -17,12 +15,17 @@ from plotly.offline import plot
 from installed_clients.DataFileUtilClient import DataFileUtil
 from GenericsAPI.Utils.CorrelationUtil import CorrelationUtil
 from GenericsAPI.Utils.DataUtil import DataUtil
+from GenericsAPI.Utils import JSONStream
+from GenericsAPI.Utils import NetworkAnalytics
+from GenericsAPI.Utils import NetworkLayout
+from GenericsAPI.Utils.ObjectCache import ObjectCache
 from installed_clients.KBaseReportClient import KBaseReport
 
 
 class NetworkUtil:
 
     SIGMA_PATH = '/kb/module/sigma_js'
+    EDGE_BLOCK_ROWS = 1000  # rows of the correlation matrix filtered at a time
 
     def _mkdir_p(self, path):
         """
@@ -61,17 +64,22 @@ class NetworkUtil:
 
         return links
 
-    def _generate_visualization_content(self, graph):
+    def _generate_visualization_content(self, network):
         """
-        _generate_visualization_content: generate visualization html content
+        _generate_visualization_content: row chunks of the nodes, with their precomputed layout
+                                         coordinates, and of the edges for the html report
         """
+        node_ids, node_1, node_2, _, pos = network
 
-        graph_nodes_content = str(graph.nodes()).replace('u', '')
-        graph_edges_content = str([list(edge) for edge in graph.edges()]).replace('u', '')
+        graph_nodes_content = ([{'id': node_id, 'label': node_id, 'x': x, 'y': y, 'size': 1}
+                                for node_id, x, y in rows]
+                               for rows in JSONStream.array_chunks(node_ids, pos[:, 0],
+                                                                   pos[:, 1]))
+        graph_edges_content = JSONStream.array_chunks(node_ids[node_1], node_ids[node_2])
 
         return graph_nodes_content, graph_edges_content
 
-    def _generate_network_html_report(self, graph):
+    def _generate_network_html_report(self, network):
         """
         _generate_network_html_report: generate html summary report
         """
@@ -85,17 +93,14 @@ class NetworkUtil:
 
         shutil.copytree(self.SIGMA_PATH, os.path.join(output_directory, 'sigma_js'))
 
-        graph_nodes_content, graph_edges_content = self._generate_visualization_content(graph)
+        graph_nodes_content, graph_edges_content = self._generate_visualization_content(network)
 
-        with open(result_file_path, 'w') as result_file:
-            with open(os.path.join(os.path.dirname(__file__), 'templates', 'network_template.html'),
-                      'r') as report_template_file:
-                report_template = report_template_file.read()
-                report_template = report_template.replace('//GRAPH_NODES',
-                                                          graph_nodes_content)
-                report_template = report_template.replace('//GRAPH_EDGES',
-                                                          graph_edges_content)
-                result_file.write(report_template)
+        with open(os.path.join(os.path.dirname(__file__), 'templates', 'network_template.html'),
+                  'r') as report_template_file:
+            report_template = report_template_file.read()
+        JSONStream.write_template(result_file_path, report_template,
+                                  {'//GRAPH_NODES': graph_nodes_content,
+                                   '//GRAPH_EDGES': graph_edges_content})
 
         report_shock_id = self.dfu.file_to_shock({'file_path': output_directory,
                                                   'pack': 'zip'})['shock_id']
@@ -107,7 +112,7 @@ class NetworkUtil:
                             })
         return html_report
 
-    def _generate_plotly_network(self, graph):
+    def _generate_plotly_network(self, network):
         """
         _generate_ploty_network: generate html summary report
         """
@@ -119,7 +124,7 @@ class NetworkUtil:
         self._mkdir_p(output_directory)
         result_file_path = os.path.join(output_directory, 'network_report.html')
 
-        self._plotly_network(graph, result_file_path)
+        self._plotly_network(network, result_file_path)
 
         report_shock_id = self.dfu.file_to_shock({'file_path': output_directory,
                                                   'pack': 'zip'})['shock_id']
@@ -131,81 +136,46 @@ class NetworkUtil:
                             })
         return html_report
 
-    def _plotly_network(self, graph, result_file_path):
-        logging.info('start ploting network using plotly')
-
-        # create node position
-        seed(1)
-        nodes = dict()
-        for edge in list(graph.edges(data=True)):
-            node1 = edge[0]
-            node2 = edge[1]
-            weight = (1 - abs(edge[2]['weight'])) * 100
-
-            if node1 in nodes and node2 not in nodes:
-                x1, y1 = nodes[node1]['pos']
-
-                radians = randint(0, 10)
-                x2 = x1 + int(math.cos(radians) * weight)
-                y2 = y1 + int(math.sin(radians) * weight)
-
-                nodes.update({node2: {'pos': (x2, y2)}})
-            elif node2 in nodes and node1 not in nodes:
-                x2, y2 = nodes[node2]['pos']
-
-                radians = randint(0, 10)
-                x1 = x2 + int(math.cos(radians) * weight)
-                y1 = y2 + int(math.sin(radians) * weight)
+    @staticmethod
+    def _edge_coordinates(pos, node_1, node_2):
+        """
+        _edge_coordinates: x and y line coordinates of the edges, separated by None
+        """
+        coordinates = list()
+        for axis in range(2):
+            lines = np.full((node_1.size, 3), None, dtype=object)
+            lines[:, 0] = pos[node_1, axis]
+            lines[:, 1] = pos[node_2, axis]
+            coordinates.append(lines.ravel().tolist())
 
-                nodes.update({node1: {'pos': (x1, y1)}})
-            else:
-                x1 = randint(0, 100)
-                y1 = randint(0, 100)
-                nodes.update({node1: {'pos': (x1, y1)}})
+        return coordinates
 
-                radians = randint(0, 10)
-                x2 = x1 + int(math.cos(radians) * weight)
-                y2 = y1 + int(math.sin(radians) * weight)
+    def _plotly_network(self, network, result_file_path):
+        logging.info('start ploting network using plotly')
 
-                nodes.update({node2: {'pos': (x2, y2)}})
+        node_ids, node_1, node_2, weights, pos = network
 
         # create edges
-        edge_trace_pos = go.Scatter(x=[], y=[], line=dict(width=0.6, color='#888'),
+        positive = weights >= 0
+        pos_x, pos_y = self._edge_coordinates(pos, node_1[positive], node_2[positive])
+        neg_x, neg_y = self._edge_coordinates(pos, node_1[~positive], node_2[~positive])
+        edge_trace_pos = go.Scatter(x=pos_x, y=pos_y, line=dict(width=0.6, color='#888'),
                                     hoverinfo='text', mode='lines', name='positive correlation')
-        edge_trace_neg = go.Scatter(x=[], y=[], line=dict(width=0.6, color='#888'),
+        edge_trace_neg = go.Scatter(x=neg_x, y=neg_y, line=dict(width=0.6, color='#888'),
                                     hoverinfo='text', mode='lines', name='negative correlation')
 
-        for edge in graph.edges(data=True):
-            x0, y0 = nodes[edge[0]]['pos']
-            x1, y1 = nodes[edge[1]]['pos']
-            if edge[2]['weight'] >= 0:
-                edge_trace_pos['x'] += tuple([x0, x1, None])
-                edge_trace_pos['y'] += tuple([y0, y1, None])
-            else:
-                edge_trace_neg['x'] += tuple([x0, x1, None])
-                edge_trace_neg['y'] += tuple([y0, y1, None])
-
-        # create nodes
-        node_trace = go.Scatter(x=[], y=[], text=[], mode='markers', hoverinfo='text',
+        # create nodes, colored by their number of connections
+        degree = np.bincount(np.concatenate([node_1, node_2]), minlength=node_ids.size)
+        node_text = ['{}, {} connections'.format(node_id, connections)
+                     for node_id, connections in zip(node_ids.tolist(), degree.tolist())]
+        node_trace = go.Scatter(x=pos[:, 0].tolist(), y=pos[:, 1].tolist(), text=node_text,
+                                mode='markers', hoverinfo='text',
                                 marker=dict(showscale=True, colorscale='YlGnBu',
-                                            reversescale=True, color=[], size=10,
+                                            reversescale=True, color=degree.tolist(), size=10,
                                             colorbar=dict(thickness=15, title='Node Connections',
                                                           xanchor='left', titleside='right'),
                                             line=dict(width=2)))
 
-        for node in nodes:
-            x, y = nodes[node]['pos']
-            node_trace['x'] += tuple([x])
-            node_trace['y'] += tuple([y])
-
-        # color and text Node points
-        for node, adjacencies in enumerate(graph.adjacency()):
-            node_trace['marker']['color'] += tuple([len(adjacencies[1])])
-            node_info = adjacencies[0]
-            connections = list(adjacencies[1].keys())
-            node_info += ', {} connections'.format(len(connections))
-            node_trace['text'] += tuple([node_info])
-
         # create network graph
         fig = go.Figure(data=[edge_trace_pos, edge_trace_neg, node_trace],
                         layout=go.Layout(title='<br>Correlation Network', titlefont=dict(size=16),
@@ -216,13 +186,15 @@ class NetworkUtil:
 
         plot(fig, filename=result_file_path)
 
-    def _generate_network_report(self, graph, network_obj_ref, workspace_name):
+    def _generate_network_report(self, edges, network_obj_ref, workspace_name,
+                                 layout_iterations=NetworkLayout.LAYOUT_ITERATIONS):
         """
         _generate_report: generate summary report
         """
         logging.info('Start creating report')
 
-        output_html_files = self._generate_plotly_network(graph)
+        output_html_files = self._generate_plotly_network(
+                                        self._network_layout(edges, layout_iterations))
 
         report_params = {'message': '',
                          'objects_created': [{'ref': network_obj_ref,
@@ -258,9 +230,13 @@ class NetworkUtil:
 
         return links_filtered
 
-    def _build_network_object(self, graph, workspace_name, network_obj_name, corr_matrix_ref):
+    def _build_network_object(self, edges, workspace_name, network_obj_name, corr_matrix_ref,
+                              corr_data=None, network_analysis=None):
         """
-        _build_network_object: tansform graph to KBbase network object
+        _build_network_object: tansform edge arrays of _extract_edges to KBbase network object
+
+        corr_data: data of corr_matrix_ref, fetched if missing
+        network_analysis: keyword arguments of _network_analytics, no analytics if missing
         """
 
         if not isinstance(workspace_name, int):
@@ -271,24 +247,15 @@ class NetworkUtil:
         network_data = {'description': 'Correlation Network'}
         network_data.update({'corr_matrix_ref': corr_matrix_ref})
 
-        corr_data = self.dfu.get_objects({'object_refs': [corr_matrix_ref]})['data'][0]['data']
+        if corr_data is None:
+            corr_data = self.object_cache.get_object(corr_matrix_ref)['data']
         original_matrix_ref = corr_data.get('original_matrix_ref')
 
         if original_matrix_ref:
             network_data.update({'original_matrix_ref': original_matrix_ref})
 
-        nodes_list = list(graph.nodes())
-        nodes = dict()
-        for node in nodes_list:
-            nodes.update({node: {'label': node}})
-        network_data.update({'nodes': nodes})
-
-        edges = list()
-        for edge in list(graph.edges(data=True)):
-            edges.append({'node_1_id': edge[0],
-                          'node_2_id': edge[1],
-                          'weight': edge[2]['weight']})
-        network_data.update({'edges': edges})
+        network_data.update(self._edges_to_network_data(edges,
+                                                        network_analysis=network_analysis))
 
         obj_type = 'KBaseExperiments.Network'
         info = self.dfu.save_objects({
@@ -315,20 +282,258 @@ class NetworkUtil:
 
         if not params['filter_on_threshold']:
             raise ValueError('Must choose either filter_on_threshold or ...')
+
+        if params.get('layout_iterations') is not None and int(params['layout_iterations']) < 0:
+            raise ValueError('layout_iterations must be a non-negative integer')
+
+        betweenness_sample_size = params.get('betweenness_sample_size')
+        if betweenness_sample_size is not None and int(betweenness_sample_size) < 1:
+            raise ValueError('betweenness_sample_size must be a positive integer')
         # params['filter_on_threshold'] = True
 
         return params
 
-    def _merge_links(self, corr_links_filtered_pos, corr_links_filtered_neg,
-                     sig_links_filtered):
+    @staticmethod
+    def _edge_mask(coefficient, coefficient_threshold, significance=None,
+                   significance_threshold=None, adjusted=None, adjusted_threshold=None):
+        """
+        _edge_mask: pairs with an absolute coefficient of at least coefficient_threshold, a
+                    significance of at least significance_threshold and an adjusted
+                    significance (q-value) of at most adjusted_threshold
+        """
+        with np.errstate(invalid='ignore'):
+            mask = np.abs(coefficient) >= coefficient_threshold
+            if significance is not None and significance_threshold is not None:
+                mask &= significance >= significance_threshold
+            if adjusted is not None:
+                mask &= adjusted <= adjusted_threshold
+
+        return mask
+
+    def _extract_edges(self, corr_data, coefficient_threshold, significance_threshold=None,
+                       adjusted_significance_threshold=None):
+        """
+        _extract_edges: edges of the correlation network filtered on the thresholds (see
+                        _edge_mask) straight from the saved value arrays, self correlations are
+                        dropped and every pair of variables is only kept once
+
+        returns a dict of row_ids, col_ids, int32 source and target indices into them and
+        float32 weight arrays
+        """
+        coefficient_data = corr_data.get('coefficient_data')
+        pair_data = corr_data.get('pair_data') or {}
+        ids_data = coefficient_data or pair_data
+        row_ids, col_ids = ids_data['row_ids'], ids_data['col_ids']
+
+        symmetric = row_ids == col_ids
+        row_pos = {row_id: pos for pos, row_id in enumerate(row_ids)}
+        # row position of the variable of every column (-1 if not a row), to drop self pairs
+        self_rows = np.array([row_pos.get(col_id, -1) for col_id in col_ids], dtype=np.int64)
+
+        if coefficient_data:
+            matrices = [coefficient_data, None, None]
+            if significance_threshold is not None:
+                matrices[1] = corr_data.get('significance_data')
+            if adjusted_significance_threshold is not None:
+                matrices[2] = corr_data.get('adjusted_significance_data')
+        else:
+            matrices = [pair_data.get('coefficient'), None, None]
+            if significance_threshold is not None:
+                matrices[1] = pair_data.get('significance')
+            if adjusted_significance_threshold is not None:
+                matrices[2] = pair_data.get('adjusted_significance')
+
+        if adjusted_significance_threshold is not None and matrices[2] is None:
+            err_msg = 'Correlation matrix has no adjusted significance.\n'
+            err_msg += 'Please compute it with significance_correction'
+            raise ValueError(err_msg)
+
+        sources, targets, weights = [], [], []
+        if coefficient_data:
+            # row blocks keep the temporary arrays small for large matrices
+            cols = np.arange(len(col_ids))
+            for start in range(0, len(row_ids), self.EDGE_BLOCK_ROWS):
+                stop = min(start + self.EDGE_BLOCK_ROWS, len(row_ids))
+                coefficient, significance, adjusted = [
+                    None if matrix is None else np.asarray(matrix['values'][start:stop],
+                                                           dtype=np.float64)
+                    for matrix in matrices]
+
+                rows = np.arange(start, stop)[:, np.newaxis]
+                mask = self._edge_mask(coefficient, coefficient_threshold, significance,
+                                       significance_threshold, adjusted,
+                                       adjusted_significance_threshold)
+                if symmetric:
+                    mask &= cols[np.newaxis, :] > rows
+                else:
+                    mask &= self_rows[np.newaxis, :] != rows
+
+                block_rows, block_cols = np.nonzero(mask)
+                sources.append((block_rows + start).astype(np.int32))
+                targets.append(block_cols.astype(np.int32))
+                weights.append(coefficient[mask].astype(np.float32))
+        elif pair_data:
+            coefficient, significance, adjusted = [
+                None if values is None else np.asarray(values, dtype=np.float64)
+                for values in matrices]
+            source = np.asarray(pair_data['row_index'], dtype=np.int64)
+            target = np.asarray(pair_data['col_index'], dtype=np.int64)
+
+            mask = self._edge_mask(coefficient, coefficient_threshold, significance,
+                                   significance_threshold, adjusted,
+                                   adjusted_significance_threshold)
+            mask &= self_rows[target] != source
+            source, target, weight = source[mask], target[mask], coefficient[mask]
+
+            if symmetric:
+                # top k partner lists can hold a pair once for each of its variables
+                source, target = np.minimum(source, target), np.maximum(source, target)
+                _, first = np.unique(source * len(col_ids) + target, return_index=True)
+                source, target, weight = source[first], target[first], weight[first]
+
+            sources.append(source.astype(np.int32))
+            targets.append(target.astype(np.int32))
+            weights.append(weight.astype(np.float32))
+
+        edges = {'row_ids': row_ids,
+                 'col_ids': col_ids,
+                 'source': np.concatenate(sources + [np.empty(0, dtype=np.int32)]),
+                 'target': np.concatenate(targets + [np.empty(0, dtype=np.int32)]),
+                 'weight': np.concatenate(weights + [np.empty(0, dtype=np.float32)])}
+        logging.info('extracted [{}] edges'.format(edges['weight'].size))
+
+        return edges
+
+    @staticmethod
+    def _edge_weights(edges):
+        """
+        _edge_weights: float64 edge weights
+        """
+        # saved coefficients have 4 decimals, drop the float32 representation noise
+        return np.round(edges['weight'].astype(np.float64), 6)
+
+    def _edges_to_graph(self, edges):
+        """
+        _edges_to_graph: a graph from the edge arrays of _extract_edges, only needed for layouts
+                         and graph metrics
+        """
+        row_ids = np.asarray(edges['row_ids'], dtype=object)
+        col_ids = np.asarray(edges['col_ids'], dtype=object)
+
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(zip(row_ids[edges['source']].tolist(),
+                                          col_ids[edges['target']].tolist(),
+                                          self._edge_weights(edges).tolist()))
+
+        return graph
+
+    def _network_arrays(self, edges):
+        """
+        _network_arrays: the nodes and every undirected edge once from the edge arrays of
+                         _extract_edges
+
+        return:
+        node_ids: ids of the nodes with at least one edge
+        node_1, node_2: edge end points as indices into node_ids
+        weights: edge weights
+        """
+        # number the variables of both matrix dimensions as one set of nodes
+        node_pos = dict()
+        for node_id in edges['row_ids'] + edges['col_ids']:
+            node_pos.setdefault(node_id, len(node_pos))
+        node_ids = np.asarray(list(node_pos), dtype=object)
+        row_nodes = np.array([node_pos[row_id] for row_id in edges['row_ids']], dtype=np.int64)
+        col_nodes = np.array([node_pos[col_id] for col_id in edges['col_ids']], dtype=np.int64)
+
+        node_1 = row_nodes[edges['source']]
+        node_2 = col_nodes[edges['target']]
+        pair_keys = np.minimum(node_1, node_2) * len(node_ids) + np.maximum(node_1, node_2)
+        first = np.sort(np.unique(pair_keys, return_index=True)[1])
+        node_1, node_2 = node_1[first], node_2[first]
+        weights = self._edge_weights(edges)[first]
+
+        # drop the variables without edges
+        linked, inverse = np.unique(np.concatenate([node_1, node_2]), return_inverse=True)
+        node_1, node_2 = inverse[:node_1.size], inverse[node_1.size:]
+
+        return node_ids[linked], node_1, node_2, weights
+
+    def _network_layout(self, edges, layout_iterations=NetworkLayout.LAYOUT_ITERATIONS):
+        """
+        _network_layout: _network_arrays with force-directed node positions in the unit square
+        """
+        node_ids, node_1, node_2, weights = self._network_arrays(edges)
 
-        corr_filtered_df = pd.concat([corr_links_filtered_pos, corr_links_filtered_neg])
+        logging.info('start laying out [{}] nodes with [{}] iterations'.format(
+                                                            node_ids.size, layout_iterations))
+        pos = NetworkLayout.force_layout(node_1, node_2, node_ids.size, weights=weights,
+                                         iterations=layout_iterations, random_seed=1)
 
-        if sig_links_filtered is not None:
-            keep_ids = set(corr_filtered_df.index).intersection(set(sig_links_filtered.index))
-            corr_filtered_df = corr_filtered_df.loc[list(keep_ids)]
+        return node_ids, node_1, node_2, weights, pos
 
-        return corr_filtered_df
+    def _network_analytics(self, node_ids, node_1, node_2, weights,
+                           betweenness_sample_size=NetworkAnalytics.BETWEENNESS_SAMPLES,
+                           random_seed=None):
+        """
+        _network_analytics: connected components, Louvain communities, degree and (sampled)
+                            betweenness centrality of the network from _network_arrays
+
+        return:
+        node_properties: properties of every node of node_ids
+        network_properties: summary of the analysis
+        """
+        logging.info('start analyzing network of [{}] nodes and [{}] edges'.format(
+                                                                    node_ids.size, weights.size))
+
+        adj = NetworkAnalytics.adjacency(node_1, node_2, node_ids.size, weights=weights)
+
+        n_components, components = NetworkAnalytics.connected_components(adj)
+        communities = NetworkAnalytics.louvain(adj, random_seed=random_seed)
+        degree = NetworkAnalytics.degree(adj)
+        betweenness = NetworkAnalytics.betweenness(adj, n_samples=betweenness_sample_size,
+                                                   random_seed=random_seed)
+
+        node_properties = [{'component': str(component),
+                            'community': str(community),
+                            'degree': str(node_degree),
+                            'betweenness': str(node_betweenness)}
+                           for component, community, node_degree, node_betweenness in zip(
+                                components.tolist(), communities.tolist(), degree.tolist(),
+                                np.round(betweenness, 6).tolist())]
+
+        network_properties = {
+            'n_components': str(n_components),
+            'n_communities': str(communities.max() + 1 if communities.size else 0),
+            'modularity': str(round(NetworkAnalytics.modularity(adj, communities), 6)),
+            'betweenness_sample_size': str(min(betweenness_sample_size, node_ids.size))}
+
+        return node_properties, network_properties
+
+    def _edges_to_network_data(self, edges, network_analysis=None):
+        """
+        _edges_to_network_data: nodes and edges of a KBaseExperiments.Network straight from the
+                                edge arrays of _extract_edges, every undirected edge once
+
+        network_analysis: keyword arguments of _network_analytics, analytics are stored as node
+                          and network properties if given
+        """
+        node_ids, node_1, node_2, weights = self._network_arrays(edges)
+
+        nodes = {node_id: {'label': node_id} for node_id in node_ids.tolist()}
+        network_edges = [{'node_1_id': node_1_id, 'node_2_id': node_2_id, 'weight': weight}
+                         for node_1_id, node_2_id, weight in zip(node_ids[node_1].tolist(),
+                                                                 node_ids[node_2].tolist(),
+                                                                 weights.tolist())]
+        network_data = {'nodes': nodes, 'edges': network_edges}
+
+        if network_analysis is not None:
+            node_properties, network_properties = self._network_analytics(
+                                        node_ids, node_1, node_2, weights, **network_analysis)
+            for node_id, properties in zip(node_ids.tolist(), node_properties):
+                nodes[node_id]['properties'] = properties
+            network_data['network_properties'] = network_properties
+
+        return network_data
 
     def __init__(self, config):
         self.ws_url = config["workspace-url"]
@@ -339,6 +544,7 @@ class NetworkUtil:
         self.data_util = DataUtil(config)
         self.corr_util = CorrelationUtil(config)
         self.dfu = DataFileUtil(self.callback_url)
+        self.object_cache = ObjectCache.shared(config)
 
         plt.switch_backend('agg')
 
@@ -355,6 +561,15 @@ class NetworkUtil:
             graph_pos = nx.spectral_layout(graph)
         elif graph_layout == 'random':
             graph_pos = nx.random_layout(graph)
+        elif graph_layout == 'force':
+            nodes = list(graph.nodes())
+            node_index = {node: index for index, node in enumerate(nodes)}
+            graph_edges = np.array([(node_index[node_1], node_index[node_2])
+                                    for node_1, node_2 in graph.edges()],
+                                   dtype=np.int64).reshape(-1, 2)
+            pos = NetworkLayout.force_layout(graph_edges[:, 0], graph_edges[:, 1], len(nodes),
+                                             random_seed=1)
+            graph_pos = dict(zip(nodes, pos))
         else:
             graph_pos = nx.shell_layout(graph)
 
@@ -388,37 +603,37 @@ class NetworkUtil:
         corr_matrix_ref = params.get('corr_matrix_ref')
         workspace_name = params.get('workspace_name')
         network_obj_name = params.get('network_obj_name')
-        corr_data = self.dfu.get_objects({'object_refs': [corr_matrix_ref]})['data'][0]['data']
-
-        coefficient_data = corr_data.get('coefficient_data')
-        significance_data = corr_data.get('significance_data')
+        corr_data = self.object_cache.get_object(corr_matrix_ref)['data']
 
         if params.get('filter_on_threshold'):
-            coefficient_threshold = params.get('filter_on_threshold').get('coefficient_threshold')
-            significance_threshold = params.get('filter_on_threshold').get('significance_threshold')
-            corr_df = self._Matrix2D_to_df(coefficient_data)
-            corr_links = self._trans_df(corr_df)
-            corr_links_filtered_pos = self._filter_links_threshold(corr_links,
-                                                                   coefficient_threshold)
-            corr_links_filtered_neg = self._filter_neg_links_threshold(corr_links,
-                                                                       -coefficient_threshold)
-
-            sig_links_filtered = None
-            if significance_data:
-                sig_df = self._Matrix2D_to_df(significance_data)
-                sig_links = self._trans_df(sig_df)
-                sig_links_filtered = self._filter_links_threshold(sig_links, significance_threshold)
-
-            links_filtered = self._merge_links(corr_links_filtered_pos,
-                                               corr_links_filtered_neg,
-                                               sig_links_filtered)
-
-            graph = self.df_to_graph(links_filtered, source='source', target='target')
-
-        network_obj_ref = self._build_network_object(graph, workspace_name, network_obj_name, corr_matrix_ref)
+            filter_on_threshold = params.get('filter_on_threshold')
+            thresholds = [filter_on_threshold.get(name) for name in [
+                                'coefficient_threshold', 'significance_threshold',
+                                'adjusted_significance_threshold']]
+            thresholds = [None if threshold is None else float(threshold)
+                          for threshold in thresholds]
+            if thresholds[0] is None:
+                thresholds[0] = 0
+
+            edges = self._extract_edges(corr_data, *thresholds)
+
+        network_analysis = None
+        if params.get('analyze_network'):
+            network_analysis = {'betweenness_sample_size': int(params.get(
+                                    'betweenness_sample_size',
+                                    NetworkAnalytics.BETWEENNESS_SAMPLES)),
+                                'random_seed': params.get('random_seed')}
+
+        network_obj_ref = self._build_network_object(edges, workspace_name, network_obj_name,
+                                                     corr_matrix_ref, corr_data=corr_data,
+                                                     network_analysis=network_analysis)
+
+        layout_iterations = int(params.get('layout_iterations',
+                                           NetworkLayout.LAYOUT_ITERATIONS))
 
         returnVal = {'network_obj_ref': network_obj_ref}
-        report_output = self._generate_network_report(graph, network_obj_ref, workspace_name)
+        report_output = self._generate_network_report(edges, network_obj_ref, workspace_name,
+                                                      layout_iterations=layout_iterations)
 
         returnVal.update(report_output)
         return returnVal
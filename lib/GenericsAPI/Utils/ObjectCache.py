@@ -0,0 +1,178 @@
+import logging
+from collections import OrderedDict
+from numbers import Number
+
+from installed_clients.DataFileUtilClient import DataFileUtil
+from installed_clients.WorkspaceClient import Workspace as workspaceService
+
+
+class ObjectCache:
+    """
+    per-request cache of fetched workspace objects (and other fetched data), shared by all Util
+    classes created with the same config, least recently used entries are evicted once the
+    estimated size of all entries exceeds max_size
+
+    cached objects are shared, callers must not modify them
+    """
+
+    MAX_SIZE = 2 * 1024 ** 3  # default bound of the estimated size of all cached entries in bytes
+    CONFIG_KEY = 'object_cache'
+
+    @staticmethod
+    def _estimate_size(value):
+        """
+        _estimate_size: rough size of deserialized JSON data (or numpy arrays) in bytes, lists
+                        are assumed to hold items like their first one (as matrix rows and value
+                        lists do), tuples are records of different items
+        """
+        if hasattr(value, 'nbytes'):
+            return 100 + value.nbytes
+        if isinstance(value, str):
+            return 50 + len(value)
+        if isinstance(value, Number) or value is None:
+            return 24
+        if isinstance(value, dict):
+            return 100 + sum(ObjectCache._estimate_size(key) + ObjectCache._estimate_size(item)
+                             for key, item in value.items())
+        if isinstance(value, tuple):
+            return 64 + sum(ObjectCache._estimate_size(item) for item in value)
+        if isinstance(value, list):
+            if not value:
+                return 64
+            return 64 + len(value) * (8 + ObjectCache._estimate_size(value[0]))
+
+        return 64
+
+    @staticmethod
+    def _resolved_ref(info):
+        """
+        _resolved_ref: versioned reference of an object info
+        """
+        return '{}/{}/{}'.format(info[6], info[0], info[4])
+
+    @classmethod
+    def shared(cls, config):
+        """
+        shared: the cache of the config, created on first use
+        """
+        if config.get(cls.CONFIG_KEY) is None:
+            config[cls.CONFIG_KEY] = cls(config['SDK_CALLBACK_URL'], config['workspace-url'],
+                                         config['KB_AUTH_TOKEN'])
+
+        return config[cls.CONFIG_KEY]
+
+    def __init__(self, callback_url, ws_url, token, max_size=MAX_SIZE):
+        self.callback_url = callback_url
+        self.ws_url = ws_url
+        self.token = token
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.aliases = dict()
+        self.size = 0
+        self.dfu = DataFileUtil(self.callback_url)
+        self.wsClient = workspaceService(self.ws_url, token=self.token)
+
+    def clear(self):
+        """
+        clear: drop all entries, at the start of every request
+        """
+        self.entries.clear()
+        self.aliases.clear()
+        self.size = 0
+
+    def _get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key, value, size=None):
+        if size is None:
+            size = self._estimate_size(value)
+
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.size += size
+
+        # evict the least recently used entries, but keep the new one
+        while self.size > self.max_size and len(self.entries) > 1:
+            evicted_key, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            logging.info('evicted [{}] from object cache'.format(evicted_key))
+
+    def cached(self, key, fetch, size=None):
+        """
+        cached: value of key, computed with fetch() if it is not cached yet
+
+        size: size of the value in bytes, estimated if missing
+        """
+        value = self._get(key)
+        if value is None:
+            value = fetch()
+            self._put(key, value, size=size)
+
+        return value
+
+    def _object_key(self, ref):
+        return ('object', self.aliases.get(ref, ref))
+
+    def get_objects(self, refs):
+        """
+        get_objects: the {'data': ..., 'info': ...} objects of the references as returned by
+                     DataFileUtil.get_objects, only the objects not cached yet are fetched
+        """
+        objects = {ref: self._get(self._object_key(ref)) for ref in refs}
+        missing = [ref for ref, obj in objects.items() if obj is None]
+
+        if missing:
+            logging.info('fetching [{}] objects'.format(len(missing)))
+            fetched = self.dfu.get_objects({'object_refs': missing})['data']
+            for ref, obj in zip(missing, fetched):
+                self.put_object(ref, obj)
+                objects[ref] = obj
+
+        return [objects[ref] for ref in refs]
+
+    def get_object(self, ref):
+        """
+        get_object: the {'data': ..., 'info': ...} object of the reference
+        """
+        return self.get_objects([ref])[0]
+
+    def put_object(self, ref, obj):
+        """
+        put_object: cache an object under its resolved (versioned) reference, ref resolves to it
+                    for the rest of the request, e.g. an object that was just saved
+        """
+        resolved_ref = self._resolved_ref(obj['info'])
+        self.aliases[ref] = resolved_ref
+
+        self._put(('object', resolved_ref), obj)
+
+    def get_object_info(self, ref):
+        """
+        get_object_info: object info of the reference, its data is not fetched
+        """
+        obj = self._get(self._object_key(ref))
+        if obj is not None:
+            return obj['info']
+
+        return self.cached(('info', ref), lambda: self.wsClient.get_object_info3(
+                                                        {'objects': [{'ref': ref}]})['infos'][0])
+
+    def get_subobject(self, ref, included):
+        """
+        get_subobject: the {'data': ..., 'info': ...} object of the reference with only the
+                       included paths of its data (e.g. ['/amplicons/*/taxonomy']), or the whole
+                       object if it is cached already
+        """
+        obj = self._get(self._object_key(ref))
+        if obj is not None:
+            return obj
+
+        return self.cached(('subobject', ref, tuple(included)),
+                           lambda: self.wsClient.get_objects2(
+                               {'objects': [{'ref': ref, 'included': list(included)}]})['data'][0])
@@ -4,20 +4,34 @@ import json
 import logging
 import os
 import shutil
-import sys
 import uuid
 
+import numpy as np
 import pandas as pd
-import plotly.graph_objs as go
 from matplotlib import pyplot as plt
-from plotly.offline import plot
-from sklearn.decomposition import PCA
+from plotly.offline import get_plotlyjs
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
 from sklearn.preprocessing import StandardScaler
 
 from installed_clients.DataFileUtilClient import DataFileUtil
 from GenericsAPI.Utils.DataUtil import DataUtil
+from GenericsAPI.Utils.ObjectCache import ObjectCache
 from installed_clients.KBaseReportClient import KBaseReport
 
+# matrix paths read for the instance groups, the matrix values are fetched with fetch_data
+MAPPING_PATHS = ['/row_mapping', '/col_mapping', '/row_attributemapping_ref',
+                 '/col_attributemapping_ref']
+# svd_solver options of run_pca
+SVD_SOLVERS = ['auto', 'full', 'randomized', 'arpack', 'incremental', 'truncated']
+FULL_SVD_MAX_SIZE = 500  # matrices with no side longer than this are decomposed exactly
+TRUNCATED_COMPONENT_RATIO = 0.8  # truncated solvers are used below this share of min(shape)
+ARPACK_MAX_COMPONENTS = 10  # ARPACK (exact) rather than randomized for this many components
+PCA_BATCH_SIZE = 1000  # default number of samples per batch of incremental PCA
+WEBGL_MIN_POINTS = 10000  # scatter plots of more points are rendered with WebGL (Scattergl)
+PLOT_GRID_BINS = 100  # grid cells per axis of the density-preserving plot decimation
+PLOT_DATA_FILE = 'pca_points.npy'  # full-resolution components and attributes of the plots
+PLOT_META_FILE = 'pca_points.json'  # columns, sample names and attribute groups of PLOT_DATA_FILE
+
 
 class PCAUtil:
 
@@ -48,6 +62,43 @@ class PCAUtil:
             if p not in params:
                 raise ValueError('"{}" parameter is required, but missing'.format(p))
 
+        svd_solver = params.get('svd_solver')
+        if svd_solver and svd_solver not in SVD_SOLVERS:
+            raise ValueError('svd_solver must be one of {}'.format(SVD_SOLVERS))
+
+        random_seed = params.get('random_seed')
+        if random_seed is not None:
+            try:
+                int(random_seed)
+            except (TypeError, ValueError):
+                raise ValueError('random_seed must be an integer')
+
+        for p in ['batch_size', 'max_plot_points']:
+            value = params.get(p)
+            if value is not None:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise ValueError('{} must be a positive integer'.format(p))
+                if value <= 0:
+                    raise ValueError('{} must be a positive integer'.format(p))
+
+    @staticmethod
+    def _select_svd_solver(n_samples, n_features, n_components):
+        """
+        _select_svd_solver: SVD solver for n_components of a n_samples x n_features matrix, an
+                            exact full SVD for small matrices or many components, otherwise a
+                            truncated one: ARPACK for a few components, randomized for more
+        """
+        if (max(n_samples, n_features) <= FULL_SVD_MAX_SIZE or
+                n_components >= TRUNCATED_COMPONENT_RATIO * min(n_samples, n_features)):
+            return 'full'
+
+        if n_components <= ARPACK_MAX_COMPONENTS:
+            return 'arpack'
+
+        return 'randomized'
+
     def _df_to_list(self, df):
         """
         _df_to_list: convert Dataframe to FloatMatrix2D matrix data
@@ -67,8 +118,7 @@ class PCAUtil:
         write PCA matrix df into excel
         """
         logging.info('writting pca data frame to excel file')
-        pca_matrix_obj = self.dfu.get_objects({'object_refs': [pca_matrix_ref]})['data'][0]
-        pca_matrix_info = pca_matrix_obj['info']
+        pca_matrix_info = self.object_cache.get_object_info(pca_matrix_ref)
         pca_matrix_name = pca_matrix_info[1]
 
         file_path = os.path.join(result_dir, pca_matrix_name + ".xlsx")
@@ -99,7 +149,7 @@ class PCAUtil:
         retrieve pca matrix ws object to pca_df
         """
         logging.info('converting pca matrix to data frame')
-        pca_data = self.dfu.get_objects({'object_refs': [pca_matrix_ref]})['data'][0]['data']
+        pca_data = self.object_cache.get_object(pca_matrix_ref)['data']
 
         rotation_matrix_data = pca_data.get('rotation_matrix')
         components_matrix_data = pca_data.get('components_matrix')
@@ -120,11 +170,12 @@ class PCAUtil:
 
         if original_matrix_ref:
             logging.info('appending instance group information to pca data frame')
-            obj_data = self.dfu.get_objects({'object_refs': [original_matrix_ref]})['data'][0]['data']
+            obj_data = self.object_cache.get_subobject(original_matrix_ref,
+                                                       MAPPING_PATHS)['data']
 
             attributemapping_ref = obj_data.get('{}_attributemapping_ref'.format(dimension))
 
-            am_data = self.dfu.get_objects({'object_refs': [attributemapping_ref]})['data'][0]['data']
+            am_data = self.object_cache.get_object(attributemapping_ref)['data']
 
             attributes = am_data.get('attributes')
             instances = am_data.get('instances')
@@ -139,7 +190,7 @@ class PCAUtil:
 
     def _save_pca_matrix(self, workspace_name, input_obj_ref, pca_matrix_name, rotation_matrix_df,
                          components_df, explained_variance, explained_variance_ratio,
-                         singular_values, n_components, dimension):
+                         singular_values, n_components, dimension, solver_parameters=None):
 
         logging.info('saving PCAMatrix')
 
@@ -155,8 +206,10 @@ class PCAUtil:
         pca_data.update({'explained_variance': explained_variance})
         pca_data.update({'explained_variance_ratio': explained_variance_ratio})
         pca_data.update({'singular_values': singular_values})
-        pca_data.update({'pca_parameters': {'n_components': str(n_components),
-                                            'dimension': str(dimension)}})
+        pca_parameters = {'n_components': str(n_components),
+                          'dimension': str(dimension)}
+        pca_parameters.update(solver_parameters or {})
+        pca_data.update({'pca_parameters': pca_parameters})
         pca_data.update({'original_matrix_ref': input_obj_ref})
 
         obj_type = 'KBaseExperiments.PCAMatrix'
@@ -169,16 +222,140 @@ class PCAUtil:
             }]
         })[0]
 
-        return "%s/%s/%s" % (info[6], info[0], info[4])
+        # reports are built from the saved object, keep it for the rest of the request
+        pca_matrix_ref = "%s/%s/%s" % (info[6], info[0], info[4])
+        self.object_cache.put_object(pca_matrix_ref, {'data': pca_data, 'info': info})
 
-    def _pca_for_matrix(self, input_obj_ref, n_components, dimension):
+        return pca_matrix_ref
+
+    @staticmethod
+    def _sample_batches(n_samples, batch_size, min_size):
         """
-        _pca_for_matrix: perform PCA analysis for matrix object
+        _sample_batches: slices of batch_size samples, the last one is merged into the one
+                         before if it is smaller than min_size
+        """
+        batch_size = max(batch_size, min_size)
+        starts = list(range(0, n_samples, batch_size))
+        if len(starts) > 1 and n_samples - starts[-1] < min_size:
+            starts.pop()
+
+        return [slice(start, stop) for start, stop in zip(starts, starts[1:] + [n_samples])]
+
+    def _incremental_pca_for_matrix(self, input_obj_ref, n_components, dimension,
+                                    batch_size=PCA_BATCH_SIZE):
+        """
+        _incremental_pca_for_matrix: PCA of the matrix streamed in batches of samples from its
+                                     memory-mapped values, so that only one batch (and the
+                                     projected samples) is held in memory at a time, except
+                                     while a matrix that is not in the scratch cache yet is
+                                     fetched (see DataUtil._fetch_matrix_values)
+        """
+        row_ids, col_ids, values = self.data_util.fetch_matrix_values(input_obj_ref)
+
+        if dimension == 'col':
+            sample_ids, feature_ids = col_ids, row_ids
+            values = values.T
+        elif dimension == 'row':
+            sample_ids, feature_ids = row_ids, col_ids
+        else:
+            err_msg = 'Input dimension [{}] is not available.\n'.format(dimension)
+            err_msg += 'Please choose either "col" or "row"'
+            raise ValueError(err_msg)
+
+        if n_components > min(values.shape):
+            raise ValueError('Number of components should be less than min(n_samples, n_features)')
+
+        batches = self._sample_batches(len(sample_ids), batch_size, n_components)
+        logging.info('computing [{}] components incrementally over [{}] batches'.format(
+                                                                    n_components, len(batches)))
+
+        def batch_values(batch):
+            return np.nan_to_num(np.array(values[batch], dtype=np.float64))
+
+        pca = IncrementalPCA(n_components=n_components, whiten=True)
+        for batch in batches:
+            pca.partial_fit(batch_values(batch))
+
+        principalComponents = np.concatenate([pca.transform(batch_values(batch))
+                                              for batch in batches])
+
+        col = ['principal_component_{}'.format(i + 1) for i in range(n_components)]
+        rotation_matrix_df = pd.DataFrame(data=principalComponents, columns=col,
+                                          index=sample_ids)
+        components_df = pd.DataFrame(data=pca.components_, columns=feature_ids,
+                                     index=col).transpose()
+
+        solver_parameters = {'svd_solver': 'incremental', 'batch_size': str(batch_size)}
+
+        return (rotation_matrix_df, components_df, list(pca.explained_variance_),
+                list(pca.explained_variance_ratio_), list(pca.singular_values_),
+                solver_parameters)
+
+    def _truncated_pca_for_matrix(self, input_obj_ref, n_components, dimension,
+                                  random_seed=None):
+        """
+        _truncated_pca_for_matrix: uncentered PCA of the matrix as a sparse (CSR) matrix with a
+                                   randomized truncated SVD, memory and time follow the number of
+                                   non-zeros (e.g. of amplicon count matrices), the projected
+                                   samples are whitened like the other solvers
         """
+        row_ids, col_ids, matrix = self.data_util.fetch_matrix_sparse(input_obj_ref)
 
-        data_matrix = self.data_util.fetch_data({'obj_ref': input_obj_ref}).get('data_matrix')
+        if dimension == 'col':
+            sample_ids, feature_ids = col_ids, row_ids
+            matrix = matrix.T.tocsr()
+        elif dimension == 'row':
+            sample_ids, feature_ids = row_ids, col_ids
+        else:
+            err_msg = 'Input dimension [{}] is not available.\n'.format(dimension)
+            err_msg += 'Please choose either "col" or "row"'
+            raise ValueError(err_msg)
+
+        if n_components >= len(feature_ids) or n_components > len(sample_ids):
+            raise ValueError('truncated svd_solver needs fewer components than n_features and '
+                             'no more than n_samples')
+
+        logging.info('computing [{}] components of sparse matrix with [{}] non-zeros'.format(
+                                                                    n_components, matrix.nnz))
+        svd = TruncatedSVD(n_components=n_components, algorithm='randomized',
+                           random_state=random_seed)
+        principalComponents = svd.fit_transform(matrix)
+
+        # whiten to unit variance
+        scale = np.sqrt(svd.explained_variance_)
+        principalComponents = principalComponents / np.where(scale > 0, scale, 1)
 
-        data_df = pd.read_json(data_matrix)
+        col = ['principal_component_{}'.format(i + 1) for i in range(n_components)]
+        rotation_matrix_df = pd.DataFrame(data=principalComponents, columns=col,
+                                          index=sample_ids)
+        components_df = pd.DataFrame(data=svd.components_, columns=feature_ids,
+                                     index=col).transpose()
+
+        solver_parameters = {'svd_solver': 'truncated'}
+        if random_seed is not None:
+            solver_parameters['random_seed'] = str(random_seed)
+
+        return (rotation_matrix_df, components_df, list(svd.explained_variance_),
+                list(svd.explained_variance_ratio_), list(svd.singular_values_),
+                solver_parameters)
+
+    def _pca_for_matrix(self, input_obj_ref, n_components, dimension, svd_solver='auto',
+                        random_seed=None, batch_size=PCA_BATCH_SIZE):
+        """
+        _pca_for_matrix: perform PCA analysis for matrix object
+
+        svd_solver: one of SVD_SOLVERS, 'auto' selects it from the matrix shape and n_components
+        random_seed: seed of the randomized, ARPACK and truncated solvers
+        batch_size: number of samples per batch of the incremental solver
+        """
+        if svd_solver == 'incremental':
+            return self._incremental_pca_for_matrix(input_obj_ref, n_components, dimension,
+                                                    batch_size=batch_size)
+        if svd_solver == 'truncated':
+            return self._truncated_pca_for_matrix(input_obj_ref, n_components, dimension,
+                                                  random_seed=random_seed)
+
+        data_df = self.data_util.fetch_matrix_df(input_obj_ref)
         data_df.fillna(0, inplace=True)
 
         if dimension == 'col':
@@ -197,8 +374,22 @@ class PCAUtil:
         # skip normalizing sample
         s_values = data_df.values
 
+        if svd_solver == 'auto':
+            svd_solver = self._select_svd_solver(data_df.index.size, data_df.columns.size,
+                                                 n_components)
+        if svd_solver == 'arpack' and n_components >= min(data_df.shape):
+            raise ValueError('arpack svd_solver needs fewer components than min(n_samples, '
+                             'n_features)')
+        logging.info('computing [{}] components with [{}] svd solver'.format(
+                                                                    n_components, svd_solver))
+
+        solver_parameters = {'svd_solver': svd_solver}
+        if random_seed is not None:
+            solver_parameters['random_seed'] = str(random_seed)
+
         # Projection to ND
-        pca = PCA(n_components=n_components, whiten=True)
+        pca = PCA(n_components=n_components, whiten=True, svd_solver=svd_solver,
+                  random_state=random_seed)
         principalComponents = pca.fit_transform(s_values)
         explained_variance = list(pca.explained_variance_)
         explained_variance_ratio = list(pca.explained_variance_ratio_)
@@ -221,7 +412,52 @@ class PCAUtil:
         rotation_matrix_df.fillna(0, inplace=True)
 
         return (rotation_matrix_df, components_df, explained_variance, explained_variance_ratio,
-                singular_values)
+                singular_values, solver_parameters)
+
+    @staticmethod
+    def _decimate_points(x, y, max_points, random_seed=None):
+        """
+        _decimate_points: sorted positions of at most max_points of the points (x, y) that keep
+                          their density, points with a missing (non-finite) coordinate are
+                          dropped
+
+        the points are binned on a grid of at most PLOT_GRID_BINS cells per axis and no more
+        cells than max_points, every occupied cell keeps one point, so that sparse regions and
+        outliers remain visible, and the rest of max_points is shared out in proportion to the
+        other points of the cells (largest remainders get the leftover points)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        n_points = finite.size
+        if n_points <= max_points:
+            return finite
+
+        grid_size = max(1, min(PLOT_GRID_BINS, int(np.sqrt(max_points))))
+
+        def grid_bins(values):
+            width = (values.max() - values.min()) or 1.
+            bins = ((values - values.min()) / width * grid_size).astype(int)
+            return np.minimum(bins, grid_size - 1)
+
+        cells = grid_bins(x[finite]) * grid_size + grid_bins(y[finite])
+
+        # random order of the points, grouped by cell
+        order = np.random.RandomState(random_seed).permutation(n_points)
+        order = order[np.argsort(cells[order], kind='mergesort')]
+        _, starts, counts = np.unique(cells[order], return_index=True, return_counts=True)
+
+        # one point per cell, the others in proportion to the remaining points of the cells
+        extra_points = max_points - counts.size
+        shares = (counts - 1) * (extra_points / float(n_points - counts.size))
+        quotas = 1 + np.floor(shares).astype(np.int64)
+        leftover = max_points - int(quotas.sum())
+        if leftover > 0:
+            quotas[np.argsort(np.floor(shares) - shares, kind='mergesort')[:leftover]] += 1
+
+        ranks = np.arange(n_points) - np.repeat(starts, counts)
+
+        return np.sort(finite[order[ranks < np.repeat(quotas, counts)]])
 
     def _generate_pca_html_report(self, pca_plots, n_components):
 
@@ -235,8 +471,14 @@ class PCAUtil:
         visualization_content = ''
 
         for pca_plot in pca_plots:
-            shutil.copy2(pca_plot,
-                         os.path.join(output_directory, os.path.basename(pca_plot)))
+            points_file = '{}_points.bin'.format(os.path.splitext(pca_plot)[0])
+            plot_files = [pca_plot, points_file] + [
+                            os.path.join(os.path.dirname(pca_plot), file_name)
+                            for file_name in ['plotly.min.js', PLOT_DATA_FILE, PLOT_META_FILE]]
+            for plot_file in plot_files:
+                if os.path.isfile(plot_file):
+                    shutil.copy2(plot_file,
+                                 os.path.join(output_directory, os.path.basename(plot_file)))
             visualization_content += '<iframe height="900px" width="100%" '
             visualization_content += 'src="{}" '.format(os.path.basename(pca_plot))
             visualization_content += 'style="border:none;"></iframe>\n<p></p>\n'
@@ -261,7 +503,8 @@ class PCAUtil:
                             })
         return html_report
 
-    def _generate_pca_report(self, pca_ref, pca_plots, workspace_name, n_components):
+    def _generate_pca_report(self, pca_ref, pca_plots, workspace_name, n_components,
+                             message=''):
         logging.info('creating report')
 
         output_html_files = self._generate_pca_html_report(pca_plots, n_components)
@@ -270,9 +513,25 @@ class PCAUtil:
         objects_created.append({'ref': pca_ref,
                                 'description': 'PCA Matrix'})
 
-        report_params = {'message': '',
+        file_links = list()
+        if pca_plots:
+            plot_directory = os.path.dirname(pca_plots[0])
+            file_links.append({'path': os.path.join(plot_directory, PLOT_DATA_FILE),
+                               'name': PLOT_DATA_FILE,
+                               'label': PLOT_DATA_FILE,
+                               'description': 'Principal components and attributes of all '
+                                              'plotted samples (little-endian float64 NumPy '
+                                              'matrix)'})
+            file_links.append({'path': os.path.join(plot_directory, PLOT_META_FILE),
+                               'name': PLOT_META_FILE,
+                               'label': PLOT_META_FILE,
+                               'description': 'Columns, sample names and attribute groups of '
+                                              '{}'.format(PLOT_DATA_FILE)})
+
+        report_params = {'message': message,
                          'workspace_name': workspace_name,
                          'objects_created': objects_created,
+                         'file_links': file_links,
                          'html_links': output_html_files,
                          'direct_html_link_index': 0,
                          'html_window_height': 666,
@@ -305,187 +564,143 @@ class PCAUtil:
 
         return plot_pca_matrix
 
-    def _build_size_pca_matrix(self, plot_pca_matrix, obj_data, dimension, attribute_name):
+    def _join_attributes(self, plot_pca_matrix, obj_data, dimension, color_attribute=None,
+                         size_attribute=None):
         """
-        _build_size_pca_matrix: append attribute value to rotation_matrix
+        _join_attributes: append the instance group and the values of the color and size
+                          attributes (attribute_value_color, attribute_value_size) of every
+                          sample to rotation_matrix, the AttributeMapping is fetched once and
+                          indexed by instance name
         """
-        logging.info('appending attribute value for sizing to rotation matrix')
+        logging.info('appending attribute values for grouping color and sizing to rotation matrix')
 
-        plot_pca_matrix = plot_pca_matrix.copy()
-
-        if dimension == 'row':
-            attribute_mapping = obj_data.get('row_mapping')
-            attribute_mapping_ref = obj_data.get('row_attributemapping_ref')
-        elif dimension == 'col':
-            attribute_mapping = obj_data.get('col_mapping')
-            attribute_mapping_ref = obj_data.get('col_attributemapping_ref')
-        else:
-            raise ValueError('Unexpected dimension')
+        plot_pca_matrix = self._append_instance_group(plot_pca_matrix, obj_data, dimension)
+        if 'instance' not in plot_pca_matrix.columns:
+            return plot_pca_matrix
 
-        if not attribute_mapping:
-            logging.warning('Matrix object does not have {}_mapping attribute'.format(dimension))
-            # build matrix with unify color and shape
+        joined_attributes = [(column, attribute_name) for column, attribute_name in
+                             [('attribute_value_color', color_attribute),
+                              ('attribute_value_size', size_attribute)] if attribute_name]
+        if not joined_attributes:
             return plot_pca_matrix
-        else:
-            # append instance col mapping from row/col_mapping
-            plot_pca_matrix['instance'] = plot_pca_matrix.index.map(attribute_mapping)
 
-        res = self.dfu.get_objects({'object_refs': [attribute_mapping_ref]})['data'][0]
+        attribute_mapping_ref = obj_data.get('{}_attributemapping_ref'.format(dimension))
+        res = self.object_cache.get_object(attribute_mapping_ref)
         attri_data = res['data']
         attri_name = res['info'][1]
 
-        attributes = attri_data.get('attributes')
-
-        attr_pos = None
-        for idx, attribute in enumerate(attributes):
-            if attribute.get('attribute') == attribute_name:
-                attr_pos = idx
-                break
-
-        if attr_pos is None:
-            raise ValueError('Cannot find attribute [{}] in [{}]'.format(attribute_name,
-                                                                         attri_name))
-
+        attribute_names = [attribute.get('attribute') for attribute in attri_data.get('attributes')]
         instances = attri_data.get('instances')
+        instance_df = pd.DataFrame(data=list(instances.values()), index=list(instances.keys()))
 
-        plot_pca_matrix['attribute_value_size'] = None
-        for instance_name, attri_values in instances.items():
-            plot_pca_matrix.loc[plot_pca_matrix.instance == instance_name,
-                                ['attribute_value_size']] = attri_values[attr_pos]
+        for column, attribute_name in joined_attributes:
+            if attribute_name not in attribute_names:
+                raise ValueError('Cannot find attribute [{}] in [{}]'.format(attribute_name,
+                                                                             attri_name))
+            attri_values = instance_df.iloc[:, attribute_names.index(attribute_name)]
+            plot_pca_matrix[column] = plot_pca_matrix['instance'].map(attri_values)
 
         return plot_pca_matrix
 
-    def _build_color_pca_matrix(self, plot_pca_matrix, obj_data, dimension, attribute_name):
+    @staticmethod
+    def _group_column(plot_pca_matrix):
         """
-        _build_color_pca_matrix: append attribute value to rotation_matrix
+        _group_column: column the plotted samples are grouped (one trace each) by, the color
+                       attribute, or the instance if only the size attribute is given
         """
-        logging.info('appending attribute value for grouping color to rotation matrix')
+        if 'attribute_value_color' in plot_pca_matrix.columns:
+            return 'attribute_value_color'
+        if 'attribute_value_size' in plot_pca_matrix.columns:
+            return 'instance'
 
-        plot_pca_matrix = plot_pca_matrix.copy()
-
-        if dimension == 'row':
-            attribute_mapping = obj_data.get('row_mapping')
-            attribute_mapping_ref = obj_data.get('row_attributemapping_ref')
-        elif dimension == 'col':
-            attribute_mapping = obj_data.get('col_mapping')
-            attribute_mapping_ref = obj_data.get('col_attributemapping_ref')
-        else:
-            raise ValueError('Unexpected dimension')
-
-        if not attribute_mapping:
-            logging.warning('Matrix object does not have {}_mapping attribute'.format(dimension))
-            # build matrix with unify color and shape
-            return plot_pca_matrix
-        else:
-            # append instance col mapping from row/col_mapping
-            plot_pca_matrix['instance'] = plot_pca_matrix.index.map(attribute_mapping)
+        return None
 
-        res = self.dfu.get_objects({'object_refs': [attribute_mapping_ref]})['data'][0]
-        attri_data = res['data']
-        attri_name = res['info'][1]
-
-        attributes = attri_data.get('attributes')
-
-        attr_pos = None
-        for idx, attribute in enumerate(attributes):
-            if attribute.get('attribute') == attribute_name:
-                attr_pos = idx
-                break
-
-        if attr_pos is None:
-            raise ValueError('Cannot find attribute [{}] in [{}]'.format(attribute_name,
-                                                                         attri_name))
-
-        instances = attri_data.get('instances')
-
-        plot_pca_matrix['attribute_value_color'] = None
-        for instance_name, attri_values in instances.items():
-            plot_pca_matrix.loc[plot_pca_matrix.instance == instance_name,
-                                ['attribute_value_color']] = attri_values[attr_pos]
+    def _write_plot_data(self, plot_pca_matrix, n_components, output_directory):
+        """
+        _write_plot_data: write the components and the attributes of all samples once, as a
+                          little-endian float64 matrix (PLOT_DATA_FILE, one row per sample), and
+                          its column names, sample names and attribute groups (PLOT_META_FILE)
 
-        return plot_pca_matrix
+        return the plot data as a data frame (columns: principal components, the size
+        attribute and the group code of the samples)
+        """
+        columns = ['principal_component_{}'.format(i) for i in range(1, n_components + 1)]
+        if 'attribute_value_size' in plot_pca_matrix.columns:
+            columns.append('attribute_value_size')
+        plot_data = pd.DataFrame(plot_pca_matrix[columns].values.astype(np.float64),
+                                 columns=columns)
+
+        groups = []
+        group_column = self._group_column(plot_pca_matrix)
+        if group_column:
+            # the groups in groupby order, samples out of any group (code -1) are not plotted
+            codes, groups = pd.factorize(plot_pca_matrix[group_column], sort=True)
+            plot_data['group'] = np.where(codes < 0, np.nan, codes)
+
+        np.save(os.path.join(output_directory, PLOT_DATA_FILE),
+                np.ascontiguousarray(plot_data.values, dtype='<f8'))
+
+        with open(os.path.join(output_directory, PLOT_META_FILE), 'w') as meta_file:
+            json.dump({'n_points': len(plot_data),
+                       'columns': plot_data.columns.tolist(),
+                       'names': [str(name) for name in plot_pca_matrix.index],
+                       'groups': [str(group) for group in groups]}, meta_file)
+
+        return plot_data
+
+    def _build_2_comp_trace(self, plot_data, components_x, components_y):
+        """
+        _build_2_comp_trace: scatter traces of the components, one per attribute group, rendered
+                             with WebGL (scattergl) for more than WEBGL_MIN_POINTS points
 
-    def _build_2_comp_trace(self, plot_pca_matrix, components_x, components_y):
+        the traces only hold the group code of their points, the plot page fills in the
+        coordinates, sizes and names of the points from the plot data files
+        """
+        trace_type = 'scattergl' if len(plot_data) > WEBGL_MIN_POINTS else 'scatter'
+        line = {'color': 'rgba(217, 217, 217, 0.14)', 'width': 0.5}
 
-        traces = []
+        if 'attribute_value_size' in plot_data.columns:
+            maximum_marker_size = 10
+            sizeref = 2. * float(np.nanmax(np.abs(plot_data['attribute_value_size'].values)))
+            sizeref /= maximum_marker_size ** 2
+            marker = {'symbol': 'circle', 'sizemode': 'area', 'sizeref': sizeref, 'sizemin': 2,
+                      'line': line, 'opacity': 0.8}
+        else:
+            marker = {'size': 10, 'opacity': 0.8, 'line': line}
 
-        if 'attribute_value_color' in plot_pca_matrix.columns and 'attribute_value_size' in plot_pca_matrix.columns:
+        trace = {'type': trace_type, 'mode': 'markers', 'textposition': 'bottom center',
+                 'marker': marker}
 
-            maximum_marker_size = 10
-            sizeref = 2.*float(max(plot_pca_matrix['attribute_value_size']))/(maximum_marker_size**2)
-
-            for name in set(plot_pca_matrix.attribute_value_color):
-                attribute_value_size = plot_pca_matrix.loc[plot_pca_matrix['attribute_value_color'].eq(name)].attribute_value_size
-                size_list = list(map(abs, list(map(float, attribute_value_size))))
-                for idx, val in enumerate(size_list):
-                    if val == 0:
-                        size_list[idx] = sys.float_info.min
-                trace = go.Scatter(
-                    x=list(plot_pca_matrix.loc[plot_pca_matrix['attribute_value_color'].eq(name)][components_x]),
-                    y=list(plot_pca_matrix.loc[plot_pca_matrix['attribute_value_color'].eq(name)][components_y]),
-                    mode='markers',
-                    name=name,
-                    text=list(plot_pca_matrix.loc[plot_pca_matrix['attribute_value_color'].eq(name)].index),
-                    textposition='bottom center',
-                    marker=go.Marker(symbol='circle', sizemode='area', sizeref=sizeref,
-                                     size=size_list, sizemin=2,
-                                     line=go.Line(color='rgba(217, 217, 217, 0.14)', width=0.5),
-                                     opacity=0.8))
-                traces.append(trace)
-        elif 'attribute_value_color' in plot_pca_matrix.columns:
-            for name in set(plot_pca_matrix.attribute_value_color):
-                trace = go.Scatter(
-                    x=list(plot_pca_matrix.loc[plot_pca_matrix['attribute_value_color'].eq(name)][components_x]),
-                    y=list(plot_pca_matrix.loc[plot_pca_matrix['attribute_value_color'].eq(name)][components_y]),
-                    mode='markers',
-                    name=name,
-                    text=list(plot_pca_matrix.loc[plot_pca_matrix['attribute_value_color'].eq(name)].index),
-                    textposition='bottom center',
-                    marker=go.Marker(size=10, opacity=0.8, line=go.Line(color='rgba(217, 217, 217, 0.14)',
-                                                                        width=0.5)))
-                traces.append(trace)
-        elif 'attribute_value_size' in plot_pca_matrix.columns:
+        if 'group' not in plot_data.columns:
+            return [trace]
 
-            maximum_marker_size = 10
-            sizeref = 2.*float(max(plot_pca_matrix['attribute_value_size']))/(maximum_marker_size**2)
-
-            for name in set(plot_pca_matrix.instance):
-                attribute_value_size = plot_pca_matrix.loc[plot_pca_matrix['instance'].eq(name)].attribute_value_size
-                size_list = list(map(abs, list(map(float, attribute_value_size))))
-                for idx, val in enumerate(size_list):
-                    if val == 0:
-                        size_list[idx] = sys.float_info.min
-                trace = go.Scatter(
-                    x=list(plot_pca_matrix.loc[plot_pca_matrix['instance'].eq(name)][components_x]),
-                    y=list(plot_pca_matrix.loc[plot_pca_matrix['instance'].eq(name)][components_y]),
-                    mode='markers',
-                    name=name,
-                    text=list(plot_pca_matrix.loc[plot_pca_matrix['instance'].eq(name)].index),
-                    textposition='bottom center',
-                    marker=go.Marker(symbol='circle', sizemode='area', sizeref=sizeref,
-                                     size=size_list, sizemin=2,
-                                     line=go.Line(color='rgba(217, 217, 217, 0.14)', width=0.5),
-                                     opacity=0.8))
-                traces.append(trace)
-        else:
-            trace = go.Scatter(
-                x=list(plot_pca_matrix[components_x]),
-                y=list(plot_pca_matrix[components_y]),
-                mode='markers',
-                text=list(plot_pca_matrix.index),
-                textposition='bottom center',
-                marker=go.Marker(size=10, opacity=0.8,
-                                 line=go.Line(color='rgba(217, 217, 217, 0.14)', width=0.5)))
-            traces.append(trace)
+        return [dict(trace, group=int(code)) for code in np.unique(plot_data['group'].dropna())]
 
-        return traces
+    def _plot_pca_matrix(self, plot_pca_matrix, n_components, max_plot_points=None,
+                         random_seed=None):
+        """
+        _plot_pca_matrix: a plot of every pair of components, decimated to at most
+                          max_plot_points points if given, plotly.js is written once next to
+                          the plots
 
-    def _plot_pca_matrix(self, plot_pca_matrix, n_components):
+        the point data is written once (see _write_plot_data) and loaded by every plot page as
+        typed arrays, a decimated plot also loads the positions of its points
+        (pca_plot_<x>_<y>_points.bin, little-endian uint32)
+        """
 
         output_directory = os.path.join(self.scratch, str(uuid.uuid4()))
         self._mkdir_p(output_directory)
         result_file_paths = []
 
+        with open(os.path.join(output_directory, 'plotly.min.js'), 'w') as plotly_js:
+            plotly_js.write(get_plotlyjs())
+
+        plot_data = self._write_plot_data(plot_pca_matrix, n_components, output_directory)
+
+        with open(os.path.join(os.path.dirname(__file__), 'templates', 'pca_plot_template.html'),
+                  'r') as plot_template_file:
+            plot_template = plot_template_file.read()
+
         all_pairs = list(itertools.combinations(range(1, n_components+1), 2))
 
         for pair in all_pairs:
@@ -495,16 +710,34 @@ class PCAUtil:
                                                                                 first_component,
                                                                                 second_component))
 
-            traces = self._build_2_comp_trace(plot_pca_matrix,
-                                              'principal_component_{}'.format(first_component),
-                                              'principal_component_{}'.format(second_component))
-
-            data = go.Data(traces)
-            layout = go.Layout(xaxis=go.XAxis(title='PC{}'.format(first_component), showline=False),
-                               yaxis=go.YAxis(title='PC{}'.format(second_component), showline=False))
-            fig = go.Figure(data=data, layout=layout)
-
-            plot(fig, filename=result_file_path)
+            components_x = 'principal_component_{}'.format(first_component)
+            components_y = 'principal_component_{}'.format(second_component)
+
+            pair_plot_data = plot_data
+            points_file_name = None
+            if max_plot_points:
+                positions = self._decimate_points(plot_data[components_x].values,
+                                                  plot_data[components_y].values,
+                                                  max_plot_points, random_seed=random_seed)
+                pair_plot_data = plot_data.iloc[positions]
+                points_file_name = '{}_points.bin'.format(
+                                        os.path.splitext(os.path.basename(result_file_path))[0])
+                positions.astype('<u4').tofile(os.path.join(output_directory, points_file_name))
+
+            plot_config = {
+                'data': PLOT_DATA_FILE,
+                'meta': PLOT_META_FILE,
+                'points': points_file_name,
+                'x': components_x,
+                'y': components_y,
+                'traces': self._build_2_comp_trace(pair_plot_data, components_x, components_y),
+                'layout': {'xaxis': {'title': {'text': 'PC{}'.format(first_component)},
+                                     'showline': False},
+                           'yaxis': {'title': {'text': 'PC{}'.format(second_component)},
+                                     'showline': False}}}
+
+            with open(result_file_path, 'w') as result_file:
+                result_file.write(plot_template.replace('//PLOT_CONFIG', json.dumps(plot_config)))
 
             result_file_paths.append(result_file_path)
 
@@ -533,6 +766,7 @@ class PCAUtil:
 
         self.data_util = DataUtil(config)
         self.dfu = DataFileUtil(self.callback_url)
+        self.object_cache = ObjectCache.shared(config)
 
         plt.switch_backend('agg')
 
@@ -546,6 +780,12 @@ class PCAUtil:
 
         n_components - number of components (default 2)
         dimension: compute correlation on column or row, one of ['col', 'row']
+        svd_solver: one of ['auto', 'full', 'randomized', 'arpack', 'incremental', 'truncated']
+                    (default 'auto', selected from the matrix shape and n_components)
+        random_seed: seed of the randomized, ARPACK and truncated solvers
+        batch_size: number of samples per batch of the incremental solver (default 1000)
+        max_plot_points: plots of more points show a density-preserving sample of at most this
+                         many points (default all points)
         """
 
         logging.info('--->\nrunning NetworkUtil.build_network\n' +
@@ -559,8 +799,16 @@ class PCAUtil:
 
         n_components = int(params.get('n_components', 2))
         dimension = params.get('dimension', 'row')
-
-        res = self.dfu.get_objects({'object_refs': [input_obj_ref]})['data'][0]
+        svd_solver = params.get('svd_solver') or 'auto'
+        random_seed = params.get('random_seed')
+        if random_seed is not None:
+            random_seed = int(random_seed)
+        batch_size = int(params.get('batch_size') or PCA_BATCH_SIZE)
+        max_plot_points = params.get('max_plot_points')
+        if max_plot_points is not None:
+            max_plot_points = int(max_plot_points)
+
+        res = self.object_cache.get_subobject(input_obj_ref, MAPPING_PATHS)
         obj_data = res['data']
         obj_type = res['info'][2]
 
@@ -569,10 +817,12 @@ class PCAUtil:
 
         if "KBaseMatrices" in obj_type:
 
-            (rotation_matrix_df, components_df, explained_variance,
-             explained_variance_ratio, singular_values) = self._pca_for_matrix(input_obj_ref,
-                                                                               n_components,
-                                                                               dimension)
+            (rotation_matrix_df, components_df, explained_variance, explained_variance_ratio,
+             singular_values, solver_parameters) = self._pca_for_matrix(
+                                                            input_obj_ref, n_components, dimension,
+                                                            svd_solver=svd_solver,
+                                                            random_seed=random_seed,
+                                                            batch_size=batch_size)
         else:
             err_msg = 'Ooops! [{}] is not supported.\n'.format(obj_type)
             err_msg += 'Please supply KBaseMatrices object'
@@ -581,28 +831,35 @@ class PCAUtil:
         pca_ref = self._save_pca_matrix(workspace_name, input_obj_ref, pca_matrix_name,
                                         rotation_matrix_df, components_df, explained_variance,
                                         explained_variance_ratio, singular_values,
-                                        n_components, dimension)
-
-        plot_pca_matrix = self._append_instance_group(rotation_matrix_df.copy(), obj_data,
-                                                      dimension)
+                                        n_components, dimension,
+                                        solver_parameters=solver_parameters)
 
+        color_attribute = size_attribute = None
         if params.get('color_marker_by'):
-            plot_pca_matrix = self._build_color_pca_matrix(
-                                            plot_pca_matrix, obj_data, dimension,
-                                            params.get('color_marker_by').get('attribute_color')[0])
-
+            color_attribute = params.get('color_marker_by').get('attribute_color')[0]
         if params.get('scale_size_by'):
-            plot_pca_matrix = self._build_size_pca_matrix(
-                                            plot_pca_matrix, obj_data, dimension,
-                                            params.get('scale_size_by').get('attribute_size')[0])
+            size_attribute = params.get('scale_size_by').get('attribute_size')[0]
+
+        plot_pca_matrix = self._join_attributes(rotation_matrix_df.copy(), obj_data, dimension,
+                                                color_attribute=color_attribute,
+                                                size_attribute=size_attribute)
 
         returnVal = {'pca_ref': pca_ref}
 
+        message = ''
+        if max_plot_points and len(plot_pca_matrix) > max_plot_points:
+            message = 'PCA plots show a density-preserving sample of at most {} of {} points, '
+            message += '{} holds all of them'.format(PLOT_DATA_FILE)
+            message = message.format(max_plot_points, len(plot_pca_matrix))
+
         report_output = self._generate_pca_report(pca_ref,
-                                                  self._plot_pca_matrix(plot_pca_matrix,
-                                                                        n_components),
+                                                  self._plot_pca_matrix(
+                                                            plot_pca_matrix, n_components,
+                                                            max_plot_points=max_plot_points,
+                                                            random_seed=random_seed),
                                                   workspace_name,
-                                                  n_components)
+                                                  n_components,
+                                                  message=message)
 
         returnVal.update(report_output)
 
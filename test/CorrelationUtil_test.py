@@ -380,6 +380,40 @@ class CorrUtilTest(unittest.TestCase):
         self.assertCountEqual(obj_data.get('significance_data').get('row_ids'), expected_index)
         self.assertCountEqual(obj_data.get('significance_data').get('col_ids'), expected_col)
 
+    def test_compute_correlation_across_matrices_sparse_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+        expr_matrix_ref_2 = self.loadExpressionMatrix2()
+
+        params = {'matrix_ref_1': expr_matrix_ref,
+                  'matrix_ref_2': expr_matrix_ref_2,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_sparse_corr_matrix',
+                  'compute_significance': True,
+                  'corr_threshold': 0.5,
+                  'sparse_output': True}
+
+        ret = self.getImpl().compute_correlation_across_matrices(self.ctx, params)[0]
+
+        self.assertIn('corr_matrix_obj_ref', ret)
+        corr_matrix_obj_ref = ret.get('corr_matrix_obj_ref')
+
+        res = self.dfu.get_objects({'object_refs': [corr_matrix_obj_ref]})['data'][0]
+        obj_data = res['data']
+
+        self.assertNotIn('coefficient_data', obj_data)
+        pair_data = obj_data.get('pair_data')
+
+        expected_index = ['WRI_RS00010_CDS_1', 'WRI_RS00015_CDS_1', 'WRI_RS00025_CDS_1']
+        expected_col = ['gene_1', 'gene_2', 'gene_3']
+        self.assertCountEqual(pair_data.get('row_ids'), expected_index)
+        self.assertCountEqual(pair_data.get('col_ids'), expected_col)
+
+        pair_size = len(pair_data.get('coefficient'))
+        for key in ['row_index', 'col_index', 'significance']:
+            self.assertEqual(len(pair_data.get(key)), pair_size)
+        self.assertTrue(all(abs(value) >= 0.5 for value in pair_data.get('coefficient')))
+
     def test_compute_correlation_matrix_fail(self):
         self.start_test()
 
@@ -421,6 +455,256 @@ class CorrUtilTest(unittest.TestCase):
         self.assertCountEqual(obj_data.get('significance_data').get('row_ids'), corr_items)
         self.assertCountEqual(obj_data.get('significance_data').get('col_ids'), corr_items)
 
+    def test_comp_corr_matrix_tiled_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_tiled_corr_matrix',
+                  'compute_significance': True,
+                  'tile_size': 2}
+
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+
+        self.assertIn('corr_matrix_obj_ref', ret)
+        corr_matrix_obj_ref = ret.get('corr_matrix_obj_ref')
+
+        res = self.dfu.get_objects({'object_refs': [corr_matrix_obj_ref]})['data'][0]
+        obj_data = res['data']
+
+        corr_items = ['WRI_RS00010_CDS_1', 'WRI_RS00015_CDS_1', 'WRI_RS00025_CDS_1']
+        self.assertCountEqual(obj_data.get('coefficient_data').get('row_ids'), corr_items)
+        self.assertCountEqual(obj_data.get('coefficient_data').get('col_ids'), corr_items)
+        self.assertCountEqual(obj_data.get('significance_data').get('row_ids'), corr_items)
+
+        values = np.array(obj_data.get('coefficient_data').get('values'))
+        np.testing.assert_array_equal(values, values.T)
+
+        # the on-disk tiles are removed once the matrix is saved and reported
+        self.assertFalse([name for name in os.listdir(self.cfg.get('scratch'))
+                          if name.endswith('_corr_tiles')])
+
+    @patch('GenericsAPI.Utils.CorrelationUtil.DENSE_MATRIX_MAX_SIZE', 4)
+    def test_df_to_list_too_large_fail(self):
+        self.start_test()
+        df = pd.DataFrame([[1., np.nan, 0.2], [np.nan, 1., 0.1], [0.2, 0.1, 1.]],
+                          index=['a', 'b', 'c'], columns=['a', 'b', 'c'])
+
+        with self.assertRaisesRegex(ValueError, 'too large to be saved as a dense matrix'):
+            self.getCorrUtil()._df_to_list(df)
+
+        matrix_data = self.getCorrUtil()._df_to_list(df.iloc[:2, :2])
+        self.assertEqual(matrix_data['values'], [[1., 0.], [0., 1.]])
+
+    def test_comp_corr_matrix_n_workers_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_parallel_corr_matrix',
+                  'method': 'spearman',
+                  'compute_significance': True,
+                  'tile_size': 1,
+                  'n_workers': 2}
+
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+        parallel_ref = ret.get('corr_matrix_obj_ref')
+
+        params.update({'corr_matrix_name': 'test_serial_corr_matrix', 'n_workers': 1})
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+        serial_ref = ret.get('corr_matrix_obj_ref')
+
+        parallel_data, serial_data = [
+            res['data'] for res in self.dfu.get_objects(
+                                        {'object_refs': [parallel_ref, serial_ref]})['data']]
+
+        for key in ['coefficient_data', 'significance_data']:
+            self.assertEqual(parallel_data[key]['row_ids'], serial_data[key]['row_ids'])
+            np.testing.assert_array_equal(parallel_data[key]['values'],
+                                          serial_data[key]['values'])
+
+    def test_comp_corr_matrix_top_k_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_top_k_corr_matrix',
+                  'compute_significance': True,
+                  'top_k': 1}
+
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+
+        self.assertIn('corr_matrix_obj_ref', ret)
+        corr_matrix_obj_ref = ret.get('corr_matrix_obj_ref')
+
+        res = self.dfu.get_objects({'object_refs': [corr_matrix_obj_ref]})['data'][0]
+        obj_data = res['data']
+
+        self.assertEqual(obj_data.get('correlation_parameters').get('top_k'), '1')
+        pair_data = obj_data.get('pair_data')
+
+        corr_items = ['WRI_RS00010_CDS_1', 'WRI_RS00015_CDS_1', 'WRI_RS00025_CDS_1']
+        self.assertCountEqual(pair_data.get('row_ids'), corr_items)
+        # one partner per variable, never the variable itself
+        self.assertEqual(pair_data.get('row_index'), [0, 1, 2])
+        for row, col in zip(pair_data.get('row_index'), pair_data.get('col_index')):
+            self.assertNotEqual(row, col)
+        self.assertEqual(len(pair_data.get('significance')), 3)
+
+    def test_comp_corr_matrix_significance_correction_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_adjusted_corr_matrix',
+                  'compute_significance': True,
+                  'significance_correction': 'bonferroni'}
+
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+
+        self.assertIn('corr_matrix_obj_ref', ret)
+        corr_matrix_obj_ref = ret.get('corr_matrix_obj_ref')
+
+        res = self.dfu.get_objects({'object_refs': [corr_matrix_obj_ref]})['data'][0]
+        obj_data = res['data']
+
+        self.assertEqual(obj_data.get('correlation_parameters').get('significance_correction'),
+                         'bonferroni')
+        significance_data = obj_data.get('significance_data')
+        adjusted_significance_data = obj_data.get('adjusted_significance_data')
+        self.assertEqual(adjusted_significance_data.get('row_ids'),
+                         significance_data.get('row_ids'))
+
+        # bonferroni over the 3 pairs of 3 variables
+        for row, pvalues in enumerate(significance_data.get('values')):
+            for col, pvalue in enumerate(pvalues):
+                if row != col:
+                    self.assertAlmostEqual(adjusted_significance_data['values'][row][col],
+                                           min(1, pvalue * 3), places=3)
+
+    def test_comp_corr_matrix_significance_correction_fail(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_adjusted_corr_matrix',
+                  'significance_correction': 'fdr_bh'}
+
+        error = 'significance_correction requires compute_significance'
+        self.fail_compute_correlation_matrix(params, error)
+
+    def test_comp_corr_matrix_display_threshold_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_display_threshold_corr_matrix',
+                  'compute_significance': True,
+                  'display_threshold': 0.5}
+
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+
+        self.assertIn('corr_matrix_obj_ref', ret)
+        self.assertIn('report_ref', ret)
+
+    def test_comp_corr_matrix_display_threshold_fail(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_display_threshold_corr_matrix',
+                  'display_threshold': 2}
+
+        error = 'display_threshold must be a number between 0 and 1'
+        self.fail_compute_correlation_matrix(params, error)
+
+    def test_comp_corr_matrix_kendall_sample_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_kendall_sample_corr_matrix',
+                  'method': 'kendall',
+                  'kendall_sample_size': 3,
+                  'random_seed': 42}
+
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+
+        self.assertIn('corr_matrix_obj_ref', ret)
+        corr_matrix_obj_ref = ret.get('corr_matrix_obj_ref')
+
+        res = self.dfu.get_objects({'object_refs': [corr_matrix_obj_ref]})['data'][0]
+        obj_data = res['data']
+
+        correlation_parameters = obj_data.get('correlation_parameters')
+        self.assertEqual(correlation_parameters.get('method'), 'kendall')
+        self.assertEqual(correlation_parameters.get('kendall_sample_size'), '3')
+        self.assertEqual(correlation_parameters.get('random_seed'), '42')
+        self.assertIn('kendall_error_bound', correlation_parameters)
+
+        coefficient_data = obj_data.get('coefficient_data')
+        corr_items = ['WRI_RS00010_CDS_1', 'WRI_RS00015_CDS_1', 'WRI_RS00025_CDS_1']
+        self.assertCountEqual(coefficient_data.get('row_ids'), corr_items)
+
+    def test_comp_corr_matrix_kendall_sample_fail(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_kendall_sample_corr_matrix',
+                  'method': 'pearson',
+                  'kendall_sample_size': 3}
+
+        error = 'kendall_sample_size is only available for kendall correlation'
+        self.fail_compute_correlation_matrix(params, error)
+
+    def test_comp_corr_matrix_incremental_ok(self):
+        self.start_test()
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_stats_corr_matrix',
+                  'compute_significance': True,
+                  'save_statistics': True}
+
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+        base_corr_matrix_ref = ret.get('corr_matrix_obj_ref')
+
+        base_data = self.dfu.get_objects(
+                                {'object_refs': [base_corr_matrix_ref]})['data'][0]['data']
+        corr_stats = base_data.get('sufficient_statistics')
+        self.assertEqual(corr_stats.get('n'), len(corr_stats.get('sample_ids')))
+        self.assertEqual(len(corr_stats.get('comoments')), len(corr_stats.get('variable_ids')))
+
+        params.update({'corr_matrix_name': 'test_incremental_corr_matrix',
+                       'base_corr_matrix_ref': base_corr_matrix_ref})
+        ret = self.getImpl().compute_correlation_matrix(self.ctx, params)[0]
+
+        obj_data = self.dfu.get_objects(
+                        {'object_refs': [ret.get('corr_matrix_obj_ref')]})['data'][0]['data']
+        self.assertEqual(obj_data.get('sufficient_statistics').get('n'), corr_stats.get('n'))
+        np.testing.assert_array_equal(obj_data.get('coefficient_data').get('values'),
+                                      base_data.get('coefficient_data').get('values'))
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'corr_matrix_name': 'test_incremental_corr_matrix',
+                  'method': 'kendall',
+                  'base_corr_matrix_ref': base_corr_matrix_ref}
+        with self.assertRaises(ValueError) as context:
+            self.getImpl().compute_correlation_matrix(self.ctx, params)
+        self.assertIn('only available for pearson', str(context.exception.args[0]))
+
     def test_init_ok(self):
         self.start_test()
         class_attri = ['scratch', 'token', 'callback_url', 'ws_url']
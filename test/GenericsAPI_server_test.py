@@ -7,6 +7,7 @@ import time
 import unittest
 from os import environ
 
+import numpy as np
 import pandas as pd
 from configparser import ConfigParser  # py2
 
@@ -270,6 +271,25 @@ class GenericsAPITest(unittest.TestCase):
                                       {"object_refs": [new_matrix_obj_ref]})['data'][0]
         standardized_data = standardized_matrix.get('data')
 
+    def test_standardize_matrix_scale_only(self):
+        self.start_test()
+        params = {'input_matrix_ref': self.expression_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'with_mean': 0,
+                  'with_std': 1,
+                  'new_matrix_name': 'scaled_test_matrix'}
+        returnVal = self.getImpl().standardize_matrix(self.ctx, params)[0]
+
+        new_matrix_obj_ref = returnVal.get('new_matrix_obj_ref')
+        scaled_data = self.dfu.get_objects(
+                                {"object_refs": [new_matrix_obj_ref]})['data'][0]['data']['data']
+        self.assertEqual(scaled_data['row_ids'], self.row_ids)
+        self.assertEqual(scaled_data['col_ids'], self.col_ids)
+
+        # columns are scaled to unit variance, zeros (and missing values) stay 0
+        values = np.nan_to_num(np.array(self.values, dtype=np.float64))
+        np.testing.assert_allclose(scaled_data['values'], values / values.std(axis=0))
+
     def test_bad_fetch_data_params(self):
         self.start_test()
         invalidate_params = {'missing_obj_ref': 'obj_ref'}
@@ -295,6 +315,24 @@ class GenericsAPITest(unittest.TestCase):
         returnVal = self.getImpl().fetch_data(self.ctx, params)[0]
         self.check_fetch_data_output(returnVal)
 
+    def test_fetch_matrix_df(self):
+        self.start_test()
+        data_util = self.getImpl().data_util
+        for matrix_ref in [self.expression_matrix_ref, self.fitness_matrix_ref]:
+            matrix_df = data_util.fetch_matrix_df(matrix_ref)
+            self.assertCountEqual(matrix_df.index.tolist(), self.row_ids)
+            self.assertCountEqual(matrix_df.columns.tolist(), self.col_ids)
+            self.assertTrue(all(dtype == np.float64 for dtype in matrix_df.dtypes))
+
+            data_matrix = data_util.fetch_data({'obj_ref': matrix_ref}).get('data_matrix')
+            expected_df = pd.read_json(data_matrix).reindex(index=matrix_df.index,
+                                                            columns=matrix_df.columns)
+            np.testing.assert_allclose(matrix_df.values, expected_df.values)
+
+            # data frames are not shared between calls
+            matrix_df.iloc[0, 0] = -1.
+            self.assertNotEqual(data_util.fetch_matrix_df(matrix_ref).iloc[0, 0], -1.)
+
     def test_export_matrix(self):
         self.start_test()
         params = {'obj_ref': self.expression_matrix_nc_ref}
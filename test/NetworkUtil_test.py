@@ -3,6 +3,7 @@ import inspect
 import os  # noqa: F401
 import unittest
 import time
+import numpy as np
 import pandas as pd
 from configparser import ConfigParser
 
@@ -206,6 +207,135 @@ class NetworkUtilTest(unittest.TestCase):
         self.assertEqual(links.index.size, len(corr_data.get('row_ids'))**2)
         self.assertEqual(links.columns.size, 3)
 
+    def test__extract_edges_ok(self):
+        corr_data = {'coefficient_data': self.loadCorrData(),
+                     'significance_data': {'row_ids': ['WRI_RS00010_CDS_1',
+                                                       'WRI_RS00015_CDS_1',
+                                                       'WRI_RS00025_CDS_1'],
+                                           'values': [[0.0, 0.0, 0.0879],
+                                                      [0.0, 0.0, 0.0879],
+                                                      [0.0879, 0.0879, 0.0]],
+                                           'col_ids': ['WRI_RS00010_CDS_1',
+                                                       'WRI_RS00015_CDS_1',
+                                                       'WRI_RS00025_CDS_1']}}
+
+        edges = self.getNetworkUtil()._extract_edges(corr_data, 0.95)
+        self.assertEqual(edges['source'].tolist(), [0])
+        self.assertEqual(edges['target'].tolist(), [1])
+        self.assertEqual(edges['source'].dtype, np.int32)
+        self.assertEqual(edges['weight'].dtype, np.float32)
+
+        # every pair once, no self correlation
+        edges = self.getNetworkUtil()._extract_edges(corr_data, 0.9)
+        self.assertEqual(list(zip(edges['source'], edges['target'])), [(0, 1), (0, 2), (1, 2)])
+
+        edges = self.getNetworkUtil()._extract_edges(corr_data, 0.9, significance_threshold=0.05)
+        self.assertEqual(list(zip(edges['source'], edges['target'])), [(0, 2), (1, 2)])
+
+        graph = self.getNetworkUtil()._edges_to_graph(edges)
+        self.assertCountEqual(list(graph.nodes()), corr_data['coefficient_data']['row_ids'])
+        self.assertEqual(graph['WRI_RS00010_CDS_1']['WRI_RS00025_CDS_1']['weight'], 0.91)
+
+        with self.assertRaises(ValueError) as context:
+            self.getNetworkUtil()._extract_edges(corr_data, 0.9,
+                                                 adjusted_significance_threshold=0.05)
+        self.assertIn('has no adjusted significance', str(context.exception.args[0]))
+
+    def test__extract_edges_pairs_ok(self):
+        pair_data = {'row_ids': ['WRI_RS00010_CDS_1', 'WRI_RS00015_CDS_1'],
+                     'col_ids': ['gene_1', 'gene_2', 'gene_3'],
+                     'row_index': [0, 1, 1],
+                     'col_index': [2, 0, 1],
+                     'coefficient': [0.9, -0.7, 0.8],
+                     'significance': [0.01, 0.2, 0.05],
+                     'adjusted_significance': [0.03, 0.2, 0.075]}
+
+        edges = self.getNetworkUtil()._extract_edges({'pair_data': pair_data}, 0.75)
+        self.assertEqual(edges['source'].tolist(), [0, 1])
+        self.assertEqual(edges['target'].tolist(), [2, 1])
+        np.testing.assert_allclose(edges['weight'], [0.9, 0.8])
+
+        edges = self.getNetworkUtil()._extract_edges({'pair_data': pair_data}, 0.5,
+                                                     adjusted_significance_threshold=0.1)
+        self.assertEqual(edges['source'].tolist(), [0, 1])
+
+        # top k partners of a symmetric matrix, each pair once
+        pair_data = {'row_ids': ['gene_1', 'gene_2', 'gene_3'],
+                     'col_ids': ['gene_1', 'gene_2', 'gene_3'],
+                     'row_index': [0, 1, 2],
+                     'col_index': [1, 0, 0],
+                     'coefficient': [0.9, 0.9, -0.8]}
+        edges = self.getNetworkUtil()._extract_edges({'pair_data': pair_data}, 0.5)
+        self.assertEqual(list(zip(edges['source'], edges['target'])), [(0, 1), (0, 2)])
+
+    def test__edges_to_network_data_ok(self):
+        edges = {'row_ids': ['gene_1', 'gene_2'],
+                 'col_ids': ['gene_2', 'gene_3', 'gene_1'],
+                 'source': np.array([0, 1, 1], dtype=np.int32),
+                 'target': np.array([0, 1, 2], dtype=np.int32),
+                 'weight': np.array([0.9, -0.8, 0.9], dtype=np.float32)}
+
+        network_data = self.getNetworkUtil()._edges_to_network_data(edges)
+
+        self.assertCountEqual(network_data['nodes'].keys(), ['gene_1', 'gene_2', 'gene_3'])
+        self.assertEqual(network_data['nodes']['gene_1'], {'label': 'gene_1'})
+        # gene_1 - gene_2 is found in both matrix dimensions but only saved once
+        self.assertEqual(network_data['edges'],
+                         [{'node_1_id': 'gene_1', 'node_2_id': 'gene_2', 'weight': 0.9},
+                          {'node_1_id': 'gene_2', 'node_2_id': 'gene_3', 'weight': -0.8}])
+
+    def test__edges_to_network_data_analysis_ok(self):
+        # a triangle and a separate pair
+        edges = {'row_ids': ['gene_1', 'gene_2', 'gene_3', 'gene_5'],
+                 'col_ids': ['gene_1', 'gene_2', 'gene_3', 'gene_6'],
+                 'source': np.array([0, 1, 0, 3], dtype=np.int32),
+                 'target': np.array([1, 2, 2, 3], dtype=np.int32),
+                 'weight': np.array([0.9, -0.8, 0.9, 0.7], dtype=np.float32)}
+
+        network_data = self.getNetworkUtil()._edges_to_network_data(
+                                edges, network_analysis={'betweenness_sample_size': 10,
+                                                         'random_seed': 1})
+
+        nodes = network_data['nodes']
+        self.assertEqual(nodes['gene_1']['properties'],
+                         {'component': '0', 'community': '0', 'degree': '2',
+                          'betweenness': '0.0'})
+        self.assertEqual(nodes['gene_5']['properties']['component'], '1')
+        self.assertEqual(nodes['gene_6']['properties']['degree'], '1')
+        self.assertEqual(network_data['network_properties']['n_components'], '2')
+        self.assertEqual(network_data['network_properties']['n_communities'], '2')
+        self.assertEqual(network_data['network_properties']['betweenness_sample_size'], '5')
+
+        network_data = self.getNetworkUtil()._edges_to_network_data(edges)
+        self.assertNotIn('properties', network_data['nodes']['gene_1'])
+        self.assertNotIn('network_properties', network_data)
+
+    def test__network_layout_ok(self):
+        edges = {'row_ids': ['gene_1', 'gene_2', 'gene_4'],
+                 'col_ids': ['gene_2', 'gene_3', 'gene_1'],
+                 'source': np.array([0, 1, 1], dtype=np.int32),
+                 'target': np.array([0, 1, 2], dtype=np.int32),
+                 'weight': np.array([0.9, -0.8, 0.9], dtype=np.float32)}
+
+        node_ids, node_1, node_2, weights, pos = self.getNetworkUtil()._network_layout(
+                                                                        edges, layout_iterations=10)
+
+        # gene_4 has no edge
+        self.assertEqual(node_ids.tolist(), ['gene_1', 'gene_2', 'gene_3'])
+        self.assertEqual(node_1.tolist(), [0, 1])
+        self.assertEqual(node_2.tolist(), [1, 2])
+        self.assertEqual(weights.tolist(), [0.9, -0.8])
+        self.assertEqual(pos.shape, (3, 2))
+        self.assertTrue(((pos >= 0) & (pos <= 1)).all())
+
+        nodes_content, edges_content = self.getNetworkUtil()._generate_visualization_content(
+                                                    (node_ids, node_1, node_2, weights, pos))
+        nodes = [node for rows in nodes_content for node in rows]
+        self.assertEqual([node['id'] for node in nodes], ['gene_1', 'gene_2', 'gene_3'])
+        self.assertEqual([node['x'] for node in nodes], pos[:, 0].tolist())
+        self.assertEqual([edge for rows in edges_content for edge in rows],
+                         [('gene_1', 'gene_2'), ('gene_2', 'gene_3')])
+
     def test_df_to_graph_ok(self):
 
         graph_df = self.loadGraphDF()
@@ -227,3 +357,6 @@ class NetworkUtilTest(unittest.TestCase):
 
         self.getNetworkUtil().draw_graph(graph, graph_path, graph_layout='spectral')
         self.assertGreater(os.path.getsize(graph_path), 1024)  # file size greate than 1KB
+
+        self.getNetworkUtil().draw_graph(graph, graph_path, graph_layout='force')
+        self.assertGreater(os.path.getsize(graph_path), 1024)  # file size greate than 1KB
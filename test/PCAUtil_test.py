@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 import inspect
+import json
 import os  # noqa: F401
 import unittest
 import time
 import shutil
 from configparser import ConfigParser
 import uuid
+import numpy as np
 import pandas as pd
 
 from GenericsAPI.Utils.PCAUtil import PCAUtil
@@ -159,6 +161,165 @@ class PCAUtilTest(unittest.TestCase):
         error_msg = '"workspace_name" parameter is required, but missing'
         self.fail_run_pca(invalidate_params, error_msg)
 
+        invalidate_params = {'input_obj_ref': 'input_obj_ref',
+                             'workspace_name': 'workspace_name',
+                             'pca_matrix_name': 'pca_matrix_name',
+                             'svd_solver': 'lapack'}
+        error_msg = ("svd_solver must be one of ['auto', 'full', 'randomized', 'arpack', "
+                     "'incremental', 'truncated']")
+        self.fail_run_pca(invalidate_params, error_msg)
+
+        invalidate_params = {'input_obj_ref': 'input_obj_ref',
+                             'workspace_name': 'workspace_name',
+                             'pca_matrix_name': 'pca_matrix_name',
+                             'svd_solver': 'incremental',
+                             'batch_size': 0}
+        error_msg = 'batch_size must be a positive integer'
+        self.fail_run_pca(invalidate_params, error_msg)
+
+    def test_select_svd_solver_ok(self):
+        self.start_test()
+        select_svd_solver = self.getPCAUtil()._select_svd_solver
+
+        self.assertEqual(select_svd_solver(100, 300, 2), 'full')
+        self.assertEqual(select_svd_solver(2000, 30000, 2), 'arpack')
+        self.assertEqual(select_svd_solver(2000, 30000, 50), 'randomized')
+        self.assertEqual(select_svd_solver(600, 1000, 500), 'full')
+
+    def test_sample_batches_ok(self):
+        self.start_test()
+        sample_batches = self.getPCAUtil()._sample_batches
+
+        self.assertEqual(sample_batches(5, 2, 2), [slice(0, 2), slice(2, 5)])
+        self.assertEqual(sample_batches(6, 2, 2), [slice(0, 2), slice(2, 4), slice(4, 6)])
+        self.assertEqual(sample_batches(3, 10, 2), [slice(0, 3)])
+        # batches hold at least min_size samples
+        self.assertEqual(sample_batches(6, 1, 3), [slice(0, 3), slice(3, 6)])
+
+    def test_decimate_points_ok(self):
+        self.start_test()
+        decimate_points = self.getPCAUtil()._decimate_points
+
+        x = [0.01 * (i % 100) for i in range(10000)] + [100.]
+        y = [0.01 * (i // 100) for i in range(10000)] + [100.]
+
+        self.assertEqual(decimate_points(x, y, 20000).tolist(), list(range(10001)))
+
+        positions = decimate_points(x, y, 1000, random_seed=0)
+        self.assertEqual(len(positions), 1000)
+        self.assertEqual(positions.tolist(), sorted(set(positions)))
+        # the outlier is kept
+        self.assertEqual(positions[-1], 10000)
+        self.assertEqual(positions.tolist(),
+                         decimate_points(x, y, 1000, random_seed=0).tolist())
+
+        # clustered points keep their density, the total stays capped
+        random_state = np.random.RandomState(0)
+        x = np.concatenate([random_state.normal(0, 0.1, 100000),
+                            random_state.normal(10, 0.1, 1000), [50.]])
+        y = np.concatenate([random_state.normal(0, 0.1, 100000),
+                            random_state.normal(10, 0.1, 1000), [-50.]])
+        positions = decimate_points(x, y, 1000, random_seed=0)
+        self.assertEqual(len(positions), 1000)
+        self.assertGreater((positions < 100000).sum(), 900)
+        self.assertGreater((positions >= 100000).sum(), 5)
+        self.assertEqual(positions[-1], 101000)
+
+        # points with a missing coordinate are dropped
+        x[5] = np.nan
+        y[7] = np.inf
+        positions = decimate_points(x, y, 1000, random_seed=0)
+        self.assertEqual(len(positions), 1000)
+        self.assertNotIn(5, positions)
+        self.assertNotIn(7, positions)
+        self.assertEqual(decimate_points([1., np.nan], [1., 2.], 5).tolist(), [0])
+
+    def test_plot_pca_matrix_ok(self):
+        self.start_test()
+        pca_util = self.getPCAUtil()
+
+        n_samples = 12000
+        random_state = np.random.RandomState(0)
+        plot_pca_matrix = pd.DataFrame(random_state.normal(size=(n_samples, 3)),
+                                       columns=['principal_component_{}'.format(i)
+                                                for i in range(1, 4)],
+                                       index=['sample_{}'.format(i) for i in range(n_samples)])
+        plot_pca_matrix['instance'] = ['instance_{}'.format(i % 3) for i in range(n_samples)]
+        plot_pca_matrix['attribute_value_color'] = [str(i % 4) for i in range(n_samples)]
+        plot_pca_matrix['attribute_value_size'] = [str(i % 5) for i in range(n_samples)]
+
+        pca_plots = pca_util._plot_pca_matrix(plot_pca_matrix, 3, max_plot_points=1000,
+                                              random_seed=0)
+        self.assertEqual([os.path.basename(pca_plot) for pca_plot in pca_plots],
+                         ['pca_plot_1_2.html', 'pca_plot_1_3.html', 'pca_plot_2_3.html'])
+        plot_directory = os.path.dirname(pca_plots[0])
+
+        # all samples are written once, as little-endian float64
+        plot_data = np.load(os.path.join(plot_directory, 'pca_points.npy'))
+        self.assertEqual(plot_data.dtype, np.dtype('<f8'))
+        self.assertEqual(plot_data.shape, (n_samples, 5))
+        with open(os.path.join(plot_directory, 'pca_points.json')) as meta_file:
+            meta = json.load(meta_file)
+        self.assertEqual(meta['columns'], ['principal_component_1', 'principal_component_2',
+                                           'principal_component_3', 'attribute_value_size',
+                                           'group'])
+        self.assertEqual(meta['names'], plot_pca_matrix.index.tolist())
+        self.assertEqual(meta['groups'], ['0', '1', '2', '3'])
+        np.testing.assert_array_equal(plot_data[:, :3], plot_pca_matrix.iloc[:, :3].values)
+        np.testing.assert_array_equal(plot_data[:, 4], np.arange(n_samples) % 4)
+
+        # the decimated plots only hold the positions of their points
+        positions = np.fromfile(os.path.join(plot_directory, 'pca_plot_1_2_points.bin'),
+                                dtype='<u4')
+        self.assertEqual(len(positions), 1000)
+        with open(pca_plots[0]) as plot_file:
+            plot_html = plot_file.read()
+        self.assertIn('Plotly.newPlot', plot_html)
+        self.assertIn('"points": "pca_plot_1_2_points.bin"', plot_html)
+        self.assertNotIn('sample_1', plot_html)
+
+        traces = pca_util._build_2_comp_trace(pd.DataFrame(plot_data, columns=meta['columns']),
+                                              'principal_component_1', 'principal_component_2')
+        self.assertEqual([trace['group'] for trace in traces], [0, 1, 2, 3])
+        self.assertEqual({trace['type'] for trace in traces}, {'scattergl'})
+        self.assertEqual(pca_util._build_2_comp_trace(
+                            pd.DataFrame(plot_data[:100, :3], columns=meta['columns'][:3]),
+                            'principal_component_1', 'principal_component_2'),
+                         [{'type': 'scatter', 'mode': 'markers', 'textposition': 'bottom center',
+                           'marker': {'size': 10, 'opacity': 0.8,
+                                      'line': {'color': 'rgba(217, 217, 217, 0.14)',
+                                               'width': 0.5}}}])
+
+    def test_join_attributes_ok(self):
+        self.start_test()
+        pca_util = self.getPCAUtil()
+
+        am_info = [5, 'test_attribute_mapping', 'KBaseExperiments.AttributeMapping-1.0', '', 1,
+                   '', 1, self.wsName]
+        am_data = {'attributes': [{'attribute': 'test_attribute_1'},
+                                  {'attribute': 'test_attribute_2'}],
+                   'instances': {'instance_1': ['1', '4'],
+                                 'instance_2': ['2', '5'],
+                                 'instance_3': ['3', '6']}}
+        pca_util.object_cache.put_object('1/5/1', {'data': am_data, 'info': am_info})
+
+        obj_data = {'col_mapping': {'sample_1': 'instance_3', 'sample_2': 'instance_1'},
+                    'col_attributemapping_ref': '1/5/1'}
+        rotation_matrix_df = pd.DataFrame({'principal_component_1': [0.1, 0.2]},
+                                          index=['sample_1', 'sample_2'])
+
+        plot_pca_matrix = pca_util._join_attributes(rotation_matrix_df, obj_data, 'col',
+                                                    color_attribute='test_attribute_2',
+                                                    size_attribute='test_attribute_1')
+        self.assertEqual(plot_pca_matrix.instance.tolist(), ['instance_3', 'instance_1'])
+        self.assertEqual(plot_pca_matrix.attribute_value_color.tolist(), ['6', '4'])
+        self.assertEqual(plot_pca_matrix.attribute_value_size.tolist(), ['3', '1'])
+        self.assertNotIn('instance', rotation_matrix_df.columns)
+
+        with self.assertRaisesRegex(ValueError, 'Cannot find attribute'):
+            pca_util._join_attributes(rotation_matrix_df, obj_data, 'col',
+                                      color_attribute='test_attribute_3')
+
     def test_run_pca_ok(self):
         self.start_test()
 
@@ -194,6 +355,84 @@ class PCAUtilTest(unittest.TestCase):
         expected_col_ids = ['principal_component_1', 'principal_component_2', 'principal_component_3']
         self.assertCountEqual(pca_matrix_data['rotation_matrix']['row_ids'], expected_row_ids)
         self.assertCountEqual(pca_matrix_data['rotation_matrix']['col_ids'], expected_col_ids)
+        self.assertEqual(pca_matrix_data['pca_parameters']['svd_solver'], 'full')
+
+    def test_run_pca_randomized_ok(self):
+        self.start_test()
+
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        rotation_matrices = list()
+        for pca_matrix_name in ['test_randomized_pca_1', 'test_randomized_pca_2']:
+            params = {'input_obj_ref': expr_matrix_ref,
+                      'workspace_name': self.wsName,
+                      'pca_matrix_name': pca_matrix_name,
+                      'n_components': 2,
+                      'svd_solver': 'randomized',
+                      'random_seed': 1}
+
+            ret = self.getImpl().run_pca(self.ctx, params)[0]
+            pca_matrix_data = self.dfu.get_objects(
+                        {"object_refs": [ret.get('pca_ref')]})['data'][0]['data']
+
+            self.assertEqual(pca_matrix_data['pca_parameters']['svd_solver'], 'randomized')
+            self.assertEqual(pca_matrix_data['pca_parameters']['random_seed'], '1')
+            rotation_matrices.append(pca_matrix_data['rotation_matrix'])
+
+        # seeded randomized PCA is reproducible
+        self.assertEqual(rotation_matrices[0], rotation_matrices[1])
+
+    def test_run_pca_incremental_ok(self):
+        self.start_test()
+
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'pca_matrix_name': 'test_incremental_pca',
+                  'n_components': 2,
+                  'svd_solver': 'incremental',
+                  'batch_size': 2}
+
+        ret = self.getImpl().run_pca(self.ctx, params)[0]
+        pca_matrix_data = self.dfu.get_objects(
+                    {"object_refs": [ret.get('pca_ref')]})['data'][0]['data']
+
+        self.assertEqual(pca_matrix_data['pca_parameters']['svd_solver'], 'incremental')
+        self.assertEqual(pca_matrix_data['pca_parameters']['batch_size'], '2')
+        for field in ['explained_variance', 'explained_variance_ratio', 'singular_values']:
+            self.assertEqual(len(pca_matrix_data[field]), 2)
+
+        expected_row_ids = ['WRI_RS00010_CDS_1', 'WRI_RS00015_CDS_1', 'WRI_RS00025_CDS_1']
+        expected_col_ids = ['principal_component_1', 'principal_component_2']
+        self.assertCountEqual(pca_matrix_data['rotation_matrix']['row_ids'], expected_row_ids)
+        self.assertCountEqual(pca_matrix_data['rotation_matrix']['col_ids'], expected_col_ids)
+        self.assertCountEqual(pca_matrix_data['components_matrix']['col_ids'], expected_col_ids)
+
+    def test_run_pca_truncated_ok(self):
+        self.start_test()
+
+        expr_matrix_ref = self.loadExpressionMatrix()
+
+        params = {'input_obj_ref': expr_matrix_ref,
+                  'workspace_name': self.wsName,
+                  'pca_matrix_name': 'test_truncated_pca',
+                  'n_components': 2,
+                  'svd_solver': 'truncated',
+                  'random_seed': 1}
+
+        ret = self.getImpl().run_pca(self.ctx, params)[0]
+        pca_matrix_data = self.dfu.get_objects(
+                    {"object_refs": [ret.get('pca_ref')]})['data'][0]['data']
+
+        self.assertEqual(pca_matrix_data['pca_parameters']['svd_solver'], 'truncated')
+        for field in ['explained_variance', 'explained_variance_ratio', 'singular_values']:
+            self.assertEqual(len(pca_matrix_data[field]), 2)
+
+        expected_row_ids = ['WRI_RS00010_CDS_1', 'WRI_RS00015_CDS_1', 'WRI_RS00025_CDS_1']
+        expected_col_ids = ['principal_component_1', 'principal_component_2']
+        self.assertCountEqual(pca_matrix_data['rotation_matrix']['row_ids'], expected_row_ids)
+        self.assertCountEqual(pca_matrix_data['rotation_matrix']['col_ids'], expected_col_ids)
 
     def test_export_pca_matrix_excel_ok(self):
         self.start_test()
@@ -0,0 +1,383 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from scipy import stats
+
+from GenericsAPI.Utils import CorrelationEngine
+
+
+class CorrelationEngineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random_state = np.random.RandomState(0)
+        # integer values to exercise ties, one constant row
+        cls.x_values = random_state.randint(0, 5, size=(6, 12)).astype(float)
+        cls.x_values[2] = 3
+        cls.y_values = random_state.uniform(low=0, high=100, size=(4, 12))
+
+    def _scipy_corr(self, func, x_values, y_values):
+        return np.array([[func(x, y)[0] for y in y_values] for x in x_values])
+
+    def _scipy_pvalues(self, func, x_values, y_values):
+        return np.array([[func(x, y)[1] for y in y_values] for x in x_values])
+
+    def check_method(self, method, func):
+        corr = CorrelationEngine.corr_matrix(self.x_values, self.y_values, method=method)
+        expected = self._scipy_corr(func, self.x_values, self.y_values)
+        np.testing.assert_allclose(corr, expected, atol=1e-10)
+
+        corr = CorrelationEngine.corr_matrix(self.x_values, method=method)
+        expected = self._scipy_corr(func, self.x_values, self.x_values)
+        np.testing.assert_allclose(corr, expected, atol=1e-10)
+
+    def check_pvalues(self, method, func, x_values, y_values):
+        corr = CorrelationEngine.corr_matrix(x_values, y_values, method=method)
+        pvalues = CorrelationEngine.corr_pvalues(corr, x_values, y_values, method=method)
+        expected = self._scipy_pvalues(func, x_values, y_values)
+        np.testing.assert_allclose(pvalues, expected, atol=1e-7)
+
+    def test_pearson(self):
+        self.check_method('pearson', stats.pearsonr)
+
+    def test_spearman(self):
+        self.check_method('spearman', stats.spearmanr)
+
+    def test_kendall(self):
+        self.check_method('kendall', stats.kendalltau)
+
+    def test_pvalues(self):
+        random_state = np.random.RandomState(1)
+        for n_obs in [3, 12, 40]:
+            # tied, untied, perfectly (anti-)correlated and constant rows
+            x_values = random_state.randint(0, 5, size=(4, n_obs)).astype(float)
+            x_values[2] = 3
+            x_values[3] = random_state.permutation(n_obs)
+            y_values = random_state.uniform(size=(4, n_obs))
+            y_values[1] = x_values[3]
+            y_values[2] = -x_values[3]
+
+            self.check_pvalues('pearson', stats.pearsonr, x_values, y_values)
+            self.check_pvalues('spearman', stats.spearmanr, x_values, y_values)
+            self.check_pvalues('kendall', stats.kendalltau, x_values, y_values)
+
+    def test_symmetric_pvalues(self):
+        for method in ['pearson', 'spearman', 'kendall']:
+            corr = CorrelationEngine.corr_matrix(self.x_values, method=method)
+            pvalues = CorrelationEngine.symmetric_pvalues(corr, self.x_values, method=method)
+            expected = CorrelationEngine.corr_pvalues(corr, self.x_values, method=method)
+            np.testing.assert_allclose(pvalues, expected)
+            np.testing.assert_array_equal(pvalues, pvalues.T)
+
+        # pearson p-values are the linear regression slope p-values
+        corr = CorrelationEngine.corr_matrix(self.y_values)
+        pvalues = CorrelationEngine.symmetric_pvalues(corr, self.y_values)
+        expected = self._scipy_pvalues(lambda x, y: stats.linregress(x, y)[2:],
+                                       self.y_values, self.y_values)
+        np.testing.assert_allclose(pvalues, expected, atol=1e-7)
+
+    def test_kendall_blocks(self):
+        expected = CorrelationEngine.corr_matrix(self.x_values, self.y_values, method='kendall')
+
+        block_bytes = CorrelationEngine.KENDALL_BLOCK_BYTES
+        CorrelationEngine.KENDALL_BLOCK_BYTES = 1
+        try:
+            corr = CorrelationEngine.corr_matrix(self.x_values, self.y_values, method='kendall')
+        finally:
+            CorrelationEngine.KENDALL_BLOCK_BYTES = block_bytes
+
+        np.testing.assert_array_equal(corr, expected)
+
+    def test_kendall_sorted(self):
+        random_state = np.random.RandomState(2)
+        x_values = np.vstack([self.x_values, random_state.uniform(size=(2, 12))])
+        y_values = np.vstack([self.y_values, random_state.randint(0, 3, size=(2, 12))])
+        expected = self._scipy_corr(stats.kendalltau, x_values, y_values)
+
+        sort_size = CorrelationEngine.KENDALL_SORT_SIZE
+        block_bytes = CorrelationEngine.KENDALL_BLOCK_BYTES
+        CorrelationEngine.KENDALL_SORT_SIZE = 0
+        try:
+            corr = CorrelationEngine.corr_matrix(x_values, y_values, method='kendall')
+            np.testing.assert_allclose(corr, expected, atol=1e-12)
+
+            CorrelationEngine.KENDALL_BLOCK_BYTES = 1
+            blocked = CorrelationEngine.corr_matrix(x_values, y_values, method='kendall')
+        finally:
+            CorrelationEngine.KENDALL_SORT_SIZE = sort_size
+            CorrelationEngine.KENDALL_BLOCK_BYTES = block_bytes
+
+        np.testing.assert_array_equal(blocked, corr)
+
+    def test_kendall_sorted_missing(self):
+        x_values = self.x_values.copy()
+        x_values[1, 3] = np.nan
+        y_values = self.y_values.copy()
+        y_values[0, 5] = np.nan
+
+        signs = CorrelationEngine._kendall_tau_signs(x_values, y_values)
+        corr = CorrelationEngine._kendall_tau_sorted(x_values, y_values)
+        np.testing.assert_allclose(corr, signs, atol=1e-12)
+
+        self.assertTrue(np.isnan(corr[1]).all())
+        self.assertTrue(np.isnan(corr[:, 0]).all())
+        np.testing.assert_allclose(corr[2:, 1:],
+                                   self._scipy_corr(stats.kendalltau, x_values[2:],
+                                                    y_values[1:]), atol=1e-12)
+
+    def test_count_inversions(self):
+        random_state = np.random.RandomState(3)
+        for n_obs in [1, 2, 5, 8, 13]:
+            values = random_state.randint(0, n_obs, size=(7, n_obs))
+            expected = [sum(row[i] > row[j] for i in range(n_obs) for j in range(i + 1, n_obs))
+                        for row in values]
+            np.testing.assert_array_equal(CorrelationEngine._count_inversions(values), expected)
+
+    def test_kendall_subsample(self):
+        indices = CorrelationEngine.kendall_subsample(100, 10, random_seed=0)
+        self.assertEqual(len(np.unique(indices)), 10)
+        np.testing.assert_array_equal(indices, np.sort(indices))
+        np.testing.assert_array_equal(indices,
+                                      CorrelationEngine.kendall_subsample(100, 10, random_seed=0))
+        np.testing.assert_array_equal(CorrelationEngine.kendall_subsample(5, 10), np.arange(5))
+
+        self.assertGreater(CorrelationEngine.kendall_error_bound(100),
+                           CorrelationEngine.kendall_error_bound(1000))
+        self.assertAlmostEqual(CorrelationEngine.kendall_error_bound(1000, delta=0.05),
+                               np.sqrt(2 * np.log(40) / 500))
+
+    def test_corr_to_memmap(self):
+        tmp_dir = tempfile.mkdtemp()
+        corr_path = os.path.join(tmp_dir, 'corr.npy')
+        sig_path = os.path.join(tmp_dir, 'sig.npy')
+        try:
+            for method in ['pearson', 'spearman', 'kendall']:
+                for y_values in [None, self.y_values]:
+                    corr, pvalues = CorrelationEngine.corr_to_memmap(
+                                            self.x_values, y_values, method=method,
+                                            corr_path=corr_path, sig_path=sig_path, tile_size=4)
+
+                    expected = CorrelationEngine.corr_matrix(self.x_values, y_values,
+                                                             method=method)
+                    expected_pvalues = CorrelationEngine.corr_pvalues(expected, self.x_values,
+                                                                      y_values, method=method)
+                    np.testing.assert_array_equal(corr, np.round(expected, 4))
+                    np.testing.assert_array_equal(pvalues, np.round(expected_pvalues, 4))
+                    np.testing.assert_array_equal(np.load(corr_path), corr)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_corr_to_memmap_workers(self):
+        tmp_dir = tempfile.mkdtemp()
+        corr_path = os.path.join(tmp_dir, 'corr.npy')
+        sig_path = os.path.join(tmp_dir, 'sig.npy')
+        try:
+            for method in ['pearson', 'spearman', 'kendall']:
+                for y_values in [None, self.y_values]:
+                    expected, expected_pvalues = CorrelationEngine.corr_to_memmap(
+                                            self.x_values, y_values, method=method,
+                                            corr_path=corr_path, sig_path=sig_path, tile_size=4)
+                    expected, expected_pvalues = np.array(expected), np.array(expected_pvalues)
+
+                    corr, pvalues = CorrelationEngine.corr_to_memmap(
+                                            self.x_values, y_values, method=method,
+                                            corr_path=corr_path, sig_path=sig_path, tile_size=4,
+                                            n_workers=2)
+                    np.testing.assert_array_equal(corr, expected)
+                    np.testing.assert_array_equal(pvalues, expected_pvalues)
+                    # the prepared inputs of the workers are removed
+                    self.assertCountEqual(os.listdir(tmp_dir), ['corr.npy', 'sig.npy'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_corr_pairs(self):
+        for method in ['pearson', 'spearman', 'kendall']:
+            for y_values in [None, self.y_values]:
+                corr = np.round(CorrelationEngine.corr_matrix(self.x_values, y_values,
+                                                              method=method), 4)
+                pvalues = np.round(CorrelationEngine.corr_pvalues(corr, self.x_values, y_values,
+                                                                  method=method), 4)
+                with np.errstate(invalid='ignore'):
+                    mask = np.abs(corr) >= 0.3
+                if y_values is None:
+                    mask = np.triu(mask, k=1)
+                row_index, col_index = np.nonzero(mask)
+
+                for n_workers in [1, 2]:
+                    pairs = CorrelationEngine.corr_pairs(self.x_values, y_values, method=method,
+                                                         threshold=0.3,
+                                                         compute_significance=True,
+                                                         tile_size=4, n_workers=n_workers)
+                    np.testing.assert_array_equal(pairs['row_index'], row_index)
+                    np.testing.assert_array_equal(pairs['col_index'], col_index)
+                    np.testing.assert_array_equal(pairs['coefficient'], corr[mask])
+                    np.testing.assert_allclose(pairs['significance'], pvalues[mask],
+                                               atol=1e-4)
+
+        pairs = CorrelationEngine.corr_pairs(self.x_values, threshold=1.1)
+        self.assertEqual(pairs['row_index'].size, 0)
+        self.assertIsNone(pairs['significance'])
+
+    def test_corr_top_k(self):
+        for method in ['pearson', 'spearman', 'kendall']:
+            for y_values in [None, self.y_values]:
+                corr = CorrelationEngine.corr_matrix(self.x_values, y_values, method=method)
+                pvalues = CorrelationEngine.corr_pvalues(corr, self.x_values, y_values,
+                                                         method=method)
+                if y_values is None:
+                    np.fill_diagonal(corr, np.nan)
+                strength = np.where(np.isnan(corr), -1, np.abs(corr))
+
+                for n_workers in [1, 2]:
+                    pairs = CorrelationEngine.corr_top_k(self.x_values, y_values,
+                                                         method=method, k=3,
+                                                         compute_significance=True,
+                                                         tile_size=2, n_workers=n_workers)
+                    row_index, col_index = pairs['row_index'], pairs['col_index']
+
+                    np.testing.assert_array_equal(pairs['coefficient'],
+                                                  np.round(corr[row_index, col_index], 4))
+                    np.testing.assert_allclose(pairs['significance'],
+                                               pvalues[row_index, col_index], atol=1e-4)
+                    for row in range(len(self.x_values)):
+                        expected = np.sort(strength[row][strength[row] >= 0])[::-1][:3]
+                        kept = np.abs(corr[row, col_index[row_index == row]])
+                        np.testing.assert_allclose(kept, expected)
+
+        # every valid partner is kept when k is too large, the constant row has none
+        pairs = CorrelationEngine.corr_top_k(self.x_values, k=100)
+        self.assertEqual(pairs['row_index'].size, 5 * 4)
+
+    def test_adjust_pvalues(self):
+        pvalues = np.array([0.01, 0.04, np.nan, 0.03, 0.5, 0.001, 0.04])
+        tested = pvalues[~np.isnan(pvalues)]
+        n_tests = tested.size
+
+        # q-value definition: min over p_j >= p_i of p_j * m / rank_j
+        ranks = np.array([np.sum(tested <= p) for p in tested])
+        expected = np.array([min(1, np.min(tested[tested >= p] * n_tests /
+                                           ranks[tested >= p])) for p in tested])
+        adjusted = CorrelationEngine.adjust_pvalues(pvalues, 'fdr_bh')
+        self.assertTrue(np.isnan(adjusted[2]))
+        np.testing.assert_allclose(adjusted[~np.isnan(pvalues)], expected)
+
+        adjusted = CorrelationEngine.adjust_pvalues(pvalues, 'bonferroni')
+        np.testing.assert_allclose(adjusted[~np.isnan(pvalues)],
+                                   np.minimum(tested * n_tests, 1))
+
+        # adjusting a subset with the total number of tests is conservative
+        subset = CorrelationEngine.adjust_pvalues(tested[:3], 'fdr_bh', n_tests=n_tests)
+        self.assertTrue((subset >= expected[:3]).all())
+
+        with self.assertRaises(ValueError) as context:
+            CorrelationEngine.adjust_pvalues(pvalues, 'fake_correction')
+        self.assertIn('multiple testing correction', str(context.exception.args[0]))
+
+    def test_adjust_pvalue_matrix(self):
+        corr = CorrelationEngine.corr_matrix(self.y_values)
+        pvalues = CorrelationEngine.symmetric_pvalues(corr, self.y_values)
+
+        adjusted = CorrelationEngine.adjust_pvalue_matrix(pvalues, 'fdr_bh', symmetric=True)
+        rows, cols = np.triu_indices(len(pvalues), k=1)
+        np.testing.assert_allclose(adjusted[rows, cols],
+                                   CorrelationEngine.adjust_pvalues(pvalues[rows, cols]))
+        np.testing.assert_array_equal(adjusted, adjusted.T)
+        np.testing.assert_array_equal(np.diag(adjusted), np.diag(pvalues))
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            corr_path = os.path.join(tmp_dir, 'corr.npy')
+            sig_path = os.path.join(tmp_dir, 'sig.npy')
+            adjusted_path = os.path.join(tmp_dir, 'adjusted.npy')
+            for n_workers in [1, 2]:
+                _, sig = CorrelationEngine.corr_to_memmap(self.y_values, corr_path=corr_path,
+                                                          sig_path=sig_path, tile_size=2,
+                                                          n_workers=n_workers,
+                                                          correction='fdr_bh',
+                                                          adjusted_path=adjusted_path)
+                np.testing.assert_array_equal(sig, np.round(pvalues, 4))
+                np.testing.assert_allclose(np.load(adjusted_path), np.round(adjusted, 4))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_adjust_pvalue_memmap(self):
+        random_state = np.random.RandomState(5)
+        group_size = CorrelationEngine.PVALUE_GROUP_SIZE
+        CorrelationEngine.PVALUE_GROUP_SIZE = 50
+        try:
+            for symmetric in [False, True]:
+                pvalues = random_state.beta(0.3, 1, size=(37, 37))
+                pvalues[random_state.uniform(size=pvalues.shape) < 0.1] = 1
+                if symmetric:
+                    pvalues = np.triu(pvalues, k=1) + np.triu(pvalues, k=1).T
+                    np.fill_diagonal(pvalues, 0.5)
+                pvalues[3, 5] = pvalues[5, 3] = np.nan
+
+                for correction in CorrelationEngine.PVALUE_CORRECTIONS:
+                    expected = CorrelationEngine.adjust_pvalue_matrix(pvalues, correction,
+                                                                      symmetric=symmetric)
+                    adjusted = np.zeros(pvalues.shape)
+                    CorrelationEngine.adjust_pvalue_memmap(pvalues, adjusted, correction,
+                                                           symmetric=symmetric, tile_size=8)
+                    np.testing.assert_array_equal(adjusted, np.round(expected, 4))
+        finally:
+            CorrelationEngine.PVALUE_GROUP_SIZE = group_size
+
+        # several groups of bins are ranked one after the other
+        counts = np.array([3, 0, 30, 25, 1, 40])
+        self.assertEqual(CorrelationEngine._bin_groups(counts, 50),
+                         [(4, 5), (3, 3), (0, 2)])
+
+    def test_adjusted_pairs(self):
+        for y_values in [None, self.y_values]:
+            corr = CorrelationEngine.corr_matrix(self.x_values, y_values)
+            pvalues = CorrelationEngine.corr_pvalues(corr, self.x_values, y_values)
+            adjusted = CorrelationEngine.adjust_pvalue_matrix(pvalues, 'bonferroni',
+                                                              symmetric=y_values is None)
+
+            for threshold in [0, 0.3]:
+                pairs = CorrelationEngine.corr_pairs(self.x_values, y_values, threshold=threshold,
+                                                     compute_significance=True,
+                                                     correction='bonferroni')
+                np.testing.assert_allclose(
+                            pairs['adjusted_significance'],
+                            adjusted[pairs['row_index'], pairs['col_index']], atol=1e-4)
+
+            pairs = CorrelationEngine.corr_top_k(self.x_values, y_values, k=2,
+                                                 compute_significance=True,
+                                                 correction='bonferroni')
+            np.testing.assert_allclose(
+                            pairs['adjusted_significance'],
+                            adjusted[pairs['row_index'], pairs['col_index']], atol=1e-4)
+
+        pairs = CorrelationEngine.corr_pairs(self.x_values, compute_significance=True)
+        self.assertIsNone(pairs['adjusted_significance'])
+
+    def test_comoment_stats(self):
+        values = np.hstack([self.x_values, self.x_values[::-1] * 2 + 1])
+        expected = CorrelationEngine.corr_matrix(values)
+
+        stats_a = CorrelationEngine.comoment_stats(values[:, :10])
+        stats_b = CorrelationEngine.comoment_stats(values[:, 10:])
+        n_obs, means, comoments = CorrelationEngine.merge_comoment_stats(stats_a, stats_b)
+
+        self.assertEqual(n_obs, values.shape[1])
+        np.testing.assert_allclose(means, values.mean(axis=1))
+        corr = CorrelationEngine.comoment_corr(comoments)
+        np.testing.assert_allclose(corr, expected, atol=1e-12)
+        np.testing.assert_allclose(CorrelationEngine.comoment_pvalues(corr, n_obs),
+                                   CorrelationEngine.corr_pvalues(expected, values), atol=1e-10)
+
+        # a variable constant over every observation stays NaN
+        values[2] = 0.1
+        stats_a = CorrelationEngine.comoment_stats(values[:, :10])
+        stats_b = CorrelationEngine.comoment_stats(values[:, 10:])
+        comoments = CorrelationEngine.merge_comoment_stats(stats_a, stats_b)[2]
+        self.assertTrue(np.isnan(CorrelationEngine.comoment_corr(comoments)[2]).all())
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError) as context:
+            CorrelationEngine.corr_matrix(self.x_values, method='fake_method')
+        self.assertIn('Input correlation method', str(context.exception.args[0]))
@@ -0,0 +1,129 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from GenericsAPI.Utils import JSONStream
+
+
+class JSONStreamTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scratch = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.scratch)
+
+    def test_write_array(self):
+        rows = [['gene_u1', 1.5], ['unit "a"', -2], ['</script>', None]]
+
+        fp = io.StringIO()
+        n_rows = JSONStream.write_array(fp, [rows[:2], [], rows[2:]])
+        self.assertEqual(n_rows, 3)
+        self.assertEqual(json.loads(fp.getvalue()), rows)
+
+        fp = io.StringIO()
+        JSONStream.write_array(fp, [rows], html_safe=True)
+        self.assertNotIn('</', fp.getvalue())
+        self.assertEqual(json.loads(fp.getvalue()), rows)
+
+        fp = io.StringIO()
+        self.assertEqual(JSONStream.write_array(fp, []), 0)
+        self.assertEqual(fp.getvalue(), '[]')
+
+    def test_chunks(self):
+        df = pd.DataFrame({'id': ['a', 'b', 'c'], 'value': [1., 2., 3.]})
+        self.assertEqual(list(JSONStream.frame_chunks(df, chunk_size=2)),
+                         [[['a', 1.], ['b', 2.]], [['c', 3.]]])
+
+        chunks = list(JSONStream.array_chunks(np.array(['a', 'b', 'c'], dtype=object),
+                                              np.arange(3), chunk_size=2))
+        self.assertEqual(chunks, [[('a', 0), ('b', 1)], [('c', 2)]])
+
+    def test_write_table(self):
+        file_path = os.path.join(self.scratch, 'table.json')
+        df = pd.DataFrame({'id': ['u1', 'u2', 'u3'], 'value': [1., 2., 3.]})
+
+        n_rows = JSONStream.write_table(file_path, JSONStream.frame_chunks(df, chunk_size=2))
+
+        self.assertEqual(n_rows, 3)
+        with open(file_path) as fp:
+            table = json.load(fp)
+        self.assertEqual(table, {'draw': 1, 'recordsTotal': 3, 'recordsFiltered': 3,
+                                 'data': df.values.tolist()})
+
+    def test_write_pages(self):
+        rows = [['u{}'.format(i), float(i)] for i in range(25)]
+
+        index = JSONStream.write_pages(self.scratch, 'corr', [rows[:7], rows[7:]], page_size=10)
+
+        self.assertEqual(index, {'page_size': 10, 'n_rows': 25,
+                                 'pages': ['corr_page_0.json', 'corr_page_1.json',
+                                           'corr_page_2.json']})
+        with open(os.path.join(self.scratch, 'corr_index.json')) as fp:
+            self.assertEqual(json.load(fp), index)
+
+        pages = list()
+        for page_file_name in index['pages']:
+            with open(os.path.join(self.scratch, page_file_name)) as fp:
+                pages.append(json.load(fp))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([row for page in pages for row in page], rows)
+
+        index = JSONStream.write_pages(self.scratch, 'sig', [])
+        self.assertEqual(index['n_rows'], 0)
+        self.assertEqual(index['pages'], [])
+
+    def test_sort_rows(self):
+        values = [3.0, None, 1.0, 2.0, 3.0, None, 0.5]
+        rows = [['u{}'.format(i), value] for i, value in enumerate(values)]
+        work_dir = tempfile.mkdtemp(dir=self.scratch)
+
+        sorted_rows = JSONStream.sort_rows([rows[:4], rows[4:]], 1, descending=True, run_size=3,
+                                           work_dir=work_dir)
+        self.assertEqual([row for chunk in sorted_rows for row in chunk],
+                         [rows[1], rows[5], rows[0], rows[4], rows[3], rows[2], rows[6]])
+        self.assertEqual(os.listdir(work_dir), [])
+
+        sorted_rows = JSONStream.sort_rows([rows], 1, run_size=2, work_dir=work_dir)
+        self.assertEqual([row for chunk in sorted_rows for row in chunk],
+                         [rows[6], rows[2], rows[3], rows[0], rows[4], rows[1], rows[5]])
+
+    def test_write_pages_order(self):
+        rows = [['u{}'.format(i), float(i % 7)] for i in range(25)]
+        output_directory = tempfile.mkdtemp(dir=self.scratch)
+
+        index = JSONStream.write_pages(output_directory, 'links', [rows[:7], rows[7:]],
+                                       page_size=10, order=(1, 'desc'))
+
+        self.assertEqual(index['order'], [[1, 'desc']])
+        self.assertEqual(index['n_rows'], 25)
+        pages = list()
+        for page_file_name in index['pages']:
+            with open(os.path.join(output_directory, page_file_name)) as fp:
+                pages.append(json.load(fp))
+        self.assertEqual([row for page in pages for row in page],
+                         sorted(rows, key=lambda row: row[1], reverse=True))
+        self.assertEqual(sorted(os.listdir(output_directory)),
+                         ['links_index.json'] + index['pages'])
+
+    def test_write_template(self):
+        file_path = os.path.join(self.scratch, 'report.html')
+        template = 'var edges = //EDGES;\nvar nodes = //NODES;\n'
+
+        n_rows = JSONStream.write_template(file_path, template,
+                                           {'//NODES': [['u1', 'u2']], '//EDGES': []})
+
+        self.assertEqual(n_rows, {'//NODES': 2, '//EDGES': 0})
+        with open(file_path) as fp:
+            self.assertEqual(fp.read(), 'var edges = [];\nvar nodes = ["u1", "u2"];\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
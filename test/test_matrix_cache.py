@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from GenericsAPI.Utils.MatrixCache import MatrixCache
+
+
+class MatrixCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scratch = tempfile.mkdtemp()
+        self.cache = MatrixCache(self.scratch)
+
+        self.row_ids = ['gene_1', 'gene_2', 'gene_3']
+        self.col_ids = ['instance_1', 'instance_2']
+        self.values = np.array([[0.1, 0.2], [np.nan, 0.4], [0.5, -0.6]])
+
+    def tearDown(self):
+        shutil.rmtree(self.scratch)
+
+    def test_put_get(self):
+        self.assertIsNone(self.cache.get('1/2/3'))
+
+        self.cache.put('1/2/3', self.row_ids, self.col_ids, self.values)
+        row_ids, col_ids, values = self.cache.get('1/2/3')
+
+        self.assertEqual(row_ids, self.row_ids)
+        self.assertEqual(col_ids, self.col_ids)
+        self.assertIsInstance(values, np.memmap)
+        self.assertEqual(values.dtype, np.float64)
+        np.testing.assert_array_equal(values, self.values)
+
+        # the cache is on disk, shared with later instances
+        row_ids, col_ids, values = MatrixCache(self.scratch).get('1/2/3')
+        np.testing.assert_array_equal(values, self.values)
+        self.assertIsNone(self.cache.get('1/2/4'))
+
+        # a second put of the same matrix keeps the entry
+        self.cache.put('1/2/3', self.row_ids, self.col_ids, self.values)
+        self.assertEqual(os.listdir(self.cache.directory), ['1_2_3'])
+
+    def test_put_rows(self):
+        rows = [[0.1, 0.2], [None, 0.4], [0.5, -0.6]]
+        self.cache.put('1/2/3', self.row_ids, self.col_ids, rows)
+
+        row_ids, col_ids, values = self.cache.get('1/2/3')
+        np.testing.assert_array_equal(values, self.values)
+
+        # a failed put leaves no entry behind
+        with self.assertRaises(ValueError):
+            self.cache.put('1/3/1', self.row_ids, self.col_ids, rows[:2])
+        self.assertIsNone(self.cache.get('1/3/1'))
+        self.assertEqual(os.listdir(self.cache.directory), ['1_2_3'])
+
+    def test_empty_matrix(self):
+        self.cache.put('1/2/3', [], [], np.zeros((0, 0)))
+        row_ids, col_ids, values = self.cache.get('1/2/3')
+
+        self.assertEqual(row_ids, [])
+        self.assertEqual(col_ids, [])
+        self.assertEqual(values.shape, (0, 0))
+
+    def test_unreadable_entry(self):
+        self.cache.put('1/2/3', self.row_ids, self.col_ids, self.values)
+        os.remove(os.path.join(self.cache.directory, '1_2_3', 'values.npy'))
+
+        self.assertIsNone(self.cache.get('1/2/3'))
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_eviction(self):
+        self.cache.put('1/1/1', self.row_ids, self.col_ids, self.values)
+        entry_size = MatrixCache._entry_size(os.path.join(self.cache.directory, '1_1_1'))
+        self.cache.max_size = 2 * entry_size
+
+        now = time.time()
+        self.cache.put('1/2/1', self.row_ids, self.col_ids, self.values)
+        os.utime(os.path.join(self.cache.directory, '1_1_1'), (now - 20, now - 20))
+        os.utime(os.path.join(self.cache.directory, '1_2_1'), (now - 10, now - 10))
+
+        # opening 1/1/1 makes 1/2/1 the least recently used matrix
+        self.assertIsNotNone(self.cache.get('1/1/1'))
+        self.cache.put('1/3/1', self.row_ids, self.col_ids, self.values)
+
+        self.assertCountEqual(os.listdir(self.cache.directory), ['1_1_1', '1_3_1'])
+
+        # a matrix larger than the whole cache is still kept
+        self.cache.max_size = entry_size // 2
+        self.cache.put('1/4/1', self.row_ids, self.col_ids, self.values)
+        self.assertEqual(os.listdir(self.cache.directory), ['1_4_1'])
@@ -0,0 +1,74 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+from networkx.algorithms import community
+
+from GenericsAPI.Utils import NetworkAnalytics
+
+
+class NetworkAnalyticsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = nx.karate_club_graph()
+        cls.edges = np.array(cls.graph.edges())
+        cls.adj = NetworkAnalytics.adjacency(cls.edges[:, 0], cls.edges[:, 1],
+                                             cls.graph.number_of_nodes())
+
+    def test_adjacency(self):
+        adj = NetworkAnalytics.adjacency([0, 1, 2, 2], [1, 0, 2, 3], 5, weights=[0.5, 0.5, 1, -0.8])
+
+        # symmetric, no self loops, absolute weights
+        np.testing.assert_array_equal(adj.toarray(), [[0, 0.5, 0, 0, 0],
+                                                      [0.5, 0, 0, 0, 0],
+                                                      [0, 0, 0, 0.8, 0],
+                                                      [0, 0, 0.8, 0, 0],
+                                                      [0, 0, 0, 0, 0]])
+
+        n_components, components = NetworkAnalytics.connected_components(adj)
+        self.assertEqual(n_components, 3)
+        self.assertEqual(components.tolist(), [0, 0, 1, 1, 2])
+        self.assertEqual(NetworkAnalytics.degree(adj).tolist(), [1, 1, 1, 1, 0])
+
+    def test_betweenness(self):
+        expected = nx.betweenness_centrality(self.graph)
+        expected = np.array([expected[node] for node in range(self.adj.shape[0])])
+
+        np.testing.assert_allclose(NetworkAnalytics.betweenness(self.adj, n_samples=100),
+                                   expected, atol=1e-12)
+
+        approx = NetworkAnalytics.betweenness(self.adj, n_samples=20, random_seed=1)
+        np.testing.assert_array_equal(
+            approx, NetworkAnalytics.betweenness(self.adj, n_samples=20, random_seed=1))
+        # the hubs stay on top
+        self.assertEqual(set(np.argsort(-approx)[:2]), set(np.argsort(-expected)[:2]))
+
+    def test_louvain(self):
+        communities = NetworkAnalytics.louvain(self.adj, random_seed=1)
+
+        self.assertEqual(communities.shape, (self.adj.shape[0], ))
+        self.assertGreaterEqual(np.bincount(communities)[0], np.bincount(communities)[-1])
+
+        partition = [set(np.nonzero(communities == label)[0])
+                     for label in range(communities.max() + 1)]
+        quality = community.modularity(self.graph, partition, weight=None)
+        self.assertAlmostEqual(NetworkAnalytics.modularity(self.adj, communities), quality)
+        self.assertGreater(quality, 0.38)
+
+        # two cliques joined by a single edge
+        clique = [(i, j) for i in range(6) for j in range(i + 1, 6)]
+        edges = np.array(clique + [(i + 6, j + 6) for i, j in clique] + [(0, 6)])
+        adj = NetworkAnalytics.adjacency(edges[:, 0], edges[:, 1], 12)
+        communities = NetworkAnalytics.louvain(adj, random_seed=1)
+        self.assertEqual(communities.tolist(), [0] * 6 + [1] * 6)
+
+    def test_empty(self):
+        adj = NetworkAnalytics.adjacency([], [], 2)
+
+        self.assertEqual(NetworkAnalytics.louvain(adj).tolist(), [0, 1])
+        self.assertEqual(NetworkAnalytics.betweenness(adj).tolist(), [0, 0])
+        self.assertEqual(NetworkAnalytics.modularity(adj, np.array([0, 1])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
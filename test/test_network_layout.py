@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from GenericsAPI.Utils import NetworkLayout
+
+
+class NetworkLayoutTest(unittest.TestCase):
+
+    def _exact_repulsion(self, pos, k_square):
+        delta = pos[:, np.newaxis, :] - pos[np.newaxis, :, :]
+        dist_square = np.einsum('ijk,ijk->ij', delta, delta)
+        np.fill_diagonal(dist_square, np.inf)
+        return np.einsum('ijk,ij->ik', delta, k_square / dist_square)
+
+    def test_repulsion(self):
+        random_state = np.random.RandomState(0)
+        # a clustered layout, deep enough for several grid levels
+        pos = np.concatenate([random_state.normal(loc=center, scale=0.05, size=(400, 2))
+                              for center in [0.2, 0.5, 0.8]])
+        k_square = 1. / pos.shape[0]
+
+        approx = NetworkLayout.repulsion(pos, k_square)
+        exact = self._exact_repulsion(pos, k_square)
+
+        error = np.linalg.norm(approx - exact, axis=1) / np.linalg.norm(exact, axis=1)
+        self.assertLess(np.median(error), 0.02)
+
+        # exact between two nodes, in far cells (opposite corners) or the same cell
+        for pos in [np.array([[0., 0.], [1., 1.]]), np.array([[0., 0.], [1e-3, 0.]])]:
+            np.testing.assert_allclose(NetworkLayout.repulsion(pos, 0.5),
+                                       self._exact_repulsion(pos, 0.5))
+
+        self.assertEqual(NetworkLayout.repulsion(np.zeros((1, 2)), 1.).tolist(), [[0, 0]])
+
+    def test_force_layout(self):
+        # two cliques joined by a single edge
+        clique = [(i, j) for i in range(10) for j in range(i + 1, 10)]
+        edges = np.array(clique + [(i + 10, j + 10) for i, j in clique] + [(0, 10)])
+
+        pos = NetworkLayout.force_layout(edges[:, 0], edges[:, 1], 20, random_seed=1)
+
+        self.assertEqual(pos.shape, (20, 2))
+        self.assertTrue(((pos >= 0) & (pos <= 1)).all())
+        np.testing.assert_array_equal(
+            pos, NetworkLayout.force_layout(edges[:, 0], edges[:, 1], 20, random_seed=1))
+
+        dist = np.linalg.norm(pos[:, np.newaxis, :] - pos[np.newaxis, :, :], axis=2)
+        within = np.concatenate([dist[:10, :10][np.triu_indices(10, 1)],
+                                 dist[10:, 10:][np.triu_indices(10, 1)]])
+        between = dist[:10, 10:].ravel()
+        self.assertLess(within.mean(), between.mean())
+
+    def test_force_layout_small(self):
+        pos = NetworkLayout.force_layout([], [], 0)
+        self.assertEqual(pos.shape, (0, 2))
+
+        pos = NetworkLayout.force_layout([], [], 1, random_seed=1)
+        self.assertEqual(pos.shape, (1, 2))
+
+        pos = NetworkLayout.force_layout([0], [1], 2, weights=[-0.5], iterations=0)
+        self.assertTrue(((pos >= 0) & (pos <= 1)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+
+from GenericsAPI.Utils.ObjectCache import ObjectCache
+
+
+class FakeDataFileUtil:
+    def __init__(self, objects):
+        self.objects = objects
+        self.requests = list()
+
+    def get_objects(self, params):
+        self.requests.append(params['object_refs'])
+        return {'data': [self.objects[ref] for ref in params['object_refs']]}
+
+
+class FakeWorkspace:
+    def __init__(self, objects):
+        self.objects = objects
+        self.requests = list()
+
+    def get_object_info3(self, params):
+        self.requests.append(params)
+        return {'infos': [self.objects[spec['ref']]['info'] for spec in params['objects']]}
+
+    def get_objects2(self, params):
+        self.requests.append(params)
+        data = list()
+        for spec in params['objects']:
+            obj = self.objects[spec['ref']]
+            included = [path.strip('/') for path in spec['included']]
+            data.append({'data': {key: value for key, value in obj['data'].items()
+                                  if key in included},
+                         'info': obj['info']})
+        return {'data': data}
+
+
+class ObjectCacheTest(unittest.TestCase):
+
+    @staticmethod
+    def _object(obj_id, version, values):
+        info = [obj_id, 'object_{}'.format(obj_id), 'KBaseMatrices.ExpressionMatrix-1.1', '',
+                version, '', 1, 'test_ws']
+        return {'data': {'values': values, 'row_attributemapping_ref': '1/5/1'}, 'info': info}
+
+    def setUp(self):
+        self.objects = {'1/1/1': self._object(1, 1, [1.5] * 10),
+                        '1/2/3': self._object(2, 3, [0.5] * 10),
+                        '1/3/1': self._object(3, 1, [2.5] * 10)}
+        self.objects['test_ws/object_2'] = self.objects['1/2/3']
+
+        self.cache = ObjectCache('http://localhost', 'http://localhost/ws', 'token')
+        self.dfu = FakeDataFileUtil(self.objects)
+        self.cache.dfu = self.dfu
+        self.ws = FakeWorkspace(self.objects)
+        self.cache.wsClient = self.ws
+
+    def test_get_objects(self):
+        objects = self.cache.get_objects(['1/1/1', '1/2/3'])
+        self.assertEqual(objects, [self.objects['1/1/1'], self.objects['1/2/3']])
+        self.assertEqual(self.dfu.requests, [['1/1/1', '1/2/3']])
+
+        # only the missing object is fetched
+        objects = self.cache.get_objects(['1/2/3', '1/3/1', '1/1/1'])
+        self.assertEqual(objects, [self.objects['1/2/3'], self.objects['1/3/1'],
+                                   self.objects['1/1/1']])
+        self.assertEqual(self.dfu.requests, [['1/1/1', '1/2/3'], ['1/3/1']])
+
+        # a reference resolving to a cached object is fetched once, then aliased
+        self.assertIs(self.cache.get_object('test_ws/object_2'), self.objects['1/2/3'])
+        self.assertIs(self.cache.get_object('test_ws/object_2'), self.objects['1/2/3'])
+        self.assertEqual(len(self.dfu.requests), 3)
+        self.assertEqual(len(self.cache.entries), 3)
+
+        self.cache.clear()
+        self.cache.get_object('1/1/1')
+        self.assertEqual(len(self.dfu.requests), 4)
+        self.assertEqual(self.cache.size, self.cache._estimate_size(self.objects['1/1/1']))
+
+    def test_put_object(self):
+        saved_object = self._object(4, 2, [1.])
+        self.cache.put_object('1/4/2', saved_object)
+
+        self.assertIs(self.cache.get_object('1/4/2'), saved_object)
+        self.assertEqual(self.dfu.requests, [])
+
+    def test_eviction(self):
+        object_size = self.cache._estimate_size(self.objects['1/1/1'])
+        self.cache.max_size = 2 * object_size
+
+        self.cache.get_object('1/1/1')
+        self.cache.get_object('1/2/3')
+        self.cache.get_object('1/1/1')
+        self.cache.get_object('1/3/1')
+
+        # the least recently used object is evicted
+        self.assertEqual(list(self.cache.entries), [('object', '1/1/1'), ('object', '1/3/1')])
+        self.assertEqual(self.cache.size, 2 * object_size)
+
+        self.cache.get_object('1/2/3')
+        self.assertEqual(self.dfu.requests[-1], ['1/2/3'])
+
+        # a value larger than the whole cache is still kept until the next one
+        self.cache.cached('large', lambda: 'x', size=3 * object_size)
+        self.assertEqual(list(self.cache.entries), ['large'])
+
+    def test_cached(self):
+        calls = list()
+
+        def fetch():
+            calls.append(1)
+            return {'data_matrix': '{"a": {"b": 1}}'}
+
+        first = self.cache.cached(('fetch_data', 'ref'), fetch)
+        second = self.cache.cached(('fetch_data', 'ref'), fetch)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+
+    def test_get_object_info(self):
+        self.assertEqual(self.cache.get_object_info('1/1/1'), self.objects['1/1/1']['info'])
+        self.assertEqual(self.cache.get_object_info('1/1/1'), self.objects['1/1/1']['info'])
+        self.assertEqual(len(self.ws.requests), 1)
+        self.assertEqual(self.dfu.requests, [])
+
+        # the info of a cached object is not fetched
+        self.cache.get_object('1/2/3')
+        self.assertEqual(self.cache.get_object_info('1/2/3'), self.objects['1/2/3']['info'])
+        self.assertEqual(len(self.ws.requests), 1)
+
+    def test_get_subobject(self):
+        obj = self.cache.get_subobject('1/1/1', ['/row_attributemapping_ref'])
+        self.assertEqual(obj['data'], {'row_attributemapping_ref': '1/5/1'})
+        self.assertEqual(obj['info'], self.objects['1/1/1']['info'])
+        self.assertEqual(self.ws.requests[0]['objects'][0]['included'],
+                         ['/row_attributemapping_ref'])
+
+        self.cache.get_subobject('1/1/1', ['/row_attributemapping_ref'])
+        self.assertEqual(len(self.ws.requests), 1)
+
+        # a cached object holds all the paths
+        self.cache.get_object('1/2/3')
+        self.assertIs(self.cache.get_subobject('1/2/3', ['/values']), self.objects['1/2/3'])
+        self.assertEqual(len(self.ws.requests), 1)
+
+    def test_shared(self):
+        config = {'SDK_CALLBACK_URL': 'http://localhost', 'workspace-url': 'http://localhost/ws',
+                  'KB_AUTH_TOKEN': 'token'}
+        cache = ObjectCache.shared(config)
+        self.assertIs(ObjectCache.shared(config), cache)
+        self.assertIs(config[ObjectCache.CONFIG_KEY], cache)